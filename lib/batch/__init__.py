@@ -0,0 +1 @@
+# This is a Python file.
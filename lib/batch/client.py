@@ -0,0 +1,60 @@
+import json
+import os
+import socket
+
+# The daemon listens on this Unix socket in the output directory by default
+SOCKET_NAME = ".parse_daemon.sock"
+
+
+def default_socket_path(output_dir: str = "output") -> str:
+    """Returns the socket path of the daemon serving an output directory."""
+    return os.path.join(output_dir, SOCKET_NAME)
+
+
+class DaemonClient:
+    """
+    Sends requests to a running `ParseDaemon`.
+
+    The protocol is newline-delimited JSON: every request is one JSON object
+    with an "op" field on its own line, answered by one JSON object line with
+    "ok" and either the result fields or an "error". Only the standard
+    library is imported, so a client process starts in milliseconds.
+    """
+
+    def __init__(self, socket_path: str, timeout: float = None):
+        """
+        Args:
+            socket_path: The path of the daemon's Unix socket.
+            timeout: Seconds to wait for a reply, or None to wait as long as
+                the job takes.
+        """
+        self.socket_path = socket_path
+        self.timeout = timeout
+
+    def request(self, op: str, **fields) -> dict:
+        """
+        Sends one request and waits for its reply.
+
+        Args:
+            op: "parse", "render", "stats", "ping" or "shutdown".
+            **fields: The fields of the request (see `ParseDaemon`).
+
+        Returns:
+            The reply dictionary.
+
+        Raises:
+            ConnectionError: If no daemon is listening on the socket.
+        """
+        try:
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(self.timeout)
+            connection.connect(self.socket_path)
+        except (FileNotFoundError, ConnectionRefusedError) as e:
+            raise ConnectionError(f"No parse daemon is listening on {self.socket_path}: {e}")
+        with connection, connection.makefile('rwb') as stream:
+            stream.write(json.dumps({"op": op, **fields}).encode('utf-8') + b"\n")
+            stream.flush()
+            line = stream.readline()
+        if not line:
+            raise ConnectionError(f"The parse daemon on {self.socket_path} closed the connection")
+        return json.loads(line)
@@ -0,0 +1,310 @@
+import json
+import math
+import os
+import socketserver
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.data_saver import HEAD_NAME
+from .client import DaemonClient, default_socket_path
+from .parse_cache import ParseCache, hash_file, parse_options
+
+OPS = ("parse", "render", "stats", "ping", "shutdown")
+
+# The latencies of this many recent jobs are kept for the stats percentiles
+LATENCY_WINDOW = 1000
+
+
+def percentile(values, fraction: float) -> float:
+    """
+    Returns the nearest-rank percentile of a list of numbers.
+
+    Args:
+        values: The numbers, in any order.
+        fraction: The percentile as a fraction, e.g. 0.95.
+
+    Returns:
+        The value below which `fraction` of the numbers fall, or 0.0 for an
+        empty list.
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(max(math.ceil(fraction * len(ordered)) - 1, 0), len(ordered) - 1)]
+
+
+def _warm_up():
+    """Imports the parser and renderer and loads the taxonomy in a new worker, before its first job."""
+    import lib.batch.pipeline  # noqa: F401
+    import lib.pug_gen.site_builder  # noqa: F401
+    from lib.word_parser.taxonomy import load_taxonomy
+    load_taxonomy()
+
+
+def _parse_job(docx_path: str, output_dir: str, render: bool, output_format: str, split_sections: bool,
+               highlight: bool, digest: str) -> dict:
+    from .pipeline import process_document
+    return process_document(docx_path, output_dir, render=render, output_format=output_format, digest=digest,
+                            split_sections=split_sections, highlight=highlight)
+
+
+def _render_job(json_path: str, output_root: str, output_format: str, highlight: bool) -> dict:
+    from lib.pug_gen.site_builder import render_page
+    return render_page(json_path, output_root, output_format, highlight=highlight)
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    """Answers every JSON line of a connection with one JSON line."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                reply = self.server.daemon.handle(json.loads(line))
+            except Exception as e:
+                reply = {"ok": False, "error": str(e)}
+            self.wfile.write(json.dumps(reply, ensure_ascii=False).encode('utf-8') + b"\n")
+            self.wfile.flush()
+
+
+class _Server(socketserver.ThreadingUnixStreamServer):
+    daemon_threads = True
+
+
+class ParseDaemon:
+    """
+    Serves parse and render jobs over a Unix socket from a warm worker pool.
+
+    The worker processes import python-docx, lxml and the page generator and
+    load the taxonomy once, when the daemon starts; the parse cache is loaded
+    once and kept in the daemon. A job then only pays for the document itself.
+
+    Requests are JSON lines (see `DaemonClient`):
+
+        {"op": "parse", "file": "/abs/post.docx", "render": true, "format": "pug",
+         "split_json": false, "highlight": false, "force": false}
+        {"op": "render", "json": "/abs/output/json/post.json", "format": "html", "highlight": false}
+        {"op": "stats"}, {"op": "ping"}, {"op": "shutdown"}
+
+    At most `workers + max_queue` jobs are accepted at a time; further jobs
+    are rejected at once with `"rejected": true` so callers can back off
+    instead of piling up behind a busy daemon.
+    """
+
+    def __init__(self, output_dir: str = "output", socket_path: str = None, workers: int = None,
+                 max_queue: int = 16):
+        """
+        Args:
+            output_dir: The root output directory jobs write to.
+            socket_path: The Unix socket to listen on. Defaults to
+                `<output_dir>/.parse_daemon.sock`.
+            workers: The number of worker processes. Defaults to the CPU count.
+            max_queue: The number of jobs that may wait for a free worker.
+
+        Raises:
+            ValueError: If `workers` or `max_queue` is out of range.
+        """
+        self.output_dir = output_dir
+        self.socket_path = socket_path or default_socket_path(output_dir)
+        self.workers = workers or os.cpu_count() or 1
+        self.max_queue = max_queue
+        if self.workers < 1 or self.max_queue < 0:
+            raise ValueError(f"Invalid pool size: {self.workers} workers, queue of {self.max_queue}")
+        self.cache = ParseCache(output_dir)
+        self.summary = {"completed": 0, "cached": 0, "failed": 0, "rejected": 0, "restarts": 0}
+        self.__in_flight = 0
+        self.__latencies = deque(maxlen=LATENCY_WINDOW)
+        self.__lock = threading.Lock()
+        self.__started = None
+        self.__pool = None
+        self.__server = None
+
+    def start(self):
+        """
+        Binds the socket and starts and warms up the worker processes.
+
+        Raises:
+            IOError: If another daemon is already listening on the socket.
+        """
+        if os.path.exists(self.socket_path):
+            try:
+                DaemonClient(self.socket_path, timeout=1).request("ping")
+            except (ConnectionError, OSError):
+                # Left behind by a daemon that did not shut down cleanly
+                os.remove(self.socket_path)
+            else:
+                raise IOError(f"A parse daemon is already listening on {self.socket_path}")
+        os.makedirs(os.path.dirname(os.path.abspath(self.socket_path)), exist_ok=True)
+
+        self.__pool = self.__start_pool()
+
+        self.__server = _Server(self.socket_path, _RequestHandler)
+        self.__server.daemon = self
+        os.chmod(self.socket_path, 0o600)
+        self.__started = time.monotonic()
+        print(f"Parse daemon listening on {self.socket_path} with {self.workers} workers")
+
+    def __start_pool(self) -> ProcessPoolExecutor:
+        """Starts a pool of warmed-up worker processes."""
+        pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_warm_up)
+        # Workers are spawned on demand, so one job per worker starts them all now
+        for future in [pool.submit(os.getpid) for _ in range(self.workers)]:
+            future.result()
+        return pool
+
+    def __replace_pool(self, broken: ProcessPoolExecutor):
+        """Replaces a pool whose worker died, unless another request already did."""
+        with self.__lock:
+            if self.__pool is not broken:
+                return
+            self.summary["restarts"] += 1
+            broken.shutdown(wait=False, cancel_futures=True)
+            self.__pool = self.__start_pool()
+        print(f"A worker process died; restarted the pool of {self.workers} workers")
+
+    def serve_forever(self):
+        """Serves requests until `shutdown` is called, then stops the workers and removes the socket."""
+        if self.__server is None:
+            self.start()
+        try:
+            self.__server.serve_forever()
+        finally:
+            self.close()
+
+    def shutdown(self):
+        """Stops `serve_forever`; must be called from another thread."""
+        self.__server.shutdown()
+
+    def close(self):
+        """Closes the socket and stops the worker processes."""
+        self.__server.server_close()
+        self.__pool.shutdown(cancel_futures=True)
+        if os.path.exists(self.socket_path):
+            os.remove(self.socket_path)
+
+    def stats(self) -> dict:
+        """
+        Returns the current load and the latency of recent jobs.
+
+        Returns:
+            A dictionary with the "workers", the jobs "running" and waiting
+            ("queue_depth"), the "max_queue", the "completed", "cached",
+            "failed" and "rejected" counts, the pool "restarts" after a worker
+            died, the "uptime" in seconds and the
+            "latency_ms" percentiles (p50, p95, p99) of the last jobs.
+        """
+        with self.__lock:
+            latencies = list(self.__latencies)
+            in_flight = self.__in_flight
+            summary = dict(self.summary)
+        return {
+            "workers": self.workers,
+            "running": min(in_flight, self.workers),
+            "queue_depth": max(in_flight - self.workers, 0),
+            "max_queue": self.max_queue,
+            **summary,
+            "uptime": time.monotonic() - self.__started if self.__started is not None else 0.0,
+            "latency_ms": {name: percentile(latencies, fraction) * 1000
+                           for name, fraction in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99))},
+        }
+
+    def handle(self, request: dict) -> dict:
+        """
+        Answers one request.
+
+        Args:
+            request: The decoded request, with an "op" field.
+
+        Returns:
+            The reply, with "ok" set.
+
+        Raises:
+            ValueError: If the request is malformed.
+        """
+        op = request.get("op")
+        if op == "ping":
+            return {"ok": True, "pid": os.getpid()}
+        if op == "stats":
+            return {"ok": True, **self.stats()}
+        if op == "shutdown":
+            threading.Thread(target=self.shutdown).start()
+            return {"ok": True}
+        if op == "parse":
+            return self.__parse(request)
+        if op == "render":
+            return self.__render(request)
+        raise ValueError(f"Unknown op {op!r}, expected one of {OPS}")
+
+    @staticmethod
+    def __field(request: dict, name: str) -> str:
+        value = request.get(name)
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"The {request.get('op')} request needs a {name!r} path")
+        return value
+
+    def __parse(self, request: dict) -> dict:
+        start = time.perf_counter()
+        docx_path = self.__field(request, "file")
+        render = request.get("render", True)
+        split_sections = request.get("split_json", False)
+        output_format = request.get("format", "pug")
+        highlight = request.get("highlight", False)
+        options = parse_options(render, output_format, highlight, split_sections)
+        digest = hash_file(docx_path)
+        if not request.get("force"):
+            with self.__lock:
+                entry = self.cache.lookup(docx_path, digest, options)
+            head_file = os.path.join(os.path.splitext(entry["json"])[0], HEAD_NAME) if entry else None
+            if (entry and (entry["pages"] or not render)
+                    and (not split_sections or os.path.exists(head_file))):
+                self.__record(start, "cached")
+                return {"ok": True, "json": entry["json"], "sections": head_file if split_sections else None,
+                        "pages": entry["pages"], "cached": True}
+
+        result = self.__submit(start, _parse_job, docx_path, self.output_dir, render,
+                               output_format, split_sections, highlight, digest)
+        if result["ok"]:
+            with self.__lock:
+                self.cache.store(docx_path, digest, result["json"], result["pages"], options)
+                self.cache.save()
+        return result
+
+    def __render(self, request: dict) -> dict:
+        start = time.perf_counter()
+        json_path = self.__field(request, "json")
+        return self.__submit(start, _render_job, json_path, os.path.join(self.output_dir, "pug"),
+                             request.get("format", "pug"), request.get("highlight", False))
+
+    def __submit(self, start: float, job, *args) -> dict:
+        """Runs a job in the pool unless the queue is full."""
+        with self.__lock:
+            if self.__in_flight >= self.workers + self.max_queue:
+                self.summary["rejected"] += 1
+                return {"ok": False, "rejected": True,
+                        "error": f"Queue full: {self.__in_flight} jobs in flight, try again later"}
+            self.__in_flight += 1
+            pool = self.__pool
+        try:
+            result = pool.submit(job, *args).result()
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for running out of memory); only the jobs it broke fail
+            self.__record(start, "failed")
+            self.__replace_pool(pool)
+            return {"ok": False, "error": f"A worker process died during the job: {e}"}
+        except Exception:
+            self.__record(start, "failed")
+            raise
+        finally:
+            with self.__lock:
+                self.__in_flight -= 1
+        self.__record(start, "completed")
+        return {"ok": True, **result}
+
+    def __record(self, start: float, outcome: str):
+        with self.__lock:
+            self.summary[outcome] += 1
+            self.__latencies.append(time.perf_counter() - start)
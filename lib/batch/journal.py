@@ -0,0 +1,237 @@
+import json
+import os
+import socket
+import sqlite3
+import time
+from contextlib import contextmanager
+
+JOURNAL_NAME = ".batch_journal.sqlite3"
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+
+# Seconds before the first retry of a failed document; each further retry waits twice as long
+RETRY_DELAY = 1.0
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    key TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    outputs TEXT NOT NULL DEFAULT '[]',
+    duration REAL,
+    error TEXT,
+    worker TEXT,
+    updated REAL NOT NULL
+)
+"""
+
+
+def worker_id() -> str:
+    """Returns the id a process claims documents under, "<host>:<pid>"."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def _is_alive(worker: str) -> bool:
+    """Returns False only for a worker of this host whose process has exited."""
+    host, _, pid = (worker or "").rpartition(":")
+    if host != socket.gethostname() or not pid.isdigit():
+        return True
+    try:
+        os.kill(int(pid), 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class Journal:
+    """
+    A durable record of the state of every document in a batch run, stored
+    in SQLite next to the outputs.
+
+    Each document moves from pending to running to done or failed. Claims are
+    made inside `BEGIN IMMEDIATE` transactions on a WAL database, so several
+    worker processes can share one journal without processing a document
+    twice. A document left running by a worker that died (or whose lease ran
+    out) is claimable again. A failed document is retried with exponential
+    backoff until it has had `max_attempts` tries.
+    """
+
+    def __init__(self, output_dir: str = "output", lease: float = 3600.0, retry_delay: float = RETRY_DELAY):
+        """
+        Opens or creates the journal of an output directory.
+
+        Args:
+            output_dir: The root output directory.
+            lease: Seconds after which a running document is considered abandoned.
+            retry_delay: Seconds before a failed document is retried the first
+                time; the delay doubles with every further attempt.
+        """
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, JOURNAL_NAME)
+        self.lease = lease
+        self.retry_delay = retry_delay
+        self.worker = worker_id()
+        self.__connection = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self.__connection.row_factory = sqlite3.Row
+        self.__connection.execute("PRAGMA journal_mode=WAL")
+        self.__connection.execute(SCHEMA)
+
+    def close(self):
+        self.__connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @staticmethod
+    def key(docx_path: str) -> str:
+        """Returns the journal key of a document, its lower-cased file name."""
+        return os.path.basename(docx_path).lower()
+
+    def __is_claimed(self, row, now: float) -> bool:
+        """Returns True if a live worker is processing the document of a row."""
+        return row["state"] == RUNNING and now - row["updated"] < self.lease and _is_alive(row["worker"])
+
+    def __retry_at(self, row) -> float:
+        """Returns when a failed document may be tried again."""
+        return row["updated"] + self.retry_delay * 2 ** max(row["attempts"] - 1, 0)
+
+    @contextmanager
+    def __transaction(self):
+        """Runs a block in a `BEGIN IMMEDIATE` transaction, rolled back on errors."""
+        self.__connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield self.__connection
+        except BaseException:
+            self.__connection.execute("ROLLBACK")
+            raise
+        self.__connection.execute("COMMIT")
+
+    def enqueue(self, documents: dict, reset: bool = False):
+        """
+        Adds documents to the journal.
+
+        New documents, documents whose hash changed and finished documents
+        whose outputs are missing become pending with no attempts. Unchanged
+        documents keep their state, so a resumed run skips finished ones.
+        Documents that another worker is processing are left to it.
+
+        Args:
+            documents: The content hash of each .docx path.
+            reset: If True, every document that is not being processed
+                becomes pending (a fresh run).
+        """
+        now = time.time()
+        with self.__transaction() as connection:
+            for docx_path, digest in documents.items():
+                key = self.key(docx_path)
+                row = connection.execute("SELECT * FROM documents WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    connection.execute("INSERT INTO documents (key, path, hash, state, updated) VALUES (?, ?, ?, ?, ?)",
+                                       (key, docx_path, digest, PENDING, now))
+                    continue
+                if self.__is_claimed(row, now):
+                    continue
+                outputs_missing = row["state"] == DONE and not all(
+                    os.path.exists(path) for path in json.loads(row["outputs"]))
+                if reset or row["hash"] != digest or outputs_missing:
+                    connection.execute("UPDATE documents SET path = ?, hash = ?, state = ?, attempts = 0, error = NULL, "
+                                       "worker = NULL, updated = ? WHERE key = ?",
+                                       (docx_path, digest, PENDING, now, key))
+
+    def claim(self, keys=None, max_attempts: int = 3):
+        """
+        Marks the next document to process as running for this worker.
+
+        Pending documents, failed documents with attempts left whose retry
+        delay has passed and abandoned running documents can be claimed.
+
+        Args:
+            keys: If given, only these journal keys are considered.
+            max_attempts: The number of times a document is tried in total.
+
+        Returns:
+            The claimed row as a dictionary, or None when nothing is left.
+        """
+        now = time.time()
+        with self.__transaction() as connection:
+            rows = connection.execute(
+                "SELECT * FROM documents WHERE (state = ? OR state = ? OR (state = ? AND attempts < ?)) "
+                "ORDER BY key", (PENDING, RUNNING, FAILED, max_attempts))
+            for row in rows:
+                if keys is not None and row["key"] not in keys:
+                    continue
+                if self.__is_claimed(row, now):
+                    continue
+                if row["attempts"] >= max_attempts:
+                    continue
+                if row["state"] == FAILED and now < self.__retry_at(row):
+                    continue
+                connection.execute("UPDATE documents SET state = ?, attempts = attempts + 1, worker = ?, updated = ? "
+                                   "WHERE key = ?", (RUNNING, self.worker, now, row["key"]))
+                return dict(row, state=RUNNING, attempts=row["attempts"] + 1, worker=self.worker)
+        return None
+
+    def next_retry(self, keys=None, max_attempts: int = 3):
+        """
+        Returns how long until a failed document with attempts left may be retried.
+
+        Args:
+            keys: If given, only these journal keys are considered.
+            max_attempts: The number of times a document is tried in total.
+
+        Returns:
+            The number of seconds to wait (0 if one can be retried now), or
+            None if no failed document has attempts left.
+        """
+        rows = self.__connection.execute("SELECT * FROM documents WHERE state = ? AND attempts < ?",
+                                         (FAILED, max_attempts))
+        retry_times = [self.__retry_at(row) for row in rows if keys is None or row["key"] in keys]
+        if not retry_times:
+            return None
+        return max(min(retry_times) - time.time(), 0.0)
+
+    def finish(self, key: str, outputs: list, duration: float):
+        """Records a processed document and its outputs."""
+        with self.__transaction() as connection:
+            connection.execute("UPDATE documents SET state = ?, outputs = ?, duration = ?, error = NULL, updated = ? "
+                               "WHERE key = ? AND worker = ?",
+                               (DONE, json.dumps(list(outputs)), duration, time.time(), key, self.worker))
+
+    def fail(self, key: str, error: str, duration: float):
+        """Records a failed attempt at a document."""
+        with self.__transaction() as connection:
+            connection.execute("UPDATE documents SET state = ?, error = ?, duration = ?, updated = ? "
+                               "WHERE key = ? AND worker = ?",
+                               (FAILED, error, duration, time.time(), key, self.worker))
+
+    def get(self, docx_path: str):
+        """Returns the journal row of a document as a dictionary, or None."""
+        row = self.__connection.execute("SELECT * FROM documents WHERE key = ?", (self.key(docx_path),)).fetchone()
+        return dict(row) if row else None
+
+    def counts(self, keys=None) -> dict:
+        """
+        Counts documents per state.
+
+        Args:
+            keys: If given, only these journal keys are counted.
+
+        Returns:
+            A dictionary of state -> number of documents.
+        """
+        counts = {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 0}
+        for row in self.__connection.execute("SELECT key, state FROM documents"):
+            if keys is None or row["key"] in keys:
+                counts[row["state"]] += 1
+        return counts
+
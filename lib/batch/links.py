@@ -0,0 +1,202 @@
+import json
+import os
+from urllib.parse import unquote, urljoin, urlsplit
+
+import utils.common_utils as cu
+from utils.file_operations import output_writer
+from utils.toc import document_toc, iter_toc
+from .parse_cache import ParseCache
+
+LINK_INDEX_NAME = ".link_index.json"
+REPORT_NAME = "link_report.json"
+
+# Links to these hosts point into the site and are checked
+SITE_HOSTS = ("devontaereid.com", "www.devontaereid.com")
+
+# The page tree sections holding documents; other site pages are not checked
+PAGE_SECTIONS = ("articles", "notes")
+
+
+def page_path(document: dict, default_id: str = "") -> str:
+    """
+    Returns the site path of a parsed document's page, as laid out by `Post_Generator`.
+
+    Args:
+        document: The parsed document.
+        default_id: The id to use when the document has no `article-id`.
+    """
+    metadata = document.get("metadata", {})
+    section = "articles" if (metadata.get("type") or "article").lower() == "article" else "notes"
+    return f"/{section}/{metadata.get('id') or default_id}"
+
+
+def document_anchors(document: dict) -> list:
+    """Returns the section anchors of a parsed document's page, in page order."""
+    return [entry["anchor"] for entry in iter_toc(document_toc(document))]
+
+
+def document_links(document: dict) -> list:
+    """Returns every hyperlink of a parsed document as {"text", "target"}, in document order."""
+    paragraphs = list(document.get("paragraphs", []))
+    for heading in document.get("headings", []):
+        paragraphs.extend(heading.get("paragraphs", []))
+    return [{"text": link.get("text", ""), "target": link["target"]}
+            for paragraph in paragraphs for link in paragraph.get("links", [])]
+
+
+def internal_target(target: str, page: str):
+    """
+    Resolves a link target to a document page of the site.
+
+    Args:
+        target: The link target as written in the document.
+        page: The site path of the page the link is on.
+
+    Returns:
+        A (path, anchor) tuple with the normalized page path and the anchor
+        (or ""), or None for links outside the site's document pages.
+    """
+    parts = urlsplit(target)
+    if parts.scheme in ("http", "https"):
+        if parts.netloc.lower() not in SITE_HOSTS:
+            return None
+    elif parts.scheme or parts.netloc:
+        return None
+    path = urljoin(f"{page}/", parts.path) if parts.path else page
+    path = unquote(path).rstrip("/")
+    for index in ("/index.html", "/index"):
+        if path.endswith(index):
+            path = path[:-len(index)]
+    segments = path.split("/")
+    if len(segments) != 3 or segments[1] not in PAGE_SECTIONS or not segments[2]:
+        return None
+    return path, unquote(parts.fragment)
+
+
+class LinkChecker:
+    """
+    Validates the internal links of every parsed document against the corpus.
+
+    The pages and section anchors of all documents are kept in a link index
+    in the output directory. Documents are taken from the parse cache, and a
+    document's JSON is only read again when its parse cache hash or the JSON
+    file itself changed, so a check after an incremental build only
+    re-indexes the changed documents.
+    Every link is then resolved against the whole index in one pass, so links
+    broken by a change to another document are reported too.
+    """
+
+    def __init__(self, output_dir: str = "output"):
+        """
+        Args:
+            output_dir: The root output directory holding the parse cache.
+        """
+        self.output_dir = output_dir
+        self.path = os.path.join(output_dir, LINK_INDEX_NAME)
+        self.entries = self.__load()
+
+    def __load(self) -> dict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable link index {self.path}: {e}")
+        return {}
+
+    def update(self) -> int:
+        """
+        Brings the index up to date with the parse cache.
+
+        Returns:
+            The number of documents that were (re-)indexed.
+        """
+        cache = ParseCache(self.output_dir)
+        entries = {}
+        indexed = 0
+        for key, cached in cache.entries.items():
+            try:
+                stat = os.stat(cached["json"])
+            except OSError:
+                continue
+            signature = [stat.st_mtime_ns, stat.st_size]
+            entry = self.entries.get(key)
+            if (entry is not None and entry["hash"] == cached["hash"] and entry["json"] == cached["json"]
+                    and entry["stat"] == signature):
+                entries[key] = entry
+                continue
+            document = cu.read_json_file(cached["json"])
+            if document is None:
+                continue
+            page = page_path(document, os.path.splitext(os.path.basename(cached["json"]))[0])
+            entries[key] = {"hash": cached["hash"], "json": cached["json"], "stat": signature, "page": page,
+                            "anchors": document_anchors(document), "links": document_links(document)}
+            indexed += 1
+        self.entries = entries
+        return indexed
+
+    def save(self):
+        """Writes the index to disk atomically."""
+        os.makedirs(self.output_dir, exist_ok=True)
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=4, sort_keys=True)
+        os.replace(temp_path, self.path)
+
+    def broken_links(self) -> list:
+        """
+        Resolves every internal link of the index against its pages and anchors.
+
+        Returns:
+            One dictionary per broken link with the "document" JSON path, its
+            "page", the link "text" and "target" and the "reason": "missing
+            page" or "missing anchor".
+        """
+        anchors = {}
+        for entry in self.entries.values():
+            anchors.setdefault(entry["page"], set()).update(entry["anchors"])
+
+        broken = []
+        for key in sorted(self.entries):
+            entry = self.entries[key]
+            for link in entry["links"]:
+                resolved = internal_target(link["target"], entry["page"])
+                if resolved is None:
+                    continue
+                path, anchor = resolved
+                if path not in anchors:
+                    reason = "missing page"
+                elif anchor and anchor not in anchors[path]:
+                    reason = "missing anchor"
+                else:
+                    continue
+                broken.append({"document": entry["json"], "page": entry["page"], "text": link["text"],
+                               "target": link["target"], "reason": reason})
+        return broken
+
+    def check(self) -> dict:
+        """
+        Updates the index, validates every internal link, writes the report
+        to `<output_dir>/link_report.json` and prints the broken links.
+
+        Returns:
+            A summary with the number of "documents", of (re-)"indexed"
+            documents, of "links" and the "broken" links (see `broken_links`).
+        """
+        indexed = self.update()
+        self.save()
+        broken = self.broken_links()
+        summary = {"documents": len(self.entries), "indexed": indexed,
+                   "links": sum(len(entry["links"]) for entry in self.entries.values()), "broken": broken}
+        output_writer.write_text(os.path.join(self.output_dir, REPORT_NAME),
+                                 json.dumps(broken, indent=4, ensure_ascii=False))
+        self.print_summary(summary)
+        return summary
+
+    @staticmethod
+    def print_summary(summary: dict):
+        """Prints the link counts and every broken link."""
+        print(f"Checked {summary['links']} links in {summary['documents']} documents "
+              f"({summary['indexed']} re-indexed): {len(summary['broken'])} broken")
+        for link in summary["broken"]:
+            print(f"  {link['page']}: {link['target']} ({link['reason']}, \"{link['text']}\")")
@@ -0,0 +1,137 @@
+import json
+import os
+import shutil
+
+from lib.pug_gen.site_builder import MANIFEST_NAME
+from .journal import JOURNAL_NAME
+from .links import LINK_INDEX_NAME, REPORT_NAME
+from .parse_cache import CACHE_NAME, hash_file
+from utils.compression import MANIFEST_NAME as COMPRESSION_MANIFEST_NAME
+
+# Manifests are merged entry by entry instead of copied
+MANIFEST_NAMES = (CACHE_NAME, MANIFEST_NAME, COMPRESSION_MANIFEST_NAME, LINK_INDEX_NAME)
+
+# Per-run state that only makes sense for the shard that wrote it
+SKIPPED_NAMES = (JOURNAL_NAME, f"{JOURNAL_NAME}-wal", f"{JOURNAL_NAME}-shm", REPORT_NAME)
+
+# Manifest entry fields holding output paths
+PATH_FIELDS = ("json", "pages")
+
+
+def rebase_path(path: str, shard_dir: str, output_dir: str) -> str:
+    """
+    Rewrites an output path recorded by a shard to the same file in the merged tree.
+
+    Shards may have been built under any directory name and copied before
+    merging, so the path is matched by its longest suffix that exists in the
+    shard directory.
+
+    Args:
+        path: The path recorded in a shard manifest.
+        shard_dir: The shard output directory.
+        output_dir: The merged output directory.
+
+    Returns:
+        The path in the merged tree, or the path unchanged if the file is not
+        part of the shard.
+    """
+    parts = [part for part in os.path.normpath(path).split(os.sep) if part]
+    for start in range(len(parts)):
+        relative = os.path.join(*parts[start:])
+        if os.path.exists(os.path.join(shard_dir, relative)):
+            return os.path.join(output_dir, relative)
+    return path
+
+
+def merge_outputs(shard_dirs: list, output_dir: str) -> dict:
+    """
+    Merges the output trees of several shards of a batch build into one.
+
+    JSON documents, image stores and pages are copied into the
+    output directory. The parse cache and page build manifests are merged
+    entry by entry with their paths rewritten, so a later build in the merged
+    tree skips the documents the shards already produced. Run journals are
+    not merged.
+
+    Nothing is written if two shards produced different contents for the same
+    file or the same manifest entry.
+
+    Args:
+        shard_dirs: The output directories of the shards.
+        output_dir: The merged output directory.
+
+    Returns:
+        A summary with the number of "copied" and "unchanged" files and the
+        number of merged manifest "entries".
+
+    Raises:
+        ValueError: If the shards conflict.
+    """
+    files = {}
+    manifests = {}
+    conflicts = []
+    for shard_dir in shard_dirs:
+        for root, _, names in os.walk(shard_dir):
+            for name in sorted(names):
+                if name in SKIPPED_NAMES or name.endswith('.tmp'):
+                    continue
+                source = os.path.join(root, name)
+                relative = os.path.relpath(source, shard_dir)
+                if name in MANIFEST_NAMES:
+                    _merge_manifest(manifests.setdefault(relative, {}), source, shard_dir, output_dir, conflicts)
+                    continue
+                digest = hash_file(source)
+                if relative in files and files[relative][1] != digest:
+                    conflicts.append(f"{relative}: {files[relative][0]} and {source} differ")
+                    continue
+                files.setdefault(relative, (source, digest))
+
+    if conflicts:
+        raise ValueError("Cannot merge shards:\n  " + "\n  ".join(conflicts))
+
+    summary = {"copied": 0, "unchanged": 0, "entries": 0}
+    for relative, (source, digest) in sorted(files.items()):
+        destination = os.path.join(output_dir, relative)
+        if os.path.exists(destination) and hash_file(destination) == digest:
+            summary["unchanged"] += 1
+            continue
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        shutil.copy2(source, destination)
+        summary["copied"] += 1
+
+    for relative, entries in sorted(manifests.items()):
+        path = os.path.join(output_dir, relative)
+        merged = {}
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                merged = json.load(f)
+        merged.update(entries)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(merged, f, indent=4, sort_keys=True)
+        os.replace(temp_path, path)
+        summary["entries"] += len(entries)
+    return summary
+
+
+def _merge_manifest(merged: dict, path: str, shard_dir: str, output_dir: str, conflicts: list):
+    """Adds the rebased entries of a shard manifest, recording conflicting entries."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            entries = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        conflicts.append(f"{path}: unreadable manifest ({e})")
+        return
+    for key, entry in entries.items():
+        if isinstance(entry, dict):
+            entry = dict(entry)
+            for field in PATH_FIELDS:
+                if isinstance(entry.get(field), str):
+                    entry[field] = rebase_path(entry[field], shard_dir, output_dir)
+                elif isinstance(entry.get(field), list):
+                    entry[field] = [rebase_path(path, shard_dir, output_dir) for path in entry[field]]
+        if key in merged and merged[key] != entry:
+            conflicts.append(f"{path}: entry '{key}' differs from another shard")
+            continue
+        merged[key] = entry
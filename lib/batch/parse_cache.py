@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+
+CACHE_NAME = ".parse_cache.json"
+
+# The packages whose code decides what the JSON and pages of a document look like
+CODE_DIRS = (os.path.join("lib", "word_parser"), os.path.join("lib", "pug_gen"), "utils")
+
+_code_version = None
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    Hashes a file's contents in chunks.
+
+    Args:
+        path: The file to hash.
+        chunk_size: The number of bytes read at a time.
+
+    Returns:
+        The hex SHA-256 digest.
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def code_version() -> str:
+    """
+    Hashes the parser and page generator code, so cached outputs are
+    produced again whenever it changes. Computed once per process.
+
+    Returns:
+        The hex SHA-256 digest of every source file in `CODE_DIRS`.
+    """
+    global _code_version
+    if _code_version is None:
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        digest = hashlib.sha256()
+        for code_dir in CODE_DIRS:
+            directory = os.path.join(root, code_dir)
+            for name in sorted(os.listdir(directory)):
+                if name.endswith('.py'):
+                    digest.update(f"{code_dir}/{name}\0".encode('utf-8'))
+                    with open(os.path.join(directory, name), 'rb') as f:
+                        digest.update(f.read())
+        _code_version = digest.hexdigest()
+    return _code_version
+
+
+def parse_options(render: bool = True, output_format: str = "pug", highlight: bool = False,
+                  split_sections: bool = False, compress: bool = False) -> dict:
+    """
+    Returns the options a document was parsed with, as stored in its cache entry.
+
+    The page format and highlighting only matter when pages are rendered, so
+    a JSON-only lookup is satisfied by an entry with any page options.
+
+    Args:
+        render: Whether pages are rendered.
+        output_format: The page format.
+        highlight: Whether code blocks are highlighted with Pygments.
+        split_sections: Whether the split section JSON is written.
+        compress: Whether .gz/.br sidecars are written.
+    """
+    options = {"version": code_version(), "split_json": split_sections, "compress": compress}
+    if render:
+        options.update({"format": output_format, "highlight": highlight})
+    return options
+
+
+class ParseCache:
+    """
+    Remembers the content hash of every parsed document and where its outputs
+    were written, so unchanged documents are not parsed again.
+
+    Only the standard library is imported here so a cache hit never pays
+    for loading python-docx.
+    """
+
+    def __init__(self, output_dir: str = "output"):
+        """
+        Loads the cache stored in the output directory.
+
+        Args:
+            output_dir: The root output directory.
+        """
+        self.path = os.path.join(output_dir, CACHE_NAME)
+        self.entries = self.__load()
+        self.__stored = set()
+
+    def __load(self) -> dict:
+        if os.path.exists(self.path):
+            try:
+                with open(self.path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable parse cache {self.path}: {e}")
+        return {}
+
+    @staticmethod
+    def key(docx_path: str) -> str:
+        """Returns the cache key of a document, its lower-cased file name."""
+        return os.path.basename(docx_path).lower()
+
+    def lookup(self, docx_path: str, digest: str = None, options: dict = None):
+        """
+        Returns the cached entry of a document if it is still valid.
+
+        An entry is valid when the document hash matches, it was parsed with
+        the requested options and all its outputs still exist.
+
+        Args:
+            docx_path: The path to the .docx file.
+            digest: The document hash, if already computed.
+            options: The requested `parse_options`; each of them must match
+                the entry's.
+
+        Returns:
+            The entry dictionary, or None on a cache miss.
+        """
+        entry = self.entries.get(self.key(docx_path))
+        if entry is None:
+            return None
+        if entry["hash"] != (digest or hash_file(docx_path)):
+            return None
+        stored = entry.get("options", {})
+        if options and any(stored.get(name) != value for name, value in options.items()):
+            return None
+        if not all(os.path.exists(path) for path in [entry["json"], *entry.get("pages", [])]):
+            return None
+        return entry
+
+    def store(self, docx_path: str, digest: str, json_path: str, pages: list = (), options: dict = None):
+        """
+        Records the outputs of a parsed document.
+
+        Args:
+            docx_path: The path to the .docx file.
+            digest: The document hash.
+            json_path: Where the parsed JSON was saved.
+            pages: The rendered pages.
+            options: The `parse_options` the document was parsed with.
+        """
+        key = self.key(docx_path)
+        self.entries[key] = {"hash": digest, "json": json_path, "pages": list(pages), "options": options or {}}
+        self.__stored.add(key)
+
+    def save(self):
+        """
+        Writes the cache to disk atomically.
+
+        Entries stored by other processes since this cache was loaded are
+        kept, so concurrent batch workers do not drop each other's entries.
+        """
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        entries = self.__load()
+        entries.update({key: self.entries[key] for key in self.__stored if key in self.entries})
+        self.entries = entries
+        temp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.entries, f, indent=4, sort_keys=True)
+        os.replace(temp_path, self.path)
@@ -0,0 +1,108 @@
+import os
+import time
+from contextlib import nullcontext
+
+from lib.word_parser.word_doc_parser import WordDocParser
+from lib.pug_gen.pug_gen import Post_Generator, build_post_info
+from lib.pug_gen.highlight import get_highlighter
+from utils.data_saver import HEAD_NAME, DataSaver
+from .parse_cache import hash_file, parse_options
+
+
+def document_name(docx_path: str) -> str:
+    """Returns the file name of a document without its extension."""
+    return os.path.splitext(os.path.basename(docx_path))[0]
+
+
+def json_path_for(docx_path: str, output_dir: str) -> str:
+    """
+    Returns where the parsed JSON of a document is saved.
+
+    Args:
+        docx_path: The path to the .docx file.
+        output_dir: The root output directory.
+    """
+    return os.path.join(output_dir, "json", f"{document_name(docx_path).lower()}.json")
+
+
+def process_document(docx_path: str, output_dir: str = "output", render: bool = True, output_format: str = "pug", cache=None, profiler=None, digest: str = None, split_sections: bool = False,
+                     compressor=None, highlight: bool = False, parse_workers: int = None) -> dict:
+    """
+    Runs parse -> JSON -> page for one document without prompting.
+
+    Args:
+        docx_path: The path to the .docx file.
+        output_dir: The root output directory; JSON goes to `json/` and pages to `pug/`.
+        render: If False, stops after saving the JSON.
+        output_format: The page format passed to `Post_Generator`.
+        cache (ParseCache): If given, documents whose content, parse options
+            and outputs are unchanged are skipped, and new outputs are recorded (the caller saves
+            the cache).
+        profiler (StageProfiler): If given, each stage is profiled with it.
+        digest: The document hash, if already computed.
+        split_sections: If True, the JSON is also saved split into a head file
+            and one file per top-level section (see `DataSaver.save_sections`).
+        compressor (Compressor): If given, .gz/.br sidecars are written for the
+            JSON, images and pages; unchanged outputs of a cached document get
+            any sidecars they are missing.
+        highlight: If True, code blocks are highlighted with Pygments instead of
+            loading Prism in the browser.
+        parse_workers: If more than 1, a very large document is parsed in this
+            many processes (see `WordDocParser.extract_headings_parallel`).
+
+    Returns:
+        A dictionary with the "json" path, the "sections" head file (or
+        None), the rendered "pages", the
+        "timings" in seconds of the parse, save and render stages and whether
+        the result came from the cache ("cached").
+    """
+    timings = {}
+
+    output_file = json_path_for(docx_path, output_dir)
+    head_file = os.path.join(os.path.splitext(output_file)[0], HEAD_NAME) if split_sections else None
+    options = parse_options(render, output_format, highlight, split_sections, compressor is not None)
+    if cache is not None:
+        digest = digest or hash_file(docx_path)
+        entry = cache.lookup(docx_path, digest, options)
+        if entry and (entry["pages"] or not render) and (head_file is None or os.path.exists(head_file)):
+            if compressor is not None:
+                for path in [entry["json"], *entry["pages"]]:
+                    compressor.submit(path)
+            return {"json": entry["json"], "sections": head_file, "pages": entry["pages"], "timings": timings,
+                    "cached": True}
+
+    start = time.perf_counter()
+    with _stage(profiler, "parse"), WordDocParser(docx_path, output_dir, compressor=compressor) as parser:
+        data = parser.parse_document(interactive=False, workers=parse_workers)
+    timings["parse"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    with _stage(profiler, "save"):
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+        saver = DataSaver(data, output_file, compressor)
+        saver.save_to_json()
+        if split_sections:
+            saver.save_sections()
+    timings["save"] = time.perf_counter() - start
+
+    pages = []
+    if render:
+        start = time.perf_counter()
+        with _stage(profiler, "render"):
+            post_info = build_post_info(data, default_id=document_name(docx_path).lower())
+            output_root = os.path.join(output_dir, "pug")
+            generator = Post_Generator(post_type=post_info["type"], json_obj=post_info,
+                                       output_root=output_root, output_format=output_format,
+                                       compressor=compressor,
+                                       highlighter=get_highlighter(output_root) if highlight else None)
+        pages = generator.pages
+        timings["render"] = time.perf_counter() - start
+
+    if cache is not None:
+        cache.store(docx_path, digest, output_file, pages, options)
+    return {"json": output_file, "sections": head_file, "pages": pages, "timings": timings, "cached": False}
+
+
+def _stage(profiler, stage: str):
+    """Returns the profiling context of a stage, or a no-op without a profiler."""
+    return profiler.stage(stage) if profiler is not None else nullcontext()
@@ -0,0 +1,203 @@
+import os
+import time
+
+from utils.file_operations import output_writer
+from .journal import DONE, FAILED, Journal
+from .parse_cache import ParseCache, hash_file
+from .pipeline import document_name, process_document
+from .shard import shard_documents
+
+# Profiles go to a sibling of the output directory, so they are never published with it
+PROFILE_DIR_SUFFIX = "-profiles"
+
+
+def default_profile_dir(output_dir: str) -> str:
+    """Returns where profiles go by default: `<output_dir>-profiles`, next to the output directory."""
+    return os.path.normpath(os.path.abspath(output_dir)) + PROFILE_DIR_SUFFIX
+
+
+class BatchRunner:
+    """
+    Parses, saves and renders every document of an input directory.
+
+    Progress is recorded per document in a SQLite journal in the output
+    directory (see `Journal`). With `resume=True` a run picks up where an
+    interrupted one stopped: finished, unchanged documents are skipped and
+    failed ones are retried, with exponential backoff (see `Journal`), until
+    they have had `max_attempts` tries.
+
+    With `shard=(index, count)` only that share of the input directory is
+    processed (see `shard.partition`), so a corpus build can be split across
+    machines and their output directories combined with `merge_outputs`.
+
+    With `profile=True` each document that is actually processed gets one
+    cProfile profile per stage, written to `profile_dir` (by default
+    `<output_dir>-profiles`, outside the published output) as `.prof` files
+    (for `pstats`/snakeviz) and `.collapsed` stacks (for flamegraph.pl or
+    speedscope), and the hottest functions are reported in the summary.
+
+    Documents are processed one after another; with `parse_workers` a very
+    large document is itself parsed in that many processes (see
+    `WordDocParser.parse_document`).
+    """
+
+    def __init__(self, input_dir: str = "input_docs", output_dir: str = "output", output_format: str = "pug",
+                 force: bool = False, profile: bool = False, top: int = 10, resume: bool = False,
+                 max_attempts: int = 3, shard: tuple = None, split_sections: bool = False,
+                 compress: bool = False, highlight: bool = False, profile_dir: str = None,
+                 parse_workers: int = None):
+        """
+        Args:
+            input_dir: The directory holding the .docx files.
+            output_dir: The root output directory.
+            output_format: The page format passed to `Post_Generator`.
+            force: If True, documents are processed even if they are unchanged.
+            profile: If True, every processed document is profiled.
+            top: The number of hot functions and slow documents to report.
+            resume: If True, documents finished by an earlier run are skipped.
+            max_attempts: The number of times a failing document is tried.
+            shard: An (index, count) tuple selecting one shard of the input
+                directory, with 1 <= index <= count.
+            split_sections: If True, the JSON is also saved split by section.
+            compress: If True, .gz (and .br) sidecars are written for the outputs.
+            highlight: If True, code blocks are highlighted with Pygments.
+            profile_dir: Where profiles are written. Defaults to
+                `default_profile_dir(output_dir)`.
+            parse_workers: If more than 1, each very large document is parsed
+                in this many processes.
+        """
+        self.input_dir = input_dir
+        self.output_dir = output_dir
+        self.output_format = output_format
+        self.force = force
+        self.profile = profile
+        self.top = top
+        self.resume = resume
+        self.max_attempts = max_attempts
+        self.shard = shard
+        self.split_sections = split_sections
+        self.compress = compress
+        self.highlight = highlight
+        self.profile_dir = profile_dir or default_profile_dir(output_dir)
+        self.parse_workers = parse_workers
+
+    def documents(self) -> list:
+        """Returns the paths of the .docx files to process, sorted by name."""
+        documents = [os.path.join(self.input_dir, f) for f in sorted(os.listdir(self.input_dir))
+                     if f.endswith('.docx') and not f.startswith('~$')]
+        if self.shard:
+            documents = shard_documents(documents, *self.shard)
+        return documents
+
+    def run(self) -> dict:
+        """
+        Processes every unfinished document and prints the run summary.
+
+        Documents are claimed one at a time from the run journal, so several
+        runners (processes or machines sharing the output directory) can work
+        through the same input directory together.
+
+        Returns:
+            A dictionary with the "processed", "cached", "skipped" (finished by
+            an earlier run) and "failed" counts, the elapsed "seconds", the
+            "slowest" documents with their stage timings, the written
+            "profiles", the "hot_functions", the "files" written and left
+            unchanged and, when compressing, the "compression" totals.
+        """
+        cache = ParseCache(self.output_dir)
+        if self.force:
+            cache.entries.clear()
+        documents = {docx_path: hash_file(docx_path) for docx_path in self.documents()}
+        keys = {Journal.key(docx_path) for docx_path in documents}
+
+        summary = {"processed": 0, "cached": 0, "skipped": 0, "failed": 0, "seconds": 0.0,
+                   "slowest": [], "profiles": [], "hot_functions": []}
+        start = time.perf_counter()
+        files_before = output_writer.counts()
+        compressor = None
+        if self.compress:
+            from utils.compression import Compressor
+            compressor = Compressor(self.output_dir)
+        with Journal(self.output_dir) as journal:
+            journal.enqueue(documents, reset=not self.resume)
+            summary["skipped"] = journal.counts(keys)[DONE]
+            while True:
+                entry = journal.claim(keys, self.max_attempts)
+                if entry is None:
+                    # Failed documents with attempts left are retried once their backoff has passed
+                    wait = journal.next_retry(keys, self.max_attempts)
+                    if wait is None:
+                        break
+                    time.sleep(wait)
+                    continue
+                result = self.__process(journal, entry, cache, summary, compressor)
+                if result is None:
+                    continue
+                cache.save()
+                if result["cached"]:
+                    summary["cached"] += 1
+                    continue
+                summary["processed"] += 1
+                summary["slowest"].append({"document": entry["path"], "seconds": sum(result["timings"].values()),
+                                           "timings": result["timings"]})
+            summary["failed"] = journal.counts(keys)[FAILED]
+        if compressor is not None:
+            summary["compression"] = compressor.close()
+
+        summary["files"] = {key: count - files_before[key] for key, count in output_writer.counts().items()}
+        summary["seconds"] = time.perf_counter() - start
+        summary["slowest"] = sorted(summary["slowest"], key=lambda entry: entry["seconds"], reverse=True)[:self.top]
+        summary["hot_functions"] = sorted(summary["hot_functions"], key=lambda entry: entry["own_seconds"],
+                                          reverse=True)[:self.top]
+        self.print_summary(summary)
+        return summary
+
+    def __process(self, journal, entry, cache, summary, compressor):
+        """Processes one claimed document and records the outcome in the journal."""
+        docx_path = entry["path"]
+        profiler = None
+        if self.profile:
+            from utils.profiler import StageProfiler
+            profiler = StageProfiler(document_name(docx_path), self.profile_dir)
+        start = time.perf_counter()
+        try:
+            result = process_document(docx_path, self.output_dir, output_format=self.output_format,
+                                      cache=cache, profiler=profiler, digest=entry["hash"],
+                                      split_sections=self.split_sections, compressor=compressor,
+                                      highlight=self.highlight, parse_workers=self.parse_workers)
+        except Exception as e:
+            print(f"Failed to process {docx_path} (attempt {entry['attempts']} of {self.max_attempts}): {e}")
+            journal.fail(entry["key"], str(e), time.perf_counter() - start)
+            result = None
+        else:
+            outputs = [result["json"], *([result["sections"]] if result["sections"] else []), *result["pages"]]
+            journal.finish(entry["key"], outputs, time.perf_counter() - start)
+        finally:
+            if profiler is not None and profiler.profiles:
+                summary["profiles"].extend(profiler.save())
+                summary["hot_functions"].extend(
+                    dict(hot, document=docx_path) for hot in profiler.hot_functions(self.top))
+        return result
+
+    @staticmethod
+    def print_summary(summary: dict):
+        """Prints the counts, the slowest documents and the hottest functions of a run."""
+        print(f"Processed {summary['processed']} documents, {summary['cached']} unchanged, "
+              f"{summary['skipped']} already done, {summary['failed']} failed in {summary['seconds']:.2f}s")
+        if "files" in summary:
+            print(f"Wrote {summary['files']['written']} files, {summary['files']['skipped']} unchanged")
+        if "compression" in summary:
+            print(f"Compressed {summary['compression']['compressed']} files, "
+                  f"{summary['compression']['skipped']} unchanged")
+        if summary["slowest"]:
+            print("Slowest documents:")
+            for entry in summary["slowest"]:
+                stages = ", ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in entry["timings"].items())
+                print(f"  {entry['seconds'] * 1000:8.0f} ms  {entry['document']} ({stages})")
+        if summary["hot_functions"]:
+            print("Hot functions (own time):")
+            for entry in summary["hot_functions"]:
+                print(f"  {entry['own_seconds'] * 1000:8.1f} ms  {entry['calls']:>8} calls  "
+                      f"{entry['function']} [{os.path.basename(entry['document'])} {entry['stage']}]")
+        if summary["profiles"]:
+            print(f"Profiles written to {os.path.dirname(summary['profiles'][0])}")
@@ -0,0 +1,55 @@
+import os
+
+
+def parse_shard(value: str) -> tuple:
+    """
+    Parses a shard specification such as "2/4".
+
+    Args:
+        value: "<index>/<count>" with 1 <= index <= count.
+
+    Returns:
+        The (index, count) tuple.
+
+    Raises:
+        ValueError: If the specification is malformed or out of range.
+    """
+    index, _, count = value.partition("/")
+    if not (index.strip().isdigit() and count.strip().isdigit()):
+        raise ValueError(f"Invalid shard '{value}': expected <index>/<count>, e.g. 1/4")
+    index, count = int(index), int(count)
+    if not 1 <= index <= count:
+        raise ValueError(f"Invalid shard '{value}': the index must be between 1 and {count}")
+    return index, count
+
+
+def partition(paths: list, count: int, size=os.path.getsize) -> list:
+    """
+    Splits documents into `count` shards of about equal total size.
+
+    Documents are assigned largest first to the shard with the smallest total
+    so far (longest processing time first). Ties are broken by file name and
+    shard number, so every machine computes the same partition from the same
+    input set regardless of directory order or path prefixes.
+
+    Args:
+        paths: The document paths.
+        count: The number of shards.
+        size: Returns the size of a document.
+
+    Returns:
+        A list of `count` lists of paths, each sorted by file name.
+    """
+    shards = [[] for _ in range(count)]
+    totals = [0] * count
+    sized = sorted(((size(path), os.path.basename(path), path) for path in paths), key=lambda d: (-d[0], d[1]))
+    for file_size, _, path in sized:
+        target = min(range(count), key=lambda shard: (totals[shard], shard))
+        shards[target].append(path)
+        totals[target] += file_size
+    return [sorted(shard, key=os.path.basename) for shard in shards]
+
+
+def shard_documents(paths: list, index: int, count: int) -> list:
+    """Returns the documents of shard `index` (1-based) of `count`."""
+    return partition(paths, count)[index - 1]
@@ -0,0 +1,94 @@
+import os
+import time
+import zipfile
+
+
+class DocumentWatcher:
+    """
+    Polls an input directory and reports .docx files once they stop changing.
+
+    Word saves through temporary and lock files (`~$name.docx`) and may write
+    a document in several steps, so a change is only reported after the file
+    size and modification time have been stable for `debounce` seconds and the
+    file is a complete zip archive. Lock and temporary files are ignored.
+    """
+
+    def __init__(self, input_dir: str, on_change, interval: float = 0.25, debounce: float = 0.5):
+        """
+        Initializes the watcher with the current state of the directory, so
+        only documents saved after start-up are reported.
+
+        Args:
+            input_dir: The directory holding the .docx files.
+            on_change: Called with the path of every changed document.
+            interval: Seconds between directory scans.
+            debounce: Seconds a file must stay unchanged before it is reported.
+        """
+        self.input_dir = input_dir
+        self.on_change = on_change
+        self.interval = interval
+        self.debounce = debounce
+        self.__known = self.__scan()
+        self.__pending = {}
+
+    @staticmethod
+    def is_document(file_name: str) -> bool:
+        """Returns True for .docx files that are not Word lock or temp files."""
+        return file_name.lower().endswith('.docx') and not file_name.startswith(('~$', '.~'))
+
+    def __scan(self) -> dict:
+        """Returns the (mtime, size) signature of every document in the directory."""
+        signatures = {}
+        with os.scandir(self.input_dir) as entries:
+            for entry in entries:
+                if entry.is_file() and self.is_document(entry.name):
+                    stat = entry.stat()
+                    signatures[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return signatures
+
+    def poll(self, now: float = None) -> list:
+        """
+        Scans the directory once and reports the documents that settled.
+
+        Args:
+            now: The current monotonic time; defaults to `time.monotonic()`.
+
+        Returns:
+            The paths passed to `on_change` during this poll.
+        """
+        now = time.monotonic() if now is None else now
+        current = self.__scan()
+
+        for path, signature in current.items():
+            if self.__known.get(path) == signature:
+                continue
+            pending = self.__pending.get(path)
+            if pending is None or pending[0] != signature:
+                self.__pending[path] = (signature, now)
+
+        changed = []
+        for path, (signature, seen_at) in list(self.__pending.items()):
+            if path not in current:
+                del self.__pending[path]
+            elif now - seen_at >= self.debounce and zipfile.is_zipfile(path):
+                del self.__pending[path]
+                self.__known[path] = signature
+                changed.append(path)
+
+        for path in list(self.__known):
+            if path not in current:
+                del self.__known[path]
+
+        for path in changed:
+            self.on_change(path)
+        return changed
+
+    def run(self):
+        """Polls until interrupted with Ctrl+C."""
+        print(f"Watching {self.input_dir} for changes (Ctrl+C to stop)...")
+        try:
+            while True:
+                self.poll()
+                time.sleep(self.interval)
+        except KeyboardInterrupt:
+            print("Stopped watching.")
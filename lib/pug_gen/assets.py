@@ -0,0 +1,109 @@
+import os
+
+from .pug_manager import PRISM_CDN
+
+
+"""
+    Per-page asset selection: which Prism language components a page needs
+    and how many bytes the page and its assets weigh.
+"""
+
+# Names authors write after `language=` mapped to Prism component names
+PRISM_ALIASES = {
+    'c++': 'cpp', 'cplusplus': 'cpp', 'c#': 'csharp', 'cs': 'csharp',
+    'js': 'javascript', 'node': 'javascript', 'ts': 'typescript',
+    'py': 'python', 'python3': 'python', 'rb': 'ruby', 'golang': 'go',
+    'sh': 'bash', 'shell': 'bash', 'zsh': 'bash', 'ps': 'powershell',
+    'html': 'markup', 'xml': 'markup', 'svg': 'markup', 'yml': 'yaml',
+    'dockerfile': 'docker', 'md': 'markdown', 'text': 'none', 'plaintext': 'none',
+}
+
+# Components bundled in prism.min.js, never loaded separately
+PRISM_BUILTIN = {'markup', 'css', 'clike', 'javascript', 'none'}
+
+# Components that must be loaded before the key component
+PRISM_DEPENDENCIES = {
+    'cpp': ['c'],
+    'arduino': ['cpp'],
+    'objectivec': ['c'],
+    'scss': ['css'],
+    'jsx': ['markup', 'javascript'],
+    'tsx': ['jsx', 'typescript'],
+    'php': ['markup-templating'],
+    'django': ['markup-templating'],
+    'velocity': ['markup'],
+}
+
+
+def prism_language(language: str) -> str:
+    """
+    Normalizes a code block language to its Prism component name.
+
+    Args:
+        language: The language captured by the parser (may be empty).
+
+    Returns:
+        The Prism name, or "none" for code without a language.
+    """
+    language = language.strip().lower()
+    if not language:
+        return 'none'
+    return PRISM_ALIASES.get(language, language)
+
+
+def prism_components(languages: list) -> list:
+    """
+    Resolves the Prism components to load for a set of languages.
+
+    Dependencies come before the components that need them and components
+    bundled with the Prism core are left out.
+
+    Args:
+        languages: Prism language names in order of first use.
+
+    Returns:
+        The ordered list of components to include.
+    """
+    components = []
+
+    def add(language):
+        for dependency in PRISM_DEPENDENCIES.get(language, []):
+            add(dependency)
+        if language not in PRISM_BUILTIN and language not in components:
+            components.append(language)
+
+    for language in languages:
+        add(language)
+    return components
+
+
+def payload_size(pages: list, assets: list, asset_root: str = None) -> dict:
+    """
+    Measures what a browser downloads for one page.
+
+    Args:
+        pages: The rendered page files; the final one (HTML if written) is counted.
+        assets: The stylesheets and scripts the page includes.
+        asset_root: The directory local assets are served from, if available.
+
+    Returns:
+        A dictionary with the page bytes, the bytes of the local assets that
+        were found and the assets whose size is unknown (CDN or missing files).
+    """
+    page = next((p for p in pages if p.endswith('.html')), pages[-1])
+    asset_bytes = 0
+    unknown_assets = []
+    for asset in assets:
+        local_path = os.path.join(asset_root, asset.lstrip('/')) if asset_root else None
+        if local_path and not asset.startswith(PRISM_CDN) and os.path.isfile(local_path):
+            asset_bytes += os.path.getsize(local_path)
+        else:
+            unknown_assets.append(asset)
+
+    page_bytes = os.path.getsize(page)
+    return {
+        "page_bytes": page_bytes,
+        "asset_bytes": asset_bytes,
+        "total_bytes": page_bytes + asset_bytes,
+        "unknown_assets": unknown_assets,
+    }
@@ -0,0 +1,124 @@
+from .pug_manager import PugManager
+
+
+"""
+    Shared page chrome (nav bar, footer, head assets) that is identical on
+    every post. Each fragment is rendered once per indentation and arguments
+    and then reused for every page generated by the process.
+"""
+
+SOCIAL_LINKS = (
+    ("https://www.linkedin.com/in/devontaereid/", "/images/websites/linkedin.png"),
+    ("https://twitter.com/_yodev_", "/images/websites/twitter.png"),
+    ("https://github.com/y0dev", "/images/websites/github.png"),
+)
+
+
+def nav_bar(id_list, logo: str) -> list:
+    """Builds the site navigation bar."""
+    return [
+        f'{id_list[0]}div#nav-bar.navbar.header-content--mini',
+        f'{id_list[1]}nav',
+        f'{id_list[2]}div.main-menu',
+        f'{id_list[3]}a.menu-branding(href="/")',
+        f'{id_list[4]}img.menu-branding(src="{logo}" alt="branding-logo")',
+        f'{id_list[4]}h3 Devontae Reid',
+
+        # Menu List
+        f'{id_list[3]}ul.menu-list',
+        f'{id_list[4]}li',
+        f'{id_list[5]}a(href="/projects") Projects',
+        f'{id_list[4]}li',
+        f'{id_list[5]}a(href="/articles") Articles',
+        f'{id_list[4]}li',
+        f'{id_list[5]}a(href="/gospel") Gospel',
+        f'{id_list[4]}li',
+        f'{id_list[5]}button.display-switch ☀️',
+    ]
+
+
+def footer(id_list) -> list:
+    """Builds the footer with the social links and icon credits."""
+    lines = [
+        f'{id_list[0]}.footer',
+        f'{id_list[1]}.footer-container',
+        f'{id_list[2]}p Sola Scriptura ( Scripture Alone ), Solus Christus ( Christ Alone ), Sola fide ( Faith Alone ), Sola Gratia ( Grace Alone ), and Soli Deo Gloria ( Glory to God Alone )',
+        f'{id_list[2]}.socials',
+        f'{id_list[3]}ul',
+    ]
+    for href, image_src in SOCIAL_LINKS:
+        lines.extend([
+            f'{id_list[4]}li.social-links',
+            f'{id_list[5]}a(href="{href}")',
+            f'{id_list[6]}img(src="{image_src}")',
+        ])
+
+    # Copyright
+    lines.extend([
+        f'{id_list[2]}p.footer-small Icons provided by ',
+        f'{id_list[3]}a(href="https://www.flaticon.com/authors/freepik" title="Freepik") Freepik',
+    ])
+    return lines
+
+
+def head_assets(id_list, logo: str, meta_links: tuple, css_filename: str) -> list:
+    """
+    Builds the static head lines: favicon, site wide meta tags and stylesheet.
+
+    Head lines are not indented here; `PugManager.addHead` nests them.
+    """
+    lines = [PugManager.iconLine(logo)]
+    for key, value in meta_links:
+        lines.extend(PugManager.metaLines(key, value))
+    lines.append(PugManager.cssLine(css_filename))
+    return lines
+
+
+BUILDERS = {
+    "nav_bar": nav_bar,
+    "footer": footer,
+    "head_assets": head_assets,
+}
+
+
+class FragmentCache:
+    """
+    Memoizes rendered fragments by name, indentation and arguments.
+    """
+
+    def __init__(self):
+        self.__fragments = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, name: str, id_list, *args) -> tuple:
+        """
+        Returns a rendered fragment, building it on first use.
+
+        Args:
+            name: The fragment name (a key of `BUILDERS`).
+            id_list: The `indentList` the fragment is nested with.
+            *args: Hashable arguments passed on to the fragment builder.
+
+        Returns:
+            The fragment lines as a tuple.
+        """
+        key = (name, id_list.base, id_list.char) + args
+        fragment = self.__fragments.get(key)
+        if fragment is None:
+            fragment = tuple(BUILDERS[name](id_list, *args))
+            self.__fragments[key] = fragment
+            self.misses += 1
+        else:
+            self.hits += 1
+        return fragment
+
+    def clear(self):
+        """Drops every cached fragment."""
+        self.__fragments.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+# Shared by every Post_Generator in the process
+fragment_cache = FragmentCache()
@@ -0,0 +1,143 @@
+import hashlib
+import os
+
+try:
+    import pygments
+    from pygments.formatters import HtmlFormatter
+    from pygments.lexers import TextLexer, get_lexer_by_name
+    from pygments.util import ClassNotFound
+except ImportError:
+    pygments = None
+
+from utils.file_operations import output_writer
+
+from .assets import prism_language
+
+
+"""
+    Server-side syntax highlighting of code blocks.
+
+    Code is turned into Pygments token spans when the page is generated, so
+    highlighted pages need a stylesheet but no highlighting script.
+"""
+
+# Highlighted snippets are cached in this directory of the output root (the
+# parent of the page tree), next to the other caches, so it is never deployed
+CACHE_DIR = '.highlight_cache'
+
+# The stylesheet with the token colours, written to the root of the page tree
+STYLESHEET_NAME = 'highlight.css'
+
+DEFAULT_STYLE = 'default'
+
+
+class Highlighter:
+    """
+    Highlights code blocks to HTML spans with Pygments.
+
+    Results are cached on disk by code hash, language and Pygments version,
+    so an unchanged snippet is only highlighted once, across pages and runs.
+    """
+
+    def __init__(self, cache_dir: str, style: str = DEFAULT_STYLE):
+        """
+        Args:
+            cache_dir: The directory the highlighted snippets are cached in.
+            style: The Pygments style of the stylesheet.
+
+        Raises:
+            ValueError: If Pygments is not installed.
+        """
+        if pygments is None:
+            raise ValueError("Server-side highlighting needs the 'pygments' package: pip install pygments")
+        self.cache_dir = cache_dir
+        self.style = style
+        self.version = f'pygments-{pygments.__version__}'
+        self.hits = 0
+        self.misses = 0
+        self.__formatter = HtmlFormatter(nowrap=True)
+        self.__stylesheets = set()
+
+    def key(self, code: str, language: str) -> str:
+        """Returns the cache key of a snippet: a hash of the highlighter version, language and code."""
+        digest = hashlib.sha256(f'{self.version}\0{language.strip().lower()}\0'.encode('utf-8'))
+        digest.update(code.encode('utf-8'))
+        return digest.hexdigest()
+
+    def highlight(self, code: str, language: str) -> str:
+        """
+        Highlights a snippet, reusing the cached result if there is one.
+
+        Args:
+            code: The code, lines separated by newlines.
+            language: The language captured by the parser (may be empty).
+
+        Returns:
+            The HTML of the code, one line per code line, with every token
+            wrapped in a `span` whose class names its token type.
+        """
+        path = os.path.join(self.cache_dir, f'{self.key(code, language)}.html')
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                result = f.read()
+            self.hits += 1
+            return result
+        except OSError:
+            pass
+
+        result = pygments.highlight(code, self.__lexer(language), self.__formatter).rstrip('\n')
+        os.makedirs(self.cache_dir, exist_ok=True)
+        temp_path = f'{path}.{os.getpid()}.tmp'
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            f.write(result)
+        os.replace(temp_path, path)
+        self.misses += 1
+        return result
+
+    def write_stylesheet(self, directory: str) -> str:
+        """
+        Writes the token stylesheet to a directory once per highlighter.
+
+        Args:
+            directory: The root of the page tree.
+
+        Returns:
+            The file name of the stylesheet, relative to the directory.
+        """
+        if directory not in self.__stylesheets:
+            styles = HtmlFormatter(style=self.style).get_style_defs('.highlight')
+            output_writer.write_text(os.path.join(directory, STYLESHEET_NAME), f'{styles}\n')
+            self.__stylesheets.add(directory)
+        return STYLESHEET_NAME
+
+    @staticmethod
+    def __lexer(language: str):
+        """Finds the lexer of a language by its Pygments or Prism name, falling back to plain text."""
+        language = language.strip().lower()
+        for name in (language, prism_language(language)):
+            if not name or name == 'none':
+                continue
+            try:
+                return get_lexer_by_name(name)
+            except ClassNotFound:
+                continue
+        return TextLexer()
+
+
+# One highlighter per page tree, shared by every page the process renders
+_highlighters = {}
+
+
+def get_highlighter(output_root: str) -> Highlighter:
+    """
+    Returns the highlighter of a page tree, caching snippets in the
+    `CACHE_DIR` of the directory above it.
+
+    Args:
+        output_root: The root directory of the page tree.
+    """
+    highlighter = _highlighters.get(output_root)
+    if highlighter is None:
+        cache_dir = os.path.join(os.path.dirname(os.path.abspath(output_root)), CACHE_DIR)
+        highlighter = _highlighters[output_root] = Highlighter(cache_dir)
+    return highlighter
@@ -0,0 +1,226 @@
+import html
+import re
+
+from utils.file_operations import output_writer
+
+
+"""
+    Renders the Pug pages built by `PugManager` straight to static HTML.
+
+    Only the Pug subset emitted by this package is supported: tags with
+    id/class shorthands and quoted attributes, inline text, `#[...]` tag
+    interpolation, dot text blocks and the html doctype. Because the HTML is
+    produced from the same lines as `index.pug`, both backends always render
+    the same markup and the Node pug compile step can be skipped.
+"""
+
+VOID_ELEMENTS = {'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input',
+                 'link', 'meta', 'source', 'track', 'wbr'}
+
+TAG_PATTERN = re.compile(r'([A-Za-z][\w-]*)?((?:[#.][\w-]+)*)')
+SHORTHAND_PATTERN = re.compile(r'([#.])([\w-]+)')
+
+
+class HtmlRenderer:
+    """
+    Translates Pug lines to HTML, streaming the result to disk.
+    """
+
+    def __init__(self, lines: list):
+        """
+        Initializes the renderer.
+
+        Args:
+            lines: The Pug lines of a page, indented with tabs.
+        """
+        self.lines = lines
+
+    def render(self) -> str:
+        """Returns the whole page as an HTML string."""
+        return ''.join(self.iter_html())
+
+    def save(self, filename: str, compressor=None) -> str:
+        """
+        Writes the page to `filename` chunk by chunk. An unchanged page is
+        not rewritten.
+
+        Args:
+            filename: The path of the page.
+            compressor (Compressor): If given, the page is rendered at once and
+                handed to it for .gz/.br sidecars.
+
+        Returns:
+            The path of the written file.
+        """
+        if compressor is not None:
+            content = self.render().encode('utf-8')
+            output_writer.write_bytes(filename, content)
+            compressor.submit(filename, content)
+            return filename
+        output_writer.write_chunks(filename, self.iter_html())
+        return filename
+
+    def iter_html(self):
+        """
+        Yields the HTML of the page one element at a time.
+
+        Open elements are kept on a stack together with their indentation and
+        closed as soon as a line at the same or a shallower depth appears.
+        """
+        open_tags = []
+        text_block = None
+
+        for line in self.lines:
+            stripped = line.lstrip('\t')
+            depth = len(line) - len(stripped)
+            if text_block is not None:
+                if not stripped:
+                    # Blank lines inside a text block are kept as empty lines
+                    text_block[1].append('')
+                    continue
+                if depth > text_block[0]:
+                    text_block[1].append(line[text_block[0] + 1:])
+                    continue
+                yield self.__text_block(text_block[1])
+                text_block = None
+
+            if not stripped:
+                continue
+
+            while open_tags and open_tags[-1][0] >= depth:
+                yield f'</{open_tags.pop()[1]}>'
+
+            if stripped == 'doctype html':
+                yield '<!DOCTYPE html>'
+                continue
+            if stripped == '.':
+                text_block = (depth, [])
+                continue
+            if stripped.startswith('| '):
+                yield self.__text(stripped[2:])
+                continue
+
+            tag, attributes, rest = self.parse_tag(stripped)
+            yield self.__open_tag(tag, attributes)
+            if rest == '.':
+                text_block = (depth, [])
+            elif rest:
+                yield self.__text(rest)
+            if tag in VOID_ELEMENTS:
+                continue
+            open_tags.append((depth, tag))
+
+        if text_block is not None:
+            yield self.__text_block(text_block[1])
+        while open_tags:
+            yield f'</{open_tags.pop()[1]}>'
+
+    @staticmethod
+    def parse_tag(source: str):
+        """
+        Splits a Pug tag line into its tag name, attributes and trailing text.
+
+        Args:
+            source: The tag line without indentation.
+
+        Returns:
+            A tuple of (tag, attributes, rest) where `attributes` is a list of
+            (name, value) pairs and `rest` is the text after the tag, or "." for
+            a text block.
+        """
+        match = TAG_PATTERN.match(source)
+        tag = match.group(1) or 'div'
+        attributes = []
+        classes = [value for kind, value in SHORTHAND_PATTERN.findall(match.group(2)) if kind == '.']
+        ids = [value for kind, value in SHORTHAND_PATTERN.findall(match.group(2)) if kind == '#']
+        position = match.end()
+
+        if source.startswith('(', position):
+            parsed, position = HtmlRenderer.__parse_attributes(source, position + 1)
+            for name, value in parsed:
+                if name == 'class':
+                    classes.append(value)
+                else:
+                    attributes.append((name, value))
+
+        if ids:
+            attributes.insert(0, ('id', ids[-1]))
+        if classes:
+            attributes.insert(0, ('class', ' '.join(classes)))
+
+        rest = source[position:]
+        if rest == '.':
+            return tag, attributes, rest
+        return tag, attributes, rest[1:] if rest.startswith(' ') else rest
+
+    @staticmethod
+    def __parse_attributes(source: str, position: int):
+        """Parses `name="value"` pairs up to the closing parenthesis."""
+        attributes = []
+        while position < len(source) and source[position] != ')':
+            if source[position] in ' ,':
+                position += 1
+                continue
+            name_end = position
+            while source[name_end] not in '=) ,':
+                name_end += 1
+            name = source[position:name_end]
+            if source[name_end] != '=':
+                attributes.append((name, name))
+                position = name_end
+                continue
+            quote = source[name_end + 1]
+            value = []
+            position = name_end + 2
+            while source[position] != quote:
+                if source[position] == '\\':
+                    position += 1
+                value.append(source[position])
+                position += 1
+            attributes.append((name, ''.join(value)))
+            position += 1
+        return attributes, position + 1
+
+    @staticmethod
+    def __open_tag(tag: str, attributes: list) -> str:
+        rendered = ''.join(f' {name}="{html.escape(value)}"' for name, value in attributes)
+        return f'<{tag}{rendered}>'
+
+    def __text_block(self, lines: list) -> str:
+        """Renders the lines of a dot text block; trailing blank lines are dropped."""
+        while lines and not lines[-1]:
+            lines.pop()
+        return self.__text('\n'.join(lines))
+
+    def __text(self, text: str) -> str:
+        """Renders Pug plain text, expanding `#[...]` tag interpolation."""
+        output = []
+        position = 0
+        while position < len(text):
+            if text.startswith('\\#[', position) or text.startswith('\\#{', position):
+                output.append(text[position + 1:position + 3])
+                position += 3
+            elif text.startswith('#[', position):
+                end = self.__matching_bracket(text, position + 1)
+                tag, attributes, rest = self.parse_tag(text[position + 2:end])
+                output.append(self.__open_tag(tag, attributes))
+                output.append(self.__text(rest))
+                if tag not in VOID_ELEMENTS:
+                    output.append(f'</{tag}>')
+                position = end + 1
+            else:
+                output.append(text[position])
+                position += 1
+        return ''.join(output)
+
+    @staticmethod
+    def __matching_bracket(text: str, start: int) -> int:
+        depth = 0
+        for position in range(start, len(text)):
+            if text[position] == '[':
+                depth += 1
+            elif text[position] == ']':
+                depth -= 1
+                if depth == 0:
+                    return position
+        raise ValueError(f"Unclosed tag interpolation in: {text}")
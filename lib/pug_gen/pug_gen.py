@@ -1,6 +1,11 @@
+import html
+
 import utils.common_utils as cu
+from utils.toc import document_toc, iter_toc
 
 from .pug_manager import PugManager, indentList
+from .fragments import fragment_cache
+from .assets import prism_language, prism_components
 import re
 
 
@@ -8,8 +13,68 @@ import re
     This is for 
 """
 
+OUTPUT_FORMATS = ('pug', 'html', 'both')
+
+DEFAULT_IMAGE = {"name": "images/image.png", "alt": "image-title"}
+
+# Shared so indentation prefixes are computed once per process
+BODY_INDENT = indentList()
+
+
+def build_post_info(document: dict, default_id: str = '') -> dict:
+    """
+    Converts a document produced by `WordDocParser.parse_document` into the
+    post details `Post_Generator` renders.
+
+    Args:
+        document: The parsed document (as saved to `output/json`).
+        default_id: The id to use when the document has no `article-id`.
+
+    Returns:
+        A dictionary with the keys expected by `Post_Generator`.
+    """
+    metadata = document.get('metadata', {})
+    time_to_read = metadata.get('time_to_read', {})
+
+    content = []
+    if document.get('paragraphs'):
+        content.append({'title': None, 'paragraphs': document['paragraphs']})
+    anchors = [entry['anchor'] for entry in iter_toc(document_toc(document))]
+    for heading, anchor in zip(document.get('headings', []), anchors):
+        content.append({
+            'title': {'text': heading['text'], 'tag': _heading_tag(heading['level']), 'anchor': anchor},
+            'paragraphs': heading['paragraphs']
+        })
+
+    return {
+        'id': metadata.get('id') or default_id,
+        'type': metadata.get('type') or 'article',
+        'title': metadata.get('title', ''),
+        'description': metadata.get('description', ''),
+        'tags': metadata.get('tags', []),
+        'image': metadata.get('image', DEFAULT_IMAGE),
+        'date': metadata.get('date', '0'),
+        'time': {
+            'hours': time_to_read.get('hours', '0'),
+            'mins': time_to_read.get('minutes', '0'),
+            'secs': time_to_read.get('seconds', '0')
+        },
+        'content': content
+    }
+
+
+def _heading_tag(level: str) -> str:
+    """Maps a Word heading style ("Heading 1") to the section tag ("h2")."""
+    number = level.split()[-1] if level else ''
+    if not number.isdigit():
+        return 'h2'
+    return f'h{min(int(number) + 1, 6)}'
+
+
 class Post_Generator:
-    def __init__(self, title: str = 'Sample', description: str = 'Sample Description', post_type: str = 'article', json_obj: dict = {}) -> None:
+    def __init__(self, title: str = 'Sample', description: str = 'Sample Description', post_type: str = 'article', json_obj: dict = {}, output_root: str = 'output/pug', output_format: str = 'pug', compressor=None, highlighter=None) -> None:
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {output_format}, expected one of {OUTPUT_FORMATS}")
         if len(json_obj) == 0:
             post_page_filename = 'main.pug'
         else:
@@ -18,25 +83,35 @@ class Post_Generator:
         self.post_type = post_type
         if self.post_type.lower() == 'article':
             self.pm = PugManager(
-                output_path='output/pug/articles', filename=f'{post_page_filename}')
+                output_path=f'{output_root}/articles', filename=f'{post_page_filename}')
         else:
             self.pm = PugManager(
-                output_path='output/pug/notes', filename=f'{post_page_filename}')
+                output_path=f'{output_root}/notes', filename=f'{post_page_filename}')
 
         self.lines = []
         self.tags = []
-        self.id_list = indentList()
+        self.id_list = BODY_INDENT
         self.title = title
         self.description = description
         self.embedded = False
         self.languages = []
         self.code_script_added = False
+        # Highlights code blocks at generation time instead of loading Prism
+        self.highlighter = highlighter
+        self.output_root = output_root
         self.headshot = 'https://i.ibb.co/HY4dx9s/headshot.jpg'  # 'headshot.png'
         self.logo = '/images/logo.png'  # 'images/logo192.png'
         self.__getPostDetails(json_obj)
         self.__setupInitHead()
         self.__setupBody()
 
+        # Pages written by this generator, `index.pug` and/or `index.html`
+        self.pages = []
+        if output_format in ('pug', 'both'):
+            self.pages.append(self.pm.save(compressor))
+        if output_format in ('html', 'both'):
+            self.pages.append(self.pm.saveHtml(compressor))
+
     def __getPostDetails(self, json_obj: dict):
         if len(json_obj) == 0:
             self.post_time = 'Thursday, October 6, 2022'
@@ -61,72 +136,17 @@ class Post_Generator:
     # Helper
 
     def __setupInitHead(self):
-        meta_links = { 'twitter:card': 'summary_large_image', 'twitter:site': '@_yodev_',
-                      'og:url': 'https://www.devontaereid.com', 'og:type': 'website'}
+        meta_links = (('twitter:card', 'summary_large_image'), ('twitter:site', '@_yodev_'),
+                      ('og:url', 'https://www.devontaereid.com'), ('og:type', 'website'))
         self.pm.addTitle(self.title)
         self.pm.addDescription(self.description)
-        self.pm.addIcon(logo_filename='/images/logo.png')
         self.pm.addImage(
             f'https://www.devontaereid.com/{self.post_info["image"]["name"]}')
-        self.pm.addMeta(meta_links)
-        self.pm.addCSS()
+        self.pm.addHead(fragment_cache.get('head_assets', self.id_list, self.logo, meta_links, 'style.css'),
+                        assets=('/style.css',))
 
     def __addNavBar(self):
-        self.lines.append(
-            f'{self.id_list[0]}div#nav-bar.navbar.header-content--mini')
-        self.lines.append(f'{self.id_list[1]}nav')
-        self.lines.append(f'{self.id_list[2]}div.main-menu')
-        self.lines.append(f'{self.id_list[3]}a.menu-branding(href="/")')
-        self.lines.append(
-            f'{self.id_list[4]}img.menu-branding(src="{self.logo}" alt="branding-logo")')
-        self.lines.append(f'{self.id_list[4]}h3 Devontae Reid')
-
-        # Menu List
-        self.lines.append(f'{self.id_list[3]}ul.menu-list')
-        self.lines.append(f'{self.id_list[4]}li')
-        self.lines.append(f'{self.id_list[5]}a(href="/projects") Projects')
-        self.lines.append(f'{self.id_list[4]}li')
-        self.lines.append(f'{self.id_list[5]}a(href="/articles") Articles')
-        self.lines.append(f'{self.id_list[4]}li')
-        self.lines.append(f'{self.id_list[5]}a(href="/gospel") Gospel')
-        self.lines.append(f'{self.id_list[4]}li')
-        self.lines.append(f'{self.id_list[5]}button.display-switch ☀️')
-    
-
-    def __add_footer(self): 
-        """
-        Adds the footer section to the Pug file.
-        """
-        footer_content = [
-            f'{self.id_list[0]}.footer',
-            f'{self.id_list[1]}.footer-container',
-            f'{self.id_list[2]}p Sola Scriptura ( Scripture Alone ), Solus Christus ( Christ Alone ), Sola fide ( Faith Alone ), Sola Gratia ( Grace Alone ), and Soli Deo Gloria ( Glory to God Alone )',
-            f'{self.id_list[2]}.socials',
-            self.__create_social_link("linkedin", "https://www.linkedin.com/in/devontaereid/", "/images/websites/linkedin.png"),
-            self.__create_social_link("twitter", "https://twitter.com/_yodev_", "/images/websites/twitter.png"),
-            self.__create_social_link("github", "https://github.com/y0dev", "/images/websites/github.png"),
-            f'{self.id_list[2]}p.footer-small Icons provided by ',
-            f'{self.id_list[3]}a(href="https://www.flaticon.com/authors/freepik" title="Freepik") Freepik'
-        ]
-        self.lines.extend(footer_content)
-
-    def __create_social_link(self, platform: str, href: str, image_src: str):
-        """
-        Creates a social media link element for the Pug file.
-
-        Args:
-            platform: The name of the social media platform (e.g., "linkedin").
-            href: The URL of the social media profile.
-            image_src: The path to the social media platform icon image.
-
-        Returns:
-            A string representing the Pug code for the social media link.
-        """
-        return (
-            f'{self.id_list[4]}li.social-links\n'
-            f'{self.id_list[5]}a(href="{href}")\n'
-            f'{self.id_list[6]}img(src="{image_src}")'
-        )
+        self.lines.extend(fragment_cache.get('nav_bar', self.id_list, self.logo))
 
     def __add_post_tags(self):
         """
@@ -148,7 +168,6 @@ class Post_Generator:
         """
         time = self.post_info['time']
         timeStr = ''
-        print(f'Time {time}')
         if int(time['hours']) != 0:
             if int(time['hours']) == 1:
                 timeStr = '1 hour'
@@ -176,8 +195,12 @@ class Post_Generator:
     def __addJavascriptFiles(self):
         self.pm.addJavascriptFile(js_filename='scripts/main.js')
         if self.code_script_added:
-            self.pm.addJavascriptFile(js_filename='scripts/code_script.js')
-            self.pm.addPrismCode(self.languages)
+            if self.highlighter is None:
+                self.pm.addJavascriptFile(js_filename='scripts/code_script.js')
+                self.pm.addPrismCode(prism_components(self.languages))
+            else:
+                # Highlighted pages ship no highlighting scripts, only the token stylesheet
+                self.pm.addCSS(self.highlighter.write_stylesheet(self.output_root))
         self.pm.addBibleJavascriptFile()
 
     def __setupBody(self):
@@ -194,7 +217,7 @@ class Post_Generator:
             f'{self.id_list[4]}p.post-header-time {self.post_info["date"]}')
         self.lines.append(f'{self.id_list[4]}span.post-header-divider |')
 
-        self.__addReadTime(indent_level=4)
+        self.__add_read_time(indent_level=4)
         
         self.lines.append(
             f'{self.id_list[4]}button.post-header-shareButton#shareButton')
@@ -212,6 +235,7 @@ class Post_Generator:
         self.__addPostContent()
         self.__addFooter()
 
+        self.pm.addBody(self.lines)
         self.__addJavascriptFiles()
     
     def __addPostTags(self):
@@ -222,34 +246,94 @@ class Post_Generator:
     def __addPostContent(self):
         self.lines.append(f'{self.id_list[1]}div.post-content')
         for content in self.post_info['content']:
-            new_string = ''.join(c for c in content["title"]["text"] if c.isalnum() or c == ' ')
-            id_tag = f'{new_string.replace(" ","-").lower()}'
-            self.lines.append(f'{self.id_list[2]}div.post-section-container#{id_tag}')
-            self.lines.append(
-                f'{self.id_list[3]}{content["title"]["tag"]}.section-title {content["title"]["text"]}')
+            if content["title"] is None:
+                self.lines.append(f'{self.id_list[2]}div.post-section-container')
+            else:
+                self.lines.append(f'{self.id_list[2]}div.post-section-container#{content["title"]["anchor"]}')
+                self.lines.append(
+                    f'{self.id_list[3]}{content["title"]["tag"]}.section-title {self.__text(content["title"]["text"])}')
             for paragraph in content['paragraphs']:
                 self.__addContentParagraph(content, paragraph)
     
     def __addFooter(self):
-        self.lines.append(
-            f'{self.id_list[0]}.footer')
-        self.lines.append(f'{self.id_list[1]}.footer-container')
-        self.lines.append(f'{self.id_list[2]}p Sola Scriptura ( Scripture Alone ), Solus Christus ( Christ Alone ), Sola fide ( Faith Alone ), Sola Gratia ( Grace Alone ), and Soli Deo Gloria ( Glory to God Alone )')
-        self.lines.append(f'{self.id_list[2]}.socials')
-        self.lines.append(f'{self.id_list[3]}ul')
-        self.lines.append(f'{self.id_list[4]}li.social-links')
-        self.lines.append(f'{self.id_list[5]}a(href="https://www.linkedin.com/in/devontaereid/")')
-        self.lines.append(f'{self.id_list[6]}img(src="/images/websites/linkedin.png")')
-        self.lines.append(f'{self.id_list[4]}li.social-links')
-        self.lines.append(f'{self.id_list[5]}a(href="https://twitter.com/_yodev_")')
-        self.lines.append(f'{self.id_list[6]}img(src="/images/websites/twitter.png")')
-        self.lines.append(f'{self.id_list[4]}li.social-links')
-        self.lines.append(f'{self.id_list[5]}a(href="https://github.com/y0dev")')
-        self.lines.append(f'{self.id_list[6]}img(src="/images/websites/github.png")')
-
-        # Copyright
-        self.lines.append(f'{self.id_list[2]}p.footer-small Icons provided by ')
-        self.lines.append(f'{self.id_list[3]}a(href="https://www.flaticon.com/authors/freepik" title="Freepik") Freepik')
-    
-    def __addContentParagraph(self, content: dict, paragraph: str):
-        pass
+        self.lines.extend(fragment_cache.get('footer', self.id_list))
+
+    def __addContentParagraph(self, content: dict, paragraph: dict):
+        """
+        Adds one parsed paragraph with its lists, images and code blocks.
+
+        Args:
+            content: The section the paragraph belongs to.
+            paragraph: A paragraph entry produced by `WordDocParser`.
+        """
+        if paragraph.get('text'):
+            self.lines.append(f'{self.id_list[3]}p.section-text {self.__linkify(paragraph)}')
+        if paragraph.get('lists'):
+            self.__addList(paragraph['lists'], indent_level=3)
+        for image in paragraph.get('images', []):
+            src = f'/images/{self.post_info["id"]}/extracted_image_{int(image["id"])}.jpg'
+            self.lines.append(f'{self.id_list[3]}figure.section-image')
+            self.lines.append(f'{self.id_list[4]}img(src="{src}" alt="{self.__attr(image["caption"])}")')
+            if image['caption']:
+                self.lines.append(f'{self.id_list[4]}figcaption {self.__text(image["caption"])}')
+        for code_block in paragraph.get('code-blocks', []):
+            self.__addCodeBlock(code_block)
+
+    def __addList(self, items: list, indent_level: int):
+        self.lines.append(f'{self.id_list[indent_level]}ul.section-list')
+        for item in items:
+            self.lines.append(f'{self.id_list[indent_level + 1]}li {self.__text(item["text"])}')
+            if item.get('sublist'):
+                self.__addList(item['sublist'], indent_level + 2)
+
+    def __addCodeBlock(self, code_block: dict):
+        self.code_script_added = True
+        language = prism_language(code_block['language'])
+        if language not in self.languages:
+            self.languages.append(language)
+        if self.highlighter is not None:
+            # Pygments output is already HTML escaped; only Pug interpolation is escaped here
+            highlighted = self.highlighter.highlight('\n'.join(code_block['code']), code_block['language'])
+            self.lines.append(f'{self.id_list[3]}pre.section-code.highlight')
+            self.lines.append(f'{self.id_list[4]}code(class="language-{language}").')
+            for line in highlighted.split('\n'):
+                self.lines.append(f'{self.id_list[5]}{self.__escape_interpolation(line)}')
+            return
+        self.lines.append(f'{self.id_list[3]}pre.section-code')
+        self.lines.append(f'{self.id_list[4]}code(class="language-{language}").')
+        for line in '\n'.join(code_block['code']).split('\n'):
+            self.lines.append(f'{self.id_list[5]}{self.__escape(line)}')
+
+    def __linkify(self, paragraph: dict) -> str:
+        """Escapes the paragraph text and turns link texts into inline anchors."""
+        text = self.__escape(paragraph['text'])
+        for link in paragraph.get('links', []):
+            link_text = self.__escape(link['text'])
+            if link_text:
+                text = text.replace(link_text, f'#[a(href="{self.__attr(link["target"])}") {link_text}]', 1)
+        return self.__line_breaks(text)
+
+    @staticmethod
+    def __text(text: str) -> str:
+        """Escapes inline text, keeping soft line breaks on the same Pug line."""
+        return Post_Generator.__line_breaks(Post_Generator.__escape(text))
+
+    @staticmethod
+    def __line_breaks(text: str) -> str:
+        """Turns soft line breaks into `#[br]` so the next line is not read as a new tag."""
+        return text.replace('\n', '#[br]')
+
+    @staticmethod
+    def __escape(text: str) -> str:
+        """Escapes text so Pug emits it verbatim."""
+        return Post_Generator.__escape_interpolation(html.escape(text, quote=False))
+
+    @staticmethod
+    def __escape_interpolation(text: str) -> str:
+        """Escapes Pug interpolation in text that is already HTML."""
+        return text.replace('#{', '\\#{').replace('#[', '\\#[')
+
+    @staticmethod
+    def __attr(value: str) -> str:
+        """Escapes a value for use inside a double quoted Pug attribute."""
+        return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', ' ')
@@ -1,26 +1,57 @@
 from pathlib import Path
 
+from utils.file_operations import output_writer
+
+from .html_renderer import HtmlRenderer
+
+PRISM_CDN = 'https://cdnjs.cloudflare.com/ajax/libs/prism/1.29.0'
+
+
+class indentList:
+    """
+    Indentation prefixes for lines nested under the Pug ``body`` tag.
+
+    ``id_list[0]`` is the first level inside ``body``; every further index
+    adds one more tab.
+    """
+
+    def __init__(self, base: int = 2, char: str = '\t'):
+        self.base = base
+        self.char = char
+        self.__prefixes = {}
+
+    def __getitem__(self, level: int) -> str:
+        prefix = self.__prefixes.get(level)
+        if prefix is None:
+            prefix = self.__prefixes[level] = self.char * (self.base + level)
+        return prefix
+
+
 class PugManager:
     def __init__(self, output_path='output/', filename='main'):
         """
         Initializes a PugManager object.
 
+        The page is assembled in memory and only written to disk by `save`,
+        so adding tags does not re-read and rewrite the file each time.
+
         Args:
             output_path: The path to the output directory. Defaults to 'output/'.
             filename: The name of the output file. Defaults to 'main'.
         """
         self.filename = f"{output_path}/{filename}/index.pug"
-        Path(self.filename).parent.mkdir(parents=True, exist_ok=True) 
-
-        with open(self.filename, 'w') as f:
-            f.writelines([
-                'doctype html\n', 
-                'html(lang=\'en\')\n',
-                '\thead\n',
-                '\t\tmeta(charset="UTF-8")\n',
-                '\t\tmeta(name="viewport" content="width=device-width, initial-scale=1.0")\n',
-                '\tbody\n'
-            ])
+        self.lines = [
+            'doctype html',
+            'html(lang=\'en\')',
+            '\thead',
+            '\t\tmeta(charset="UTF-8")',
+            '\t\tmeta(name="viewport" content="width=device-width, initial-scale=1.0")',
+            '\tbody'
+        ]
+        # Number of lines already nested under each section tag
+        self.elements = {'head': 2, 'body': 0}
+        # Stylesheets and scripts the page includes, in page order
+        self.assets = []
 
     def __add_meta_tags(self, tag_name, content, properties=["og", "twitter"]):
         """
@@ -31,16 +62,11 @@ class PugManager:
             content: The content for the meta tag.
             properties: A list of property names (e.g., "og", "twitter").
         """
-        lines = []
-        for property in properties:
-            lines.append(f'meta(name="{tag_name}" property="{property}:{tag_name}" content="{content}")\n')
-        lines = self.__update_list_index(lines, 2) 
-        new_lines = self.__find_location_in_file('head', lines, after=self.elements['head'])
-        with open(self.filename, 'w') as f:
-            f.writelines(new_lines)
+        self.__insert_into_section('head', self.__update_list_index(self.metaLines(tag_name, content, properties), 2))
 
     def addTitle(self, title: str):
         """Adds a title meta tag to the Pug file."""
+        self.__insert_into_section('head', self.__update_list_index([f'title {title}'], 2))
         self.__add_meta_tags("title", title)
 
     def addDescription(self, description: str):
@@ -54,95 +80,135 @@ class PugManager:
     def addMeta(self, meta_tags: dict):
         """Adds custom meta tags to the Pug file."""
         for key, value in meta_tags.items():
-            self.__add_meta_tags(key, value) 
+            self.__add_meta_tags(key, value)
 
-    def __update_list_index(self, lines, index_offset):
+    def addIcon(self, logo_filename: str = '/images/logo.png'):
+        """Adds a favicon link to the head of the Pug file."""
+        self.__insert_into_section('head', self.__update_list_index([self.iconLine(logo_filename)], 2))
+
+    def addCSS(self, css_filename: str = 'style.css', parent: bool = False):
+        """Adds a stylesheet link to the head of the Pug file."""
+        self.__add_css_link(parent=parent, css_filename=css_filename)
+
+    def addJavascriptFile(self, js_filename: str = 'main.js', parent: bool = False):
+        """Adds a script include to the end of the body of the Pug file."""
+        self.__add_javascript_link(parent=parent, js_filename=js_filename)
+
+    def addPrismCode(self, components: list):
         """
-        Updates the index of lines in the Pug file.
+        Adds the Prism theme, core script and the given language components.
 
         Args:
-            lines: A list of lines to be inserted.
-            index_offset: The offset to be added to the line indices.
-
-        Returns:
-            A list of lines with updated indices.
+            components: The Prism components to load, dependencies first.
         """
-        for i in range(len(lines)):
-            lines[i] = lines[i].replace('\t', '\t' * (index_offset + 1))
-        return lines
+        theme = f'{PRISM_CDN}/themes/prism-tomorrow.min.css'
+        self.__insert_into_section('head', self.__update_list_index([f'link(rel="stylesheet" href="{theme}")'], 2))
+        self.assets.append(theme)
+        sources = [f'{PRISM_CDN}/prism.min.js']
+        sources.extend(f'{PRISM_CDN}/components/prism-{component}.min.js' for component in components)
+        scripts = [f'script(src="{source}")' for source in sources]
+        self.__insert_into_section('body', self.__update_list_index(scripts, 2))
+        self.assets.extend(sources)
+
+    def addBibleJavascriptFile(self):
+        """Adds the script that turns scripture references into verse popups."""
+        self.__add_javascript_link(js_filename='scripts/bible_verses.js')
 
-    def __find_location_in_file(self, tag, lines, after):
+    def addHead(self, lines: list, assets: tuple = ()):
         """
-        Finds the appropriate location to insert lines in the Pug file.
+        Appends lines to the head of the Pug file.
 
         Args:
-            tag: The tag to find (e.g., "head").
-            lines: A list of lines to be inserted.
-            after: The index of the line after which to insert the new lines.
+            lines: Pug lines without indentation, e.g. a cached fragment.
+            assets: The stylesheets or scripts the lines include.
+        """
+        self.__insert_into_section('head', self.__update_list_index(lines, 2))
+        self.assets.extend(assets)
 
-        Returns:
-            A list of lines with the new lines inserted.
+    def addBody(self, lines: list):
         """
-        with open(self.filename, 'r') as f:
-            file_lines = f.readlines()
+        Appends already indented lines to the body of the Pug file.
 
-        for i, line in enumerate(file_lines):
-            if line.strip() == tag:
-                file_lines[i+after:i+after] = lines
-                break
+        Args:
+            lines: Pug lines, each carrying its own indentation.
+        """
+        self.__insert_into_section('body', list(lines))
 
-        return file_lines
-    
-    def __update_list_index(self, lines, index_offset):
+    def getContent(self) -> str:
+        """Returns the Pug source of the page assembled so far."""
+        return '\n'.join(self.lines) + '\n'
+
+    def save(self, compressor=None):
         """
-        Updates the index of lines in the Pug file.
+        Writes the assembled page to `self.filename`, unless it is unchanged.
 
         Args:
-            lines: A list of lines to be inserted.
-            index_offset: The offset to be added to the line indices.
+            compressor (Compressor): If given, also writes .gz/.br sidecars.
 
         Returns:
-            A list of lines with updated indices.
+            The path of the written file.
         """
-        for i in range(len(lines)):
-            lines[i] = lines[i].replace('\t', '\t' * (index_offset + 1))
-        return lines
+        content = self.getContent().encode('utf-8')
+        output_writer.write_bytes(self.filename, content)
+        if compressor is not None:
+            compressor.submit(self.filename, content)
+        return self.filename
 
-    def __find_location_in_file(self, tag, lines, after=None):
+    def saveHtml(self, compressor=None):
         """
-        Finds the appropriate location to insert lines in the Pug file.
+        Renders the assembled page to static HTML next to `self.filename`.
 
         Args:
-            tag: The tag to find (e.g., "head").
-            lines: A list of lines to be inserted.
-            after: The index of the line after which to insert the new lines (optional).
+            compressor (Compressor): If given, also writes .gz/.br sidecars.
 
         Returns:
-            A list of lines with the new lines inserted.
+            The path of the written `index.html`.
         """
-        with open(self.filename, 'r') as f:
-            file_lines = f.readlines()
+        html_filename = str(Path(self.filename).with_suffix('.html'))
+        return HtmlRenderer(self.lines).save(html_filename, compressor)
 
-        for i, line in enumerate(file_lines):
-            if line.strip() == tag:
-                if after is not None:
-                    i += after + 1
-                file_lines[i:i] = lines
-                break
+    @staticmethod
+    def metaLines(tag_name: str, content: str, properties=["og", "twitter"]) -> list:
+        """Formats one meta tag per property, without indentation."""
+        return [f'meta(name="{tag_name}" property="{property}:{tag_name}" content="{content}")' for property in properties]
+
+    @staticmethod
+    def iconLine(logo_filename: str) -> str:
+        """Formats the favicon link, without indentation."""
+        return f'link(rel="icon" type="image/png" href="{logo_filename}")'
 
-        return file_lines
+    @staticmethod
+    def cssLine(css_filename: str, parent: bool = False) -> str:
+        """Formats a stylesheet link, without indentation."""
+        return f'link(rel="stylesheet" href="{("/../" if parent else "/")}{css_filename}")'
 
-    def __append_newline_char(self, lines):
+    def __update_list_index(self, lines, index_offset):
         """
-        Appends a newline character to each line in the list.
+        Indents lines so they nest under a section tag.
 
         Args:
-            lines: A list of lines.
+            lines: A list of lines to be inserted.
+            index_offset: The number of tabs to prefix each line with.
 
         Returns:
-            A list of lines with a newline character appended to each.
+            A list of lines with updated indentation.
+        """
+        return ['\t' * index_offset + line for line in lines]
+
+    def __insert_into_section(self, tag, lines):
+        """
+        Inserts lines after the last child of a section tag.
+
+        Args:
+            tag: The section tag (e.g., "head" or "body").
+            lines: A list of lines to be inserted.
         """
-        return [line + '\n' for line in lines]
+        for i, line in enumerate(self.lines):
+            if line.strip() == tag:
+                position = i + 1 + self.elements[tag]
+                self.lines[position:position] = lines
+                self.elements[tag] += len(lines)
+                break
 
     def __add_css_link(self, parent=False, css_filename='style.css'):
         """
@@ -152,11 +218,8 @@ class PugManager:
             parent: If True, the link will reference the CSS file in the parent directory.
             css_filename: The name of the CSS file.
         """
-        link = f'link(rel="stylesheet" href="{("/../" if parent else "/")}{css_filename}")\n'
-        lines = self.__update_list_index([link], 2)
-        new_lines = self.__find_location_in_file('head', lines, after=self.elements['head'])
-        with open(self.filename, 'w') as f:
-            f.writelines(new_lines)
+        self.__insert_into_section('head', self.__update_list_index([self.cssLine(css_filename, parent)], 2))
+        self.assets.append(f'{("/../" if parent else "/")}{css_filename}')
 
     def __add_javascript_link(self, parent=False, js_filename='main.js'):
         """
@@ -166,8 +229,6 @@ class PugManager:
             parent: If True, the link will reference the JS file in the parent directory.
             js_filename: The name of the JS file.
         """
-        link = f'script(type="text/javascript" src="{("/../" if parent else "/")}{js_filename}")\n'
-        lines = self.__update_list_index([link], 2)
-        new_lines = self.__find_location_in_file('body', lines, after=self.elements['body'])
-        with open(self.filename, 'w') as f:
-            f.writelines(new_lines)
\ No newline at end of file
+        link = f'script(type="text/javascript" src="{("/../" if parent else "/")}{js_filename}")'
+        self.__insert_into_section('body', self.__update_list_index([link], 2))
+        self.assets.append(f'{("/../" if parent else "/")}{js_filename}')
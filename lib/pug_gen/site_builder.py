@@ -0,0 +1,212 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import utils.common_utils as cu
+
+from .pug_gen import Post_Generator, build_post_info
+from .assets import payload_size
+from .highlight import get_highlighter
+
+MANIFEST_NAME = '.build_manifest.json'
+
+# Source files whose contents decide what a rendered page looks like
+TEMPLATE_SOURCES = ('pug_gen.py', 'pug_manager.py', 'fragments.py', 'html_renderer.py', 'assets.py',
+                    'highlight.py')
+
+
+def template_hash() -> str:
+    """
+    Hashes the template code so pages are re-rendered whenever it changes.
+
+    Returns:
+        The hex SHA-256 digest of all template source files.
+    """
+    digest = hashlib.sha256()
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    for source in TEMPLATE_SOURCES:
+        with open(os.path.join(package_dir, source), 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def render_page(json_path: str, output_root: str, output_format: str = 'pug', asset_root: str = None, highlight: bool = False) -> dict:
+    """
+    Renders the `index.pug` and/or `index.html` page for one parsed document.
+
+    Kept at module level so it can be shipped to worker processes.
+
+    Args:
+        json_path: The path to the parsed document JSON.
+        output_root: The root directory of the page tree.
+        output_format: "pug", "html" or "both".
+        asset_root: The directory local stylesheets and scripts are served from.
+        highlight: If True, code blocks are highlighted with Pygments instead of
+            loading Prism (see `Highlighter`).
+
+    Returns:
+        A dictionary with the rendered "pages", the page's "assets" and its
+        "payload" size (see `payload_size`).
+    """
+    document = cu.read_json_file(json_path)
+    if document is None:
+        raise ValueError(f"Could not load parsed document {json_path}")
+    default_id = os.path.splitext(os.path.basename(json_path))[0]
+    post_info = build_post_info(document, default_id=default_id)
+    generator = Post_Generator(post_type=post_info['type'], json_obj=post_info,
+                               output_root=output_root, output_format=output_format,
+                               highlighter=get_highlighter(output_root) if highlight else None)
+    return {
+        "pages": generator.pages,
+        "assets": generator.pm.assets,
+        "payload": payload_size(generator.pages, generator.pm.assets, asset_root)
+    }
+
+
+class SiteBuilder:
+    """
+    Renders a page tree from every parsed document in a JSON directory.
+
+    Pages are rendered in a pool of worker processes. A manifest in the
+    output directory records the input and template hashes of every page so
+    unchanged pages are skipped on the next build.
+    """
+
+    def __init__(self, json_dir: str = 'output/json', output_dir: str = 'output/pug', workers: int = None, force: bool = False, output_format: str = 'pug', asset_root: str = None, highlight: bool = False, compress: bool = False):
+        """
+        Initializes the SiteBuilder.
+
+        Args:
+            json_dir: The directory holding the parsed document JSON files.
+            output_dir: The root directory of the rendered page tree.
+            workers: The number of worker processes. Defaults to the CPU count;
+                1 renders in the current process.
+            force: If True, re-renders every page regardless of the manifest.
+            output_format: "pug" writes `index.pug` for the Node compiler, "html"
+                writes final `index.html` pages, "both" writes both.
+            asset_root: The directory local stylesheets and scripts are served
+                from, used to record each page's payload size.
+            highlight: If True, code blocks are highlighted at build time with
+                Pygments and pages load no Prism scripts.
+            compress: If True, .gz (and .br) sidecars are written for every
+                page, skipped ones included. The compression manifest is kept
+                in the parent of `output_dir`, next to that of the parse runs.
+        """
+        self.json_dir = json_dir
+        self.output_dir = output_dir
+        self.workers = workers or os.cpu_count() or 1
+        self.force = force
+        self.output_format = output_format
+        self.asset_root = asset_root
+        self.highlight = highlight
+        self.compress = compress
+        self.manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+        self.manifest = {} if force else (self.__load_manifest() or {})
+
+    def build(self) -> dict:
+        """
+        Renders all pages whose input JSON or template code changed.
+
+        Returns:
+            A summary with the rendered, skipped and failed page counts, the
+            elapsed time in seconds and, when compressing, the "compression"
+            totals.
+        """
+        start = time.perf_counter()
+        templates = template_hash()
+        summary = {"rendered": 0, "skipped": 0, "failed": 0, "seconds": 0.0, "payload_bytes": 0}
+
+        pending = {}
+        for name in sorted(os.listdir(self.json_dir)):
+            if not name.endswith('.json'):
+                continue
+            json_path = os.path.join(self.json_dir, name)
+            with open(json_path, 'rb') as f:
+                input_hash = hashlib.sha256(f.read()).hexdigest()
+            entry = self.manifest.get(name)
+            if (entry and entry["input"] == input_hash and entry["template"] == templates
+                    and entry.get("format") == self.output_format
+                    and entry.get("highlight", False) == self.highlight
+                    and all(os.path.exists(page) for page in entry["pages"])):
+                summary["skipped"] += 1
+                continue
+            pending[name] = (json_path, input_hash)
+
+        for name, result, error in self.__render_all(pending):
+            if error:
+                print(f"Failed to render {name}: {error}")
+                self.manifest.pop(name, None)
+                summary["failed"] += 1
+                continue
+            self.manifest[name] = {"input": pending[name][1], "template": templates,
+                                   "format": self.output_format,
+                                   "highlight": self.highlight, **result}
+            summary["rendered"] += 1
+            summary["payload_bytes"] += result["payload"]["total_bytes"]
+
+        self.__save_manifest()
+        if self.compress:
+            summary["compression"] = self.__compress_pages()
+        summary["seconds"] = time.perf_counter() - start
+        self.print_summary(summary)
+        return summary
+
+    def __render_all(self, pending: dict):
+        """Yields (name, result, error) for every pending page."""
+        if self.workers == 1 or len(pending) <= 1:
+            for name, (json_path, _) in pending.items():
+                try:
+                    yield name, render_page(json_path, self.output_dir, self.output_format, self.asset_root,
+                                            self.highlight), None
+                except Exception as e:
+                    yield name, None, e
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            futures = {
+                executor.submit(render_page, json_path, self.output_dir, self.output_format, self.asset_root,
+                                self.highlight): name
+                for name, (json_path, _) in pending.items()
+            }
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+
+    def __compress_pages(self) -> dict:
+        """Writes the sidecars of every page in the manifest that is new or changed."""
+        from utils.compression import Compressor
+        compressor = Compressor(os.path.dirname(os.path.abspath(self.output_dir)))
+        for entry in self.manifest.values():
+            for page in entry["pages"]:
+                compressor.submit(page)
+        return compressor.close()
+
+    def __load_manifest(self):
+        if not os.path.exists(self.manifest_path):
+            return None
+        return cu.read_json_file(self.manifest_path)
+
+    def __save_manifest(self):
+        os.makedirs(self.output_dir, exist_ok=True)
+        temp_path = f"{self.manifest_path}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(self.manifest, f, indent=4, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+
+    @staticmethod
+    def print_summary(summary: dict):
+        """Prints the page counts and timings of a build."""
+        total = summary["rendered"] + summary["skipped"] + summary["failed"]
+        print(f"Site build finished in {summary['seconds']:.2f}s: "
+              f"{summary['rendered']} rendered, {summary['skipped']} skipped, "
+              f"{summary['failed']} failed ({total} pages)")
+        if summary["rendered"]:
+            print(f"Average render time: {summary['seconds'] / summary['rendered'] * 1000:.1f} ms/page, "
+                  f"average payload: {summary['payload_bytes'] / summary['rendered'] / 1024:.1f} KiB/page")
+        if "compression" in summary:
+            print(f"Compressed {summary['compression']['compressed']} files, "
+                  f"{summary['compression']['skipped']} unchanged")
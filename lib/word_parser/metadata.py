@@ -0,0 +1,201 @@
+import posixpath
+import zipfile
+
+from lxml import etree
+
+from .package import open_source
+from .taxonomy import load_taxonomy
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+RELS_NAMESPACE = "http://schemas.openxmlformats.org/package/2006/relationships"
+OFFICE_DOCUMENT_TYPE = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+
+# The fields of the metadata block at the top of an article
+METADATA_FIELDS = ("id", "type", "title", "category", "description")
+
+# Text equivalents of the run content elements python-docx's `Run.text` reads
+RUN_TEXT = {"tab": "\t", "ptab": "\t", "cr": "\n", "noBreakHyphen": "-"}
+
+
+def empty_metadata() -> dict:
+    """Returns the metadata of a document before any field is read."""
+    return {"id": "", "type": "", "title": "", "description": ""}
+
+
+class MetadataCollector:
+    """
+    Picks the metadata fields out of a document's paragraphs:
+
+        article-id = my post
+        article-type = article
+        article-title = my post
+        article-category = embedded systems
+        description
+        <the description paragraph>
+    """
+
+    def __init__(self, metadata: dict):
+        """
+        Args:
+            metadata: The dictionary the fields are written to.
+        """
+        self.metadata = metadata
+        self.found = set()
+        self.__desc_start = False
+
+    @property
+    def complete(self) -> bool:
+        """True once every field of the metadata block has been read."""
+        return self.found.issuperset(METADATA_FIELDS)
+
+    @property
+    def expects_description(self) -> bool:
+        """True after a "description" paragraph, until the description itself is read."""
+        return self.__desc_start
+
+    @expects_description.setter
+    def expects_description(self, value: bool):
+        self.__desc_start = value
+
+    def fields(self) -> dict:
+        """Returns the fields read so far with their values, "category" with its "tags" and "image"."""
+        keys = []
+        for field in METADATA_FIELDS:
+            if field in self.found:
+                keys.extend(("category", "tags", "image") if field == "category" else (field,))
+        return {key: self.metadata[key] for key in keys}
+
+    def merge(self, fields: dict):
+        """
+        Takes over the fields read by another collector, as if its paragraphs
+        had been fed to this one.
+
+        Args:
+            fields: The fields returned by the other collector's `fields`.
+        """
+        self.metadata.update(fields)
+        self.found.update(field for field in METADATA_FIELDS if field in fields)
+
+    def feed(self, text: str) -> bool:
+        """
+        Reads a paragraph.
+
+        Args:
+            text: The text of a non-empty paragraph.
+
+        Returns:
+            True if the paragraph is part of the metadata block.
+        """
+        text = text.lower().strip()
+        if self.__desc_start:
+            self.metadata["description"] = text
+            self.__desc_start = False
+            self.found.add("description")
+            return True
+
+        if text.startswith("article-id"):
+            self.metadata["id"] = text.split("=")[1].strip().replace(" ","-")
+            self.found.add("id")
+            return True
+        elif text.startswith("article-category"):
+            category = text.split("=")[1].strip()
+            taxonomy = load_taxonomy()
+            if not taxonomy.is_known(category):
+                print(f"Unknown article-category '{category}' (not in {taxonomy.source}): "
+                      f"using the default tags and image")
+            self.metadata["category"] = category
+            self.metadata["tags"] = taxonomy.get_tags(category)
+            self.metadata["image"] = taxonomy.get_image(category)
+            self.found.add("category")
+            return True
+        elif text.startswith("article-type"):
+            self.metadata["type"] = text.split("=")[1].strip().lower()
+            self.found.add("type")
+            return True
+        elif text.startswith("article-title"):
+            self.metadata["title"] = text.split("=")[1].strip().title()
+            self.found.add("title")
+            return True
+        elif text.startswith("description"):
+            self.__desc_start = True
+            return True
+        return False
+
+
+def main_document_name(package: zipfile.ZipFile) -> str:
+    """Returns the zip member name of the main document part, found through the package relationships."""
+    try:
+        root = etree.fromstring(package.read("_rels/.rels"))
+    except KeyError:
+        return "word/document.xml"
+    for rel in root.iter(f"{{{RELS_NAMESPACE}}}Relationship"):
+        if rel.get("Type") == OFFICE_DOCUMENT_TYPE:
+            return posixpath.normpath(rel.get("Target").lstrip("/"))
+    return "word/document.xml"
+
+
+def _paragraph_text(paragraph) -> str:
+    """
+    Returns the text of a `w:p` element the way python-docx's `Paragraph.text`
+    reads it: only the runs of the paragraph and of its hyperlinks count, so
+    tab stops in `w:pPr` and text boxes nested in a run are left out.
+    """
+    parts = []
+    for run in paragraph.xpath("w:r | w:hyperlink/w:r", namespaces={"w": W_NAMESPACE}):
+        for element in run:
+            if not isinstance(element.tag, str):
+                continue
+            tag = etree.QName(element)
+            if tag.namespace != W_NAMESPACE:
+                continue
+            if tag.localname == "t":
+                parts.append(element.text or "")
+            elif tag.localname == "br":
+                # Only text wrapping breaks are text; page and column breaks are not
+                if element.get(f"{{{W_NAMESPACE}}}type", "textWrapping") == "textWrapping":
+                    parts.append("\n")
+            else:
+                parts.append(RUN_TEXT.get(tag.localname, ""))
+    return "".join(parts)
+
+
+def read_metadata(source) -> dict:
+    """
+    Reads only the metadata block of a document.
+
+    The main document XML is streamed from the package and parsing stops as
+    soon as every metadata field has been read, so the rest of the body, the
+    other parts and the media are never loaded. The fields are read the same
+    way as by `WordDocParser.parse_document` (without the date, word count and
+    reading time).
+
+    Args:
+        source: A file path, the document bytes or a seekable binary file.
+
+    Returns:
+        The metadata dictionary ("id", "type", "title", "description" and, if
+        set, "category" with its "tags" and "image").
+    """
+    fileobj, owned = open_source(source)
+    try:
+        with zipfile.ZipFile(fileobj) as package, package.open(main_document_name(package)) as stream:
+            collector = MetadataCollector(empty_metadata())
+            body = f"{{{W_NAMESPACE}}}body"
+            for _, element in etree.iterparse(stream, events=("end",)):
+                parent = element.getparent()
+                if parent is None or parent.tag != body:
+                    continue
+                if element.tag == f"{{{W_NAMESPACE}}}p":
+                    text = _paragraph_text(element)
+                    if text:
+                        collector.feed(text)
+                # Body elements are dropped once read, so memory stays flat
+                element.clear()
+                while element.getprevious() is not None:
+                    del parent[0]
+                if collector.complete:
+                    break
+            return collector.metadata
+    finally:
+        if owned:
+            fileobj.close()
@@ -0,0 +1,87 @@
+from lxml import etree
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+# Relationship type suffix of each notes part, the element holding one note
+# and the reference element that points at it from the body
+NOTE_PARTS = {
+    "footnotes": ("/footnotes", "footnote", "footnoteReference"),
+    "endnotes": ("/endnotes", "endnote", "endnoteReference"),
+    "comments": ("/comments", "comment", "commentReference"),
+}
+
+# Footnotes and endnotes of these types are separators, not notes
+SEPARATOR_TYPES = {"separator", "continuationSeparator", "continuationNotice"}
+
+
+def _w(tag: str) -> str:
+    return f"{{{W_NAMESPACE}}}{tag}"
+
+
+def _note_text(element) -> str:
+    """Returns the text of a note, one line per paragraph."""
+    paragraphs = ("".join(t.text or "" for t in p.iter(_w("t"))).strip() for p in element.iter(_w("p")))
+    return "\n".join(text for text in paragraphs if text)
+
+
+class NoteIndex:
+    """
+    The footnotes, endnotes and comments of a document, keyed by id.
+
+    Each notes part is parsed once when the index is built, so resolving the
+    references of a paragraph is a dictionary lookup per reference instead of
+    a search of the part XML.
+    """
+
+    def __init__(self, document_part):
+        """
+        Loads the notes parts related to the main document part.
+
+        Args:
+            document_part: The python-docx document part (`Document.part`).
+        """
+        self.notes = {kind: {} for kind in NOTE_PARTS}
+        self.__reference_kinds = {}
+        for rel in document_part.rels.values():
+            for kind, (reltype, note_tag, reference_tag) in NOTE_PARTS.items():
+                if rel.is_external or not rel.reltype.endswith(reltype):
+                    continue
+                self.notes[kind] = self.__load(rel.target_part.blob, note_tag)
+                self.__reference_kinds[_w(reference_tag)] = kind
+
+    @staticmethod
+    def __load(blob: bytes, note_tag: str) -> dict:
+        """Parses a notes part into a map of id -> note."""
+        notes = {}
+        for element in etree.fromstring(blob).iterchildren(_w(note_tag)):
+            if element.get(_w("type")) in SEPARATOR_TYPES:
+                continue
+            note = {"id": element.get(_w("id")), "text": _note_text(element)}
+            if element.get(_w("author")) is not None:
+                note["author"] = element.get(_w("author"))
+            notes[note["id"]] = note
+        return notes
+
+    def __bool__(self):
+        return bool(self.__reference_kinds)
+
+    def resolve(self, element) -> dict:
+        """
+        Resolves the note references inside a body element.
+
+        Args:
+            element: The lxml element of a paragraph.
+
+        Returns:
+            A dictionary of "footnotes", "endnotes" and/or "comments" lists in
+            reference order, with only the kinds that are referenced.
+        """
+        resolved = {}
+        if not self.__reference_kinds:
+            return resolved
+        for reference in element.iter(*self.__reference_kinds):
+            kind = self.__reference_kinds[reference.tag]
+            note = self.notes[kind].get(reference.get(_w("id")))
+            if note is not None:
+                resolved.setdefault(kind, []).append(note)
+        return resolved
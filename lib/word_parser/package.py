@@ -0,0 +1,122 @@
+import io
+import mmap
+import os
+import zipfile
+
+from utils.file_operations import output_writer
+
+MEDIA_PREFIX = "word/media/"
+
+# Media parts are copied out of the zip in chunks of this size
+CHUNK_SIZE = 1024 * 1024
+
+
+class BufferReader(io.RawIOBase):
+    """
+    A seekable, read-only file object over any buffer (bytes, bytearray,
+    memoryview or mmap) that reads slices of the buffer instead of copying it.
+    """
+
+    def __init__(self, buffer):
+        self.__view = memoryview(buffer).cast('B')
+        self.__position = 0
+
+    def readable(self):
+        return True
+
+    def seekable(self):
+        return True
+
+    def readinto(self, b):
+        end = min(self.__position + len(b), len(self.__view))
+        count = end - self.__position
+        b[:count] = self.__view[self.__position:end]
+        self.__position = end
+        return count
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.__position
+        elif whence == io.SEEK_END:
+            offset += len(self.__view)
+        self.__position = max(0, offset)
+        return self.__position
+
+    def tell(self):
+        return self.__position
+
+    def close(self):
+        self.__view.release()
+        super().close()
+
+
+def open_source(source):
+    """
+    Opens a document source as a seekable binary file object.
+
+    Args:
+        source: A file path, a bytes-like object or mmap, or an open binary file.
+
+    Returns:
+        A tuple of (file object, owned) where `owned` tells whether the caller
+        opened the file and must close it.
+
+    Raises:
+        PermissionError: If a file path cannot be opened due to permission issues.
+        TypeError: If the source is not a supported type.
+    """
+    if isinstance(source, (str, os.PathLike)):
+        try:
+            return open(source, 'rb'), True
+        except PermissionError:
+            raise PermissionError(f"Cannot open the file {source}. Check read-only permissions.")
+    if hasattr(source, 'read') and hasattr(source, 'seek') and not isinstance(source, mmap.mmap):
+        return source, False
+    try:
+        return BufferReader(source), True
+    except TypeError:
+        raise TypeError(f"Unsupported document source: {type(source).__name__}")
+
+
+def slim_package(package: zipfile.ZipFile, replace: dict = None) -> io.BytesIO:
+    """
+    Copies a .docx package without the contents of its media parts.
+
+    python-docx reads every part into memory when it opens a document. Giving
+    it this copy keeps embedded images out of memory; they are streamed from
+    the original package with `copy_member` instead.
+
+    Args:
+        package: The original .docx package.
+        replace: Optional new contents of some members, by member name.
+
+    Returns:
+        An in-memory .docx with empty media parts.
+    """
+    replace = replace or {}
+    slim = io.BytesIO()
+    with zipfile.ZipFile(slim, 'w', zipfile.ZIP_STORED) as target:
+        for info in package.infolist():
+            if info.filename in replace:
+                target.writestr(info.filename, replace[info.filename])
+            elif info.filename.startswith(MEDIA_PREFIX):
+                target.writestr(info.filename, b'')
+            else:
+                target.writestr(info.filename, package.read(info))
+    slim.seek(0)
+    return slim
+
+
+def copy_member(package: zipfile.ZipFile, member_name: str, destination: str, chunk_size: int = CHUNK_SIZE):
+    """
+    Streams a part of the package to a file in fixed-size chunks. A file that
+    already holds the same bytes is not rewritten.
+
+    Args:
+        package: The original .docx package.
+        member_name: The zip member name (e.g. "word/media/image1.png").
+        destination: The path of the file to write.
+        chunk_size: The number of bytes copied at a time.
+    """
+    with package.open(member_name) as source:
+        output_writer.copy_stream(destination, source, chunk_size)
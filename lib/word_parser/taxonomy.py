@@ -0,0 +1,131 @@
+import json
+import os
+import re
+from functools import lru_cache
+
+DEFAULT_TAXONOMY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "taxonomy.json")
+
+# Set to use a site specific taxonomy file instead of the bundled one
+TAXONOMY_ENV_VAR = "WORD_PARSER_TAXONOMY"
+
+
+def normalize_category(category: str) -> str:
+    """
+    Normalizes a category name for lookups: lower case, with hyphens,
+    underscores and repeated whitespace collapsed to single spaces.
+    """
+    return re.sub(r"[\s_-]+", " ", category).strip().lower()
+
+
+class Taxonomy:
+    """
+    Maps article categories and their aliases to tags and a hero image.
+
+    The mapping is read from a JSON config (see `taxonomy.json`) and validated
+    once when it is loaded; lookups are plain dict lookups on normalized keys
+    and are memoized for the lifetime of the object.
+    """
+
+    def __init__(self, config: dict, source: str = "<config>"):
+        """
+        Builds and validates the registry.
+
+        Args:
+            config: The parsed taxonomy config.
+            source: Where the config came from, used in error messages.
+
+        Raises:
+            ValueError: If the config is malformed, references an unknown image
+                or maps one name to two categories.
+        """
+        self.source = source
+        images = config.get("images", {})
+        for name, image in images.items():
+            if not isinstance(image, dict) or not {"name", "alt"} <= image.keys():
+                raise ValueError(f"{source}: image '{name}' needs a 'name' and an 'alt'")
+
+        default = config.get("default")
+        if not isinstance(default, dict) or "tags" not in default or "image" not in default:
+            raise ValueError(f"{source}: a 'default' entry with 'tags' and 'image' is required")
+        self.default = self.__build_entry("default", default, images, default=None)
+
+        self.__entries = {}
+        for category, settings in config.get("categories", {}).items():
+            entry = self.__build_entry(category, settings, images, default=self.default)
+            aliases = settings.get("aliases", [])
+            if not isinstance(aliases, list):
+                raise ValueError(f"{source}: aliases of '{category}' must be a list")
+            for name in [category, *aliases]:
+                key = normalize_category(name)
+                if key in self.__entries:
+                    raise ValueError(f"{source}: '{name}' is used by more than one category")
+                self.__entries[key] = entry
+        self.__memo = {}
+
+    def __build_entry(self, category, settings, images, default):
+        if not isinstance(settings, dict):
+            raise ValueError(f"{self.source}: category '{category}' must be an object")
+        tags = settings.get("tags", default["tags"] if default else None)
+        if not isinstance(tags, (list, tuple)) or not all(isinstance(tag, str) for tag in tags):
+            raise ValueError(f"{self.source}: tags of '{category}' must be a list of strings")
+        image_name = settings.get("image")
+        if image_name is None and default:
+            image = default["image"]
+        elif image_name in images:
+            image = images[image_name]
+        else:
+            raise ValueError(f"{self.source}: category '{category}' uses unknown image '{image_name}'")
+        return {"category": category, "tags": tuple(tags), "image": dict(image)}
+
+    def is_known(self, category: str) -> bool:
+        """Returns True if the category or one of its aliases is configured."""
+        return normalize_category(category) in self.__entries
+
+    def lookup(self, category: str) -> dict:
+        """
+        Returns the taxonomy entry of a category, or the default entry for
+        categories that are not configured.
+
+        Args:
+            category: The `article-category` value of a document.
+
+        Returns:
+            A dictionary with the canonical "category", its "tags" (tuple) and "image".
+        """
+        entry = self.__memo.get(category)
+        if entry is None:
+            entry = self.__entries.get(normalize_category(category), self.default)
+            self.__memo[category] = entry
+        return entry
+
+    def get_tags(self, category: str) -> list:
+        """Returns a new list of the category's tags."""
+        return list(self.lookup(category)["tags"])
+
+    def get_image(self, category: str) -> dict:
+        """Returns a copy of the category's hero image."""
+        return dict(self.lookup(category)["image"])
+
+
+@lru_cache(maxsize=None)
+def load_taxonomy(path: str = None) -> Taxonomy:
+    """
+    Loads and validates a taxonomy config once per process.
+
+    Args:
+        path: The config file. Defaults to `$WORD_PARSER_TAXONOMY` or the
+            bundled `taxonomy.json`.
+
+    Returns:
+        The shared `Taxonomy`.
+
+    Raises:
+        ValueError: If the config cannot be read or is invalid.
+    """
+    path = path or os.environ.get(TAXONOMY_ENV_VAR) or DEFAULT_TAXONOMY_PATH
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        raise ValueError(f"Cannot load taxonomy {path}: {e}")
+    return Taxonomy(config, source=path)
@@ -1,42 +1,91 @@
+import copy
 import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
 from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.table import Table
+from docx.text.paragraph import Paragraph
 from lxml import etree
 import utils.common_utils as comm_utils
-from utils.time_to_read import TimeToRead
-from .tags import Tags
-from .image import Image
+from utils.time_to_read import TimeToRead, count_words
+from utils.toc import build_toc, heading_anchors, heading_level
+from .package import open_source, slim_package, copy_member
+from .notes import NOTE_PARTS, NoteIndex
+from .metadata import MetadataCollector, empty_metadata, main_document_name
+
+W_NAMESPACE = "http://schemas.openxmlformats.org/wordprocessingml/2006/main"
+
+# A parallel parse only splits the body into chunks of at least this many
+# paragraphs and tables; smaller documents are parsed serially
+MIN_CHUNK_BLOCKS = 500
+
+# The body is split into up to this many chunks per worker, to even out sections of different sizes
+CHUNKS_PER_WORKER = 4
+
+
+def _parse_chunk(package: bytes, images: list) -> dict:
+    """Parses one chunk of a document in a worker process (see `WordDocParser.parse_chunk`)."""
+    with WordDocParser(package, "", name="chunk") as parser:
+        return parser.parse_chunk(images)
+
 
 class WordDocParser:
     """
     This class parses a Word document (.docx) and extracts specific data.
     """
 
-    def __init__(self, file_path, output_dir):
+    def __init__(self, file_path, output_dir, words_per_minute=250, code_words_per_minute=100, name=None,
+                 compressor=None):
         """
-        Initializes the WordDocParser object with the file path.
+        Initializes the WordDocParser object with the document source.
+
+        Nothing is written to `output_dir` until images are extracted.
 
         Args:
-            file_path (str): The path to the Word document (.docx) file.
+            file_path (str | bytes | file-like | mmap): The path to the Word document (.docx)
+                file, its bytes, a memory map of it or a seekable binary file object.
+            output_dir (str): The directory extracted images are written under.
+            words_per_minute (int): The prose reading rate used for the reading time.
+            code_words_per_minute (int): The reading rate used for code blocks.
+            name (str): The document name used for its output directory. Defaults to the
+                file name without extension, or "document" for in-memory sources.
+            compressor (Compressor): If given, extracted images are handed to it
+                for .gz/.br sidecars.
 
         Raises:
             PermissionError: If the file cannot be opened due to permission issues.
         """
-        self.file_path = file_path
-        file_name, _ = os.path.splitext(os.path.basename(file_path)) 
-        self.output_dir = os.path.join(output_dir, file_name)
-        os.makedirs(self.output_dir.lower() , exist_ok=True)  # Create the output directory if it doesn't exist
-        try:
-            self.document = Document(file_path)
-        except PermissionError:
-            raise PermissionError(f"Cannot open the file {file_path}. Check read-only permissions.")
-        self.__desc_start = False
+        self.file_path = file_path if isinstance(file_path, (str, os.PathLike)) else None
+        if name is None:
+            source_name = self.file_path or getattr(file_path, "name", None)
+            name = os.path.splitext(os.path.basename(source_name))[0] if isinstance(source_name, str) else "document"
+        self.output_dir = os.path.join(output_dir, name)
+        self.__source, self.__owns_source = open_source(file_path)
+        # Media parts are streamed from this package, the slim copy is parsed
+        self.__package = zipfile.ZipFile(self.__source)
+        self.document = Document(slim_package(self.__package))
+        # Footnotes, endnotes and comments, parsed once and looked up by id
+        self.__notes = NoteIndex(self.document.part)
         self.__code_start = False
-        self.__word_count = 0
+        self.__current_heading = None
+        # Paragraphs and tables parsed before the first heading
+        self.__leading_blocks = 0
+        # How many chunks of a parallel parse were merged from the workers or re-parsed here
+        self.chunks = {"parallel": 0, "serial": 0}
+        self.words_per_minute = words_per_minute
+        self.compressor = compressor
+        self.code_words_per_minute = code_words_per_minute
+        # Word counts of the section being parsed; each heading holds its own
+        self.__intro_word_count = {"text": 0, "code": 0}
+        self.__word_count = self.__intro_word_count
         self.data = {
-            "metadata": {"id":"","type":"","title":"", "description":""},
+            "metadata": empty_metadata(),
             "headings": [],
             "paragraphs" : []
         }
+        # Reads the article-id/type/title/category and description paragraphs
+        self.__metadata = MetadataCollector(self.data["metadata"])
 
     def extract_headings(self):
         """
@@ -50,25 +99,54 @@ class WordDocParser:
         representing the paragraph data. This dictionary is then appended either to
         the current heading's "paragraphs" list (if inside a heading) or to the main
         "paragraphs" list in the `data` dictionary.
+
+        Words are counted in the same pass, per heading, and include lists,
+        captions and table text; code lines are counted separately. Footnotes,
+        endnotes and comments referenced by a heading or paragraph are attached
+        to it as "footnotes", "endnotes" and "comments" lists. Finally every
+        heading gets a unique "anchor" and the table of contents is stored as
+        "toc".
         """
-        current_heading = None
-        for paragraph in self.document.paragraphs:
+        self.__extract_blocks(self.document.iter_inner_content())
+        self.__finish_headings()
+
+    def __extract_blocks(self, blocks):
+        """
+        Parses body paragraphs and tables in document order, continuing from
+        the state left by the blocks before them.
+
+        Args:
+            blocks: The `Paragraph` and `Table` objects to parse.
+        """
+        for paragraph in blocks:
+            if isinstance(paragraph, Table):
+                if self.__current_heading is None:
+                    self.__leading_blocks += 1
+                self.__word_count["text"] += self.__count_table_words(paragraph)
+                continue
             if not paragraph.text: continue
             
-            if self.__update_metadata(paragraph):
+            if self.__metadata.feed(paragraph.text):
                 continue
 
             if paragraph.style.name.startswith('Heading'):
                 current_heading = {
                     "text": paragraph.text.strip(),
                     "level": paragraph.style.name,
-                    "paragraphs": []
+                    "paragraphs": [],
+                    "word_count": {"text": count_words(paragraph.text), "code": 0}
                 }
+                current_heading.update(self.__notes.resolve(paragraph._p))
+                self.__word_count = current_heading["word_count"]
                 self.data["headings"].append(current_heading)
+                self.__current_heading = current_heading
             else:
+                if self.__current_heading is None:
+                    self.__leading_blocks += 1
                 paragraph_data = {
                     "text": paragraph.text.strip()
                 }
+                paragraph_data.update(self.__notes.resolve(paragraph._p))
                 self.__extract_formatted_phrases(paragraph, paragraph_data)
                 self.__extract_links(paragraph, paragraph_data)
                 found_list = self.extract_lists(paragraph, paragraph_data)
@@ -77,15 +155,52 @@ class WordDocParser:
 
                 if found_code:
                     continue
+                self.__word_count["text"] += count_words(paragraph.text)
                 if not found_list and not found_image:
-                    self.__word_count += len(paragraph.text.strip())
-                    if current_heading:
-                        current_heading["paragraphs"].append(paragraph_data)
+                    if self.__current_heading:
+                        self.__current_heading["paragraphs"].append(paragraph_data)
                     else:
                         comm_utils.ensure_key_exists_list(self.data, "paragraphs")
                         self.data["paragraphs"].append(paragraph_data)
-        time_to_read = TimeToRead(self.__word_count)
+
+    def __finish_headings(self):
+        """Stores the word count and reading time and builds the table of contents."""
+        word_count = self.__total_word_count()
+        self.data["metadata"]["word_count"] = word_count
+        time_to_read = TimeToRead(word_count["text"], word_count["code"],
+                                  self.words_per_minute, self.code_words_per_minute)
         self.data["metadata"]["time_to_read"] = time_to_read.get_time_as_obj()
+        self.__build_toc()
+
+    def __build_toc(self):
+        """
+        Gives every heading a unique "anchor" and stores the hierarchical
+        table of contents (see `utils.toc.build_toc`) as "toc".
+        """
+        for heading, anchor in zip(self.data["headings"], heading_anchors(self.data["headings"])):
+            heading["anchor"] = anchor
+        self.data["toc"] = build_toc(self.data["headings"])
+
+    def __total_word_count(self):
+        """
+        Sums the per-section word counts.
+
+        Returns:
+            dict: The prose ("text") and "code" word counts of the whole document.
+        """
+        total = dict(self.__intro_word_count)
+        for heading in self.data["headings"]:
+            total["text"] += heading["word_count"]["text"]
+            total["code"] += heading["word_count"]["code"]
+        return total
+
+    @staticmethod
+    def __count_table_words(table):
+        """Counts the words of every paragraph inside a table."""
+        words = 0
+        for para in table._element.iter(f"{{{W_NAMESPACE}}}p"):
+            words += count_words("".join(t.text or "" for t in para.iter(f"{{{W_NAMESPACE}}}t")))
+        return words
 
     def __extract_formatted_phrases(self, paragraph, paragraph_data):
         """
@@ -197,21 +312,21 @@ class WordDocParser:
                 if last_list:
                     if indent_level > last_list["indent_level"]:
                         comm_utils.ensure_key_exists_list(last_list, "sublist")
-                        last_list["sublist"].append({
+                        last_list["sublist"].append(self.__with_notes({
                             "text": list_text,
                             "indent_level": indent_level
-                        })
+                        }, paragraph_data))
                     else:
-                        last_list_container["lists"].append({
+                        last_list_container["lists"].append(self.__with_notes({
                             "text": list_text,
                             "indent_level": indent_level
-                        })
+                        }, paragraph_data))
                 else:
                     comm_utils.ensure_key_exists_list(last_list_container, "lists")
-                    last_list_container["lists"].append({
+                    last_list_container["lists"].append(self.__with_notes({
                         "text": list_text,
                         "indent_level": indent_level
-                    })
+                    }, paragraph_data))
             else:
                 comm_utils.ensure_key_exists_list(paragraph_data, "lists")
                 paragraph_data["lists"].append({
@@ -220,6 +335,16 @@ class WordDocParser:
                 })
             return True
         return False
+
+    @staticmethod
+    def __with_notes(entry, paragraph_data):
+        """
+        Copies the footnotes, endnotes and comments resolved for a paragraph
+        onto the list item or image entry that is stored in its place.
+        """
+        entry.update({kind: paragraph_data[kind] for kind in NOTE_PARTS if kind in paragraph_data})
+        return entry
+
     def __extract_images_from_para(self, paragraph, paragraph_data):
 
         last_list_container = None
@@ -232,10 +357,11 @@ class WordDocParser:
             for image in self.data["images"]:
                 if image["caption"] == paragraph.text.strip():
                     if last_list_container:
-                        last_list_container["images"].append({
+                        comm_utils.ensure_key_exists_list(last_list_container, "images")
+                        last_list_container["images"].append(self.__with_notes({
                             "id": image["id"],
                             "caption": image["caption"]
-                        })
+                        }, paragraph_data))
                     else:
                         comm_utils.ensure_key_exists_list(paragraph_data, "images")
                         paragraph_data["images"].append({
@@ -267,20 +393,23 @@ class WordDocParser:
             self: An instance of the class responsible for document processing.
         """
 
-        # Create output directory for extracted images (if it doesn't exist)
         output_dir = os.path.join(self.output_dir, "images")
-        os.makedirs(output_dir, exist_ok=True)
 
         # Extract embedded images
         for i, shape in enumerate(self.document.inline_shapes):
+            # Create output directory for extracted images (if it doesn't exist)
+            if i == 0:
+                os.makedirs(output_dir, exist_ok=True)
+
             # Get image data and related part
             image_data = shape._inline.graphic.graphicData.pic.blipFill.blip.embed
             image_part = self.document.part.related_parts[image_data]
 
-            # Save image to a file
+            # Stream the image from the package to a file
             image_filename = os.path.join(output_dir, f"extracted_image_{i + 1}.jpg")
-            with open(image_filename, "wb") as f:
-                f.write(image_part.blob)
+            copy_member(self.__package, image_part.partname.lstrip("/"), image_filename)
+            if self.compressor is not None:
+                self.compressor.submit(image_filename)
 
             # Find corresponding caption (if any)
             caption = ""
@@ -322,6 +451,7 @@ class WordDocParser:
                             last_code_blocks["language"] = text.split("=")[1].lower()
                         else:
                             last_code_blocks["code"].append(text)
+                            self.__word_count["code"] += count_words(text)
                         return True
             else:
                 if text.lower() == "code-start":
@@ -336,44 +466,126 @@ class WordDocParser:
         return False
 
 
-    def __update_metadata(self, paragraph):
+    def parse_chunk(self, images=None):
         """
-        Private helper function to update the metadata dictionary based on specific keywords.
+        Parses the body of this document as one chunk of a larger document.
 
-        This function avoids code duplication and improves readability by encapsulating the logic
-        for updating metadata based on keywords within paragraphs.
+        `parse_document` runs this in worker processes on packages holding one
+        chunk of the body each. The chunk is parsed as if it started a
+        document; the result tells the caller whether that matches a serial
+        parse, which holds when the chunk starts with a heading and the
+        previous chunk left no code block or description open.
 
         Args:
-            paragraph (docx.paragraph.Paragraph): A paragraph object from the Word document.
+            images (list): The images of the whole document, for their captions.
+
+        Returns:
+            dict: The chunk's "headings", the metadata "fields" it read, the
+            number of "leading" paragraphs and tables parsed before its first
+            heading and the "state" left open at its end.
         """
-        text = paragraph.text.lower().strip()
-        if self.__desc_start:
-            self.data["metadata"]["description"] = text
-            self.__desc_start = False
-            return True
+        if images:
+            self.data["images"] = images
+        self.__extract_blocks(self.document.iter_inner_content())
+        return {
+            "headings": self.data["headings"],
+            "fields": self.__metadata.fields(),
+            "leading": self.__leading_blocks,
+            "state": {"code": self.__code_start, "description": self.__metadata.expects_description},
+        }
 
-        if text.startswith("article-id"):
-            self.data["metadata"]["id"] = text.split("=")[1].strip().replace(" ","-")
-            return True
-        elif text.startswith("article-category"):
-            tags = Tags(text.split("=")[1].strip())
-            image = Image(text.split("=")[1].strip())
-            self.data["metadata"]["category"] = text.split("=")[1].strip()
-            self.data["metadata"]["tags"] = tags.get_tag_list()
-            self.data["metadata"]["image"] = image.get_image()
-            return True
-        elif text.startswith("article-type"):
-            self.data["metadata"]["type"] = text.split("=")[1].strip().lower()
-            return True
-        elif text.startswith("article-title"):
-            self.data["metadata"]["title"] = text.split("=")[1].strip().title()
-            return True
-        elif text.startswith("description"):
-            self.__desc_start = True
-            return True
-        return False
-    
-    def parse_document(self):
+    def extract_headings_parallel(self, workers):
+        """
+        Does the work of `extract_headings` for a very large document in
+        several processes.
+
+        After a scan of the paragraph styles the body is split at top-level
+        headings into chunks, which are parsed in a process pool while this
+        process parses the first one. The results are merged in document
+        order. A chunk that does not start a section cleanly (see
+        `parse_chunk`), or that follows a chunk ending inside a code block or
+        before a description, is parsed again here from the merged state, so
+        the result is exactly that of `extract_headings`.
+
+        Args:
+            workers (int): The number of worker processes.
+        """
+        chunks = self.__split_body(workers)
+        if len(chunks) < 2:
+            self.extract_headings()
+            return
+        body = self.document._body
+        document_name = main_document_name(self.__package)
+        with ProcessPoolExecutor(max_workers=min(workers, len(chunks) - 1)) as pool:
+            futures = [pool.submit(_parse_chunk, self.__chunk_package(document_name, chunk), self.data.get("images"))
+                       for chunk in chunks[1:]]
+            self.__extract_blocks(self.__blocks(body, chunks[0]))
+            for chunk, future in zip(chunks[1:], futures):
+                result = future.result()
+                if result["leading"] or self.__code_start or self.__metadata.expects_description:
+                    self.__extract_blocks(self.__blocks(body, chunk))
+                    self.chunks["serial"] += 1
+                else:
+                    self.__merge_chunk(result)
+                    self.chunks["parallel"] += 1
+        self.__finish_headings()
+
+    def __split_body(self, workers):
+        """
+        Splits the body paragraphs and tables into chunks that start at top-level headings.
+
+        Returns:
+            list: The chunks as lists of body elements, in document order.
+        """
+        blocks = list(self.document.element.body.iterchildren(f"{{{W_NAMESPACE}}}p", f"{{{W_NAMESPACE}}}tbl"))
+        heading_styles = {style.style_id: heading_level(style.name) for style in self.document.styles
+                          if style.type == WD_STYLE_TYPE.PARAGRAPH and (style.name or "").startswith("Heading")}
+        levels = [heading_styles.get(block.style) if block.tag == f"{{{W_NAMESPACE}}}p" else None
+                  for block in blocks]
+        top_level = min((level for level in levels if level is not None), default=None)
+        if top_level is None:
+            return [blocks]
+        chunk_size = max(MIN_CHUNK_BLOCKS, -(-len(blocks) // (workers * CHUNKS_PER_WORKER)))
+        chunks = []
+        start = 0
+        for index, level in enumerate(levels):
+            if level == top_level and index - start >= chunk_size:
+                chunks.append(blocks[start:index])
+                start = index
+        chunks.append(blocks[start:])
+        return chunks
+
+    @staticmethod
+    def __blocks(body, elements):
+        """Wraps body elements the way `iter_inner_content` does."""
+        for element in elements:
+            yield Table(element, body) if element.tag == f"{{{W_NAMESPACE}}}tbl" else Paragraph(element, body)
+
+    def __chunk_package(self, document_name, elements):
+        """
+        Builds a slim copy of the package whose body holds only some elements.
+
+        Returns:
+            bytes: The .docx package, with every other part unchanged.
+        """
+        root = self.document.element
+        document = etree.Element(root.tag, attrib=dict(root.attrib), nsmap=root.nsmap)
+        body = etree.SubElement(document, root.body.tag)
+        body.extend(copy.deepcopy(element) for element in elements)
+        xml = etree.tostring(document, xml_declaration=True, encoding="UTF-8", standalone=True)
+        return slim_package(self.__package, {document_name: xml}).getvalue()
+
+    def __merge_chunk(self, result):
+        """Appends a chunk parsed by a worker and takes over the state it ended in."""
+        self.data["headings"].extend(result["headings"])
+        self.__metadata.merge(result["fields"])
+        if result["headings"]:
+            self.__current_heading = self.data["headings"][-1]
+            self.__word_count = self.__current_heading["word_count"]
+        self.__code_start = result["state"]["code"]
+        self.__metadata.expects_description = result["state"]["description"]
+
+    def parse_document(self, interactive=True, workers=None):
         """
         The main method to initiate the parsing process.
 
@@ -381,16 +593,37 @@ class WordDocParser:
         `extract_formatted_phrases`, and `extract_lists` to extract the desired data.
         Returns the extracted data stored in the `data` dictionary.
 
+        Args:
+            interactive (bool): If True, asks whether to enter the post date by hand.
+                Otherwise the file creation time is used without prompting.
+            workers (int): If more than 1, very large documents are parsed in this
+                many processes (see `extract_headings_parallel`).
+
         Returns:
             dict: A dictionary containing extracted information from the document.
         """
         self.__extract_images()
-        self.extract_headings()
+        if workers and workers > 1:
+            self.extract_headings_parallel(workers)
+        else:
+            self.extract_headings()
         timestamp = None
-        if comm_utils.confirm_update("Do you want to update the list of choices?"):
+        if interactive and comm_utils.confirm_update("Do you want to update the list of choices?"):
             timestamp = comm_utils.get_user_date() 
-        else:
+        elif self.file_path:
             timestamp = comm_utils.get_file_creation_time(self.file_path)
         self.data["metadata"]["date"] = str(comm_utils.generate_timestamp_millis(timestamp))
 
         return self.data
+
+    def close(self):
+        """Closes the document package and the source file if the parser opened it."""
+        self.__package.close()
+        if self.__owns_source:
+            self.__source.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
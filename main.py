@@ -1,6 +1,22 @@
 import os
-from lib.word_parser.word_doc_parser import WordDocParser
-from utils.data_saver import DataSaver
+import sys
+import time
+import argparse
+
+# Heavy modules (python-docx, lxml, the parser and generators) are imported
+# inside the commands that need them, so help, listing and cache hits start fast.
+
+def list_docx_files(input_dir):
+  """
+  Lists the .docx files in a directory, skipping Word lock files.
+
+  Args:
+    input_dir: The path to the input directory.
+
+  Returns:
+    The sorted .docx file names.
+  """
+  return sorted(f for f in os.listdir(input_dir) if f.endswith('.docx') and not f.startswith('~$'))
 
 def select_docx_file(input_dir):
   """
@@ -13,7 +29,7 @@ def select_docx_file(input_dir):
     The path to the selected .docx file, or None if no .docx files are found.
   """
 
-  docx_files = [f for f in os.listdir(input_dir) if f.endswith('.docx')]
+  docx_files = list_docx_files(input_dir)
 
   if not docx_files:
     print(f"No .docx files found in {input_dir}")
@@ -33,29 +49,397 @@ def select_docx_file(input_dir):
     except ValueError:
       print("Invalid input. Please enter a number.")
 
-if __name__ == "__main__":
+def run_interactive(input_dir="input_docs", output_dir="output"):
+  """
+  Parses a document picked from the input directory and saves it as JSON.
+
+  Args:
+    input_dir: The directory holding the .docx files.
+    output_dir: The root output directory.
+  """
+  selected_file = select_docx_file(input_dir)
 
-    # Example Usage
-    input_dir = "input_docs"  # Replace with the actual input directory path
-    selected_file = select_docx_file(input_dir)
+  if selected_file:
+    print(f"Selected file: {selected_file}")
+  else:
+    sys.exit(1)
 
-    if selected_file:
-      print(f"Selected file: {selected_file}") 
-    else:
-      exit(1)
-      
-    # Extract the filename without extension
-    file_name, _ = os.path.splitext(os.path.basename(selected_file)) 
+  from lib.word_parser.word_doc_parser import WordDocParser
+  from utils.data_saver import DataSaver
 
-    # Create the output file path
-    output_dir = "output"
-    os.makedirs(output_dir, exist_ok=True)  # Create the output directory if it doesn't exist
-    output_file = os.path.join(output_dir,"json", f"{file_name.lower()}.json") 
+  # Extract the filename without extension
+  file_name, _ = os.path.splitext(os.path.basename(selected_file))
 
-    print(f"Output file: {output_file}") 
+  # Create the output file path
+  os.makedirs(os.path.join(output_dir, "json"), exist_ok=True)  # Create the output directories if they don't exist
+  output_file = os.path.join(output_dir, "json", f"{file_name.lower()}.json")
 
-    parser = WordDocParser(selected_file, output_dir)
+  print(f"Output file: {output_file}")
+
+  with WordDocParser(selected_file, output_dir) as parser:
     extracted_data = parser.parse_document()
 
-    saver = DataSaver(extracted_data, output_file)
-    saver.save_to_json()
+  saver = DataSaver(extracted_data, output_file)
+  saver.save_to_json()
+
+def list_documents(args):
+  """
+  Prints the documents in the input directory.
+
+  Args:
+    args: The parsed `list` command line arguments.
+  """
+  docx_files = list_docx_files(args.input_dir)
+  if not docx_files:
+    print(f"No .docx files found in {args.input_dir}")
+  if not args.metadata:
+    for file_name in docx_files:
+      print(file_name)
+    return
+
+  import json
+  from lib.word_parser.metadata import read_metadata
+
+  for file_name in docx_files:
+    try:
+      metadata = read_metadata(os.path.join(args.input_dir, file_name))
+    except Exception as e:
+      print(f"Failed to read {file_name}: {e}", file=sys.stderr)
+      continue
+    print(json.dumps({"file": file_name, **metadata}, ensure_ascii=False))
+
+def parse(args):
+  """
+  Parses one document without prompting, skipping it if the parse cache
+  shows its content, options and outputs are unchanged.
+
+  Args:
+    args: The parsed `parse` command line arguments.
+  """
+  from lib.batch.parse_cache import ParseCache, hash_file, parse_options
+  from utils.data_saver import HEAD_NAME
+
+  cache = ParseCache(args.output_dir)
+  if args.force:
+    cache.entries.pop(cache.key(args.file), None)
+  else:
+    options = parse_options(not args.no_render, args.format, args.highlight, args.split_json, args.compress)
+    entry = cache.lookup(args.file, hash_file(args.file), options)
+    if entry and args.split_json and not os.path.exists(os.path.join(os.path.splitext(entry["json"])[0], HEAD_NAME)):
+      entry = None
+    if entry and (entry["pages"] or args.no_render):
+      if args.compress:
+        # Sidecars deleted or outdated since the last run are written again
+        from utils.compression import stale_files
+        stale = stale_files(args.output_dir, [entry["json"], *entry["pages"]])
+        if stale:
+          from utils.compression import Compressor
+          with Compressor(args.output_dir) as compressor:
+            for path in stale:
+              compressor.submit(path)
+      print(f"{args.file} is unchanged: {entry['json']}")
+      return
+
+  from lib.batch.pipeline import process_document
+  from utils.compression import Compressor
+
+  start = time.perf_counter()
+  compressor = Compressor(args.output_dir) if args.compress else None
+  try:
+    result = process_document(args.file, args.output_dir, render=not args.no_render,
+                              output_format=args.format, cache=cache, split_sections=args.split_json,
+                              compressor=compressor, highlight=args.highlight, parse_workers=args.parse_workers)
+  finally:
+    if compressor is not None:
+      compressor.close()
+  cache.save()
+  print(f"Parsed {args.file} in {(time.perf_counter() - start) * 1000:.0f} ms: {result['json']}")
+
+def build_site(args):
+  """
+  Renders the page tree from the parsed JSON documents.
+
+  Args:
+    args: The parsed `build-site` command line arguments.
+  """
+  from lib.pug_gen.site_builder import SiteBuilder
+
+  builder = SiteBuilder(json_dir=args.json_dir, output_dir=args.output_dir,
+                        workers=args.workers, force=args.force, output_format=args.format,
+                        asset_root=args.asset_root, highlight=args.highlight, compress=args.compress)
+  summary = builder.build()
+  if summary["failed"]:
+    sys.exit(1)
+
+def batch(args):
+  """
+  Parses and renders every document in the input directory.
+
+  Args:
+    args: The parsed `batch` command line arguments.
+  """
+  from lib.batch.runner import BatchRunner
+  from lib.batch.shard import parse_shard
+
+  try:
+    shard = parse_shard(args.shard) if args.shard else None
+  except ValueError as e:
+    print(e)
+    sys.exit(2)
+  runner = BatchRunner(args.input_dir, args.output_dir, output_format=args.format,
+                       force=args.force, profile=args.profile, top=args.top,
+                       resume=args.resume, max_attempts=args.max_attempts, shard=shard,
+                       split_sections=args.split_json, compress=args.compress, highlight=args.highlight,
+                       profile_dir=args.profile_dir, parse_workers=args.parse_workers)
+  summary = runner.run()
+  if args.check_links:
+    from lib.batch.links import LinkChecker
+    if LinkChecker(args.output_dir).check()["broken"]:
+      sys.exit(1)
+  if summary["failed"]:
+    sys.exit(1)
+
+def check_links(args):
+  """
+  Checks the internal links of every parsed document against the corpus.
+
+  Args:
+    args: The parsed `check-links` command line arguments.
+  """
+  from lib.batch.links import LinkChecker
+
+  summary = LinkChecker(args.output_dir).check()
+  if summary["broken"]:
+    sys.exit(1)
+
+def merge(args):
+  """
+  Combines the output directories of sharded batch runs into one.
+
+  Args:
+    args: The parsed `merge` command line arguments.
+  """
+  from lib.batch.merge import merge_outputs
+
+  try:
+    summary = merge_outputs(args.shard_dirs, args.output_dir)
+  except ValueError as e:
+    print(e)
+    sys.exit(1)
+  print(f"Merged {len(args.shard_dirs)} shards into {args.output_dir}: {summary['copied']} files copied, "
+        f"{summary['unchanged']} unchanged, {summary['entries']} manifest entries")
+
+def watch(args):
+  """
+  Re-parses and re-renders documents in the input directory as they are saved.
+
+  The process stays resident, so imported modules and in-memory caches are
+  reused by every rebuild.
+
+  Args:
+    args: The parsed `watch` command line arguments.
+  """
+  from lib.batch.parse_cache import ParseCache
+  from lib.batch.pipeline import process_document
+  from lib.batch.watcher import DocumentWatcher
+  from utils.compression import Compressor
+
+  cache = ParseCache(args.output_dir)
+  compressor = Compressor(args.output_dir) if args.compress else None
+
+  def rebuild(docx_path):
+    start = time.perf_counter()
+    try:
+      result = process_document(docx_path, args.output_dir, output_format=args.format, cache=cache,
+                                split_sections=args.split_json, compressor=compressor,
+                                highlight=args.highlight)
+      if compressor is not None:
+        compressor.flush()
+    except Exception as e:
+      print(f"Failed to process {docx_path}: {e}")
+      return
+    if result["cached"]:
+      print(f"{docx_path} saved without changes")
+      return
+    cache.save()
+    print(f"Rebuilt {docx_path} in {(time.perf_counter() - start) * 1000:.0f} ms")
+
+  watcher = DocumentWatcher(args.input_dir, rebuild, interval=args.interval, debounce=args.debounce)
+  watcher.run()
+
+def daemon(args):
+  """
+  Runs the parse daemon until it is stopped with `client stop` or Ctrl+C.
+
+  Args:
+    args: The parsed `daemon` command line arguments.
+  """
+  from lib.batch.daemon import ParseDaemon
+
+  try:
+    server = ParseDaemon(args.output_dir, socket_path=args.socket, workers=args.workers, max_queue=args.max_queue)
+    server.start()
+  except (ValueError, IOError) as e:
+    print(e)
+    sys.exit(2)
+  try:
+    server.serve_forever()
+  except KeyboardInterrupt:
+    pass
+
+def client(args):
+  """
+  Sends one request to a running parse daemon and prints its JSON reply.
+
+  Args:
+    args: The parsed `client` command line arguments.
+  """
+  import json
+  from lib.batch.client import DaemonClient, default_socket_path
+
+  fields = {}
+  if args.op in ("parse", "render"):
+    if not args.path:
+      print(f"The {args.op} request needs a path")
+      sys.exit(2)
+    # The daemon may run in another working directory
+    path = os.path.abspath(args.path)
+    fields = {"format": args.format, "highlight": args.highlight}
+    if args.op == "parse":
+      fields.update(file=path, render=not args.no_render, split_json=args.split_json, force=args.force)
+    else:
+      fields["json"] = path
+
+  op = "shutdown" if args.op == "stop" else args.op
+  try:
+    reply = DaemonClient(args.socket or default_socket_path(args.output_dir), timeout=args.timeout).request(op, **fields)
+  except (ConnectionError, OSError) as e:
+    print(e)
+    sys.exit(2)
+  print(json.dumps(reply, indent=2, ensure_ascii=False))
+  if not reply["ok"]:
+    sys.exit(1)
+
+SPLIT_JSON_HELP = "Also write json/<name>/head.json and one JSON file per top-level section for lazy loading."
+COMPRESS_HELP = "Write .gz (and .br if brotli is installed) sidecars of the JSON, images and pages as they are written."
+HIGHLIGHT_HELP = "Highlight code blocks with Pygments when generating pages, so they load no Prism scripts."
+PARSE_WORKERS_HELP = "Parse each very large document in this many processes, split at its top-level headings."
+SOCKET_HELP = "The daemon's Unix socket (default: <output-dir>/.parse_daemon.sock)."
+
+def create_arg_parser():
+  """
+  Creates the command line parser.
+
+  Returns:
+    The configured `argparse.ArgumentParser`.
+  """
+  parser = argparse.ArgumentParser(description="Parse Word documents and generate the site pages.")
+  subparsers = parser.add_subparsers(dest="command")
+
+  list_parser = subparsers.add_parser("list", help="List the documents in the input directory.")
+  list_parser.add_argument("--input-dir", default="input_docs", help="Directory of .docx files.")
+  list_parser.add_argument("--metadata", action="store_true",
+                           help="Print each document's metadata block as a JSON line, without parsing the whole document.")
+
+  parse_parser = subparsers.add_parser("parse", help="Parse one document to JSON and render its page, without prompting.")
+  parse_parser.add_argument("file", help="The .docx file to parse.")
+  parse_parser.add_argument("--output-dir", default="output", help="Root output directory.")
+  parse_parser.add_argument("--format", choices=["pug", "html", "both"], default="pug", help="Page format to render.")
+  parse_parser.add_argument("--no-render", action="store_true", help="Only write the JSON.")
+  parse_parser.add_argument("--force", action="store_true", help="Parse even if the document is unchanged.")
+  parse_parser.add_argument("--split-json", action="store_true", help=SPLIT_JSON_HELP)
+  parse_parser.add_argument("--compress", action="store_true", help=COMPRESS_HELP)
+  parse_parser.add_argument("--highlight", action="store_true", help=HIGHLIGHT_HELP)
+  parse_parser.add_argument("--parse-workers", type=int, default=None, help=PARSE_WORKERS_HELP)
+
+  site = subparsers.add_parser("build-site", help="Render every parsed JSON document to Pug or HTML pages.")
+  site.add_argument("--json-dir", default=os.path.join("output", "json"), help="Directory of parsed documents.")
+  site.add_argument("--output-dir", default=os.path.join("output", "pug"), help="Root of the rendered page tree.")
+  site.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count).")
+  site.add_argument("--force", action="store_true", help="Re-render pages even if they are unchanged.")
+  site.add_argument("--format", choices=["pug", "html", "both"], default="pug",
+                    help="Write index.pug, final index.html pages (no pug compile needed) or both.")
+  site.add_argument("--asset-root", default=None,
+                    help="Directory the site's CSS/JS is served from, used to record per-page payload sizes.")
+  site.add_argument("--highlight", action="store_true", help=HIGHLIGHT_HELP)
+  site.add_argument("--compress", action="store_true", help=COMPRESS_HELP)
+
+  batch_parser = subparsers.add_parser("batch", help="Parse and render every document in the input directory.")
+  batch_parser.add_argument("--input-dir", default="input_docs", help="Directory of .docx files.")
+  batch_parser.add_argument("--output-dir", default="output", help="Root output directory.")
+  batch_parser.add_argument("--format", choices=["pug", "html", "both"], default="pug", help="Page format to render.")
+  batch_parser.add_argument("--force", action="store_true", help="Process documents even if they are unchanged.")
+  batch_parser.add_argument("--profile", action="store_true",
+                            help="Write per-stage cProfile (.prof) and collapsed-stack files to the profile directory.")
+  batch_parser.add_argument("--profile-dir", default=None,
+                            help="Directory for --profile output (default: <output-dir>-profiles, outside the published output).")
+  batch_parser.add_argument("--split-json", action="store_true", help=SPLIT_JSON_HELP)
+  batch_parser.add_argument("--compress", action="store_true", help=COMPRESS_HELP)
+  batch_parser.add_argument("--highlight", action="store_true", help=HIGHLIGHT_HELP)
+  batch_parser.add_argument("--parse-workers", type=int, default=None, help=PARSE_WORKERS_HELP)
+  batch_parser.add_argument("--resume", action="store_true",
+                            help="Continue an interrupted run: skip documents it finished and retry failed ones.")
+  batch_parser.add_argument("--max-attempts", type=int, default=3, help="Number of times a failing document is tried.")
+  batch_parser.add_argument("--shard", default=None,
+                            help="Only process shard i of N (e.g. 2/4); shards are balanced by file size.")
+  batch_parser.add_argument("--top", type=int, default=10, help="Number of slow documents and hot functions to report.")
+  batch_parser.add_argument("--check-links", action="store_true",
+                            help="Check the internal links of the corpus after the run (see check-links).")
+
+  links_parser = subparsers.add_parser("check-links",
+                                       help="Check that internal links point at existing articles and section anchors.")
+  links_parser.add_argument("--output-dir", default="output", help="Root output directory holding the parse cache.")
+
+  merge_parser = subparsers.add_parser("merge", help="Combine the output directories of sharded batch runs.")
+  merge_parser.add_argument("shard_dirs", nargs="+", help="The output directories of the shards.")
+  merge_parser.add_argument("--output-dir", default="output", help="The merged output directory.")
+
+  watch_parser = subparsers.add_parser("watch", help="Rebuild documents in the input directory whenever they are saved.")
+  watch_parser.add_argument("--input-dir", default="input_docs", help="Directory of .docx files to watch.")
+  watch_parser.add_argument("--output-dir", default="output", help="Root output directory.")
+  watch_parser.add_argument("--format", choices=["pug", "html", "both"], default="pug", help="Page format to render.")
+  watch_parser.add_argument("--split-json", action="store_true", help=SPLIT_JSON_HELP)
+  watch_parser.add_argument("--compress", action="store_true", help=COMPRESS_HELP)
+  watch_parser.add_argument("--highlight", action="store_true", help=HIGHLIGHT_HELP)
+  watch_parser.add_argument("--interval", type=float, default=0.25, help="Seconds between directory scans.")
+  watch_parser.add_argument("--debounce", type=float, default=0.5, help="Seconds a file must be unchanged before rebuilding.")
+
+  daemon_parser = subparsers.add_parser("daemon", help="Serve parse and render jobs from a warm worker pool over a Unix socket.")
+  daemon_parser.add_argument("--output-dir", default="output", help="Root output directory.")
+  daemon_parser.add_argument("--socket", default=None, help=SOCKET_HELP)
+  daemon_parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: CPU count).")
+  daemon_parser.add_argument("--max-queue", type=int, default=16,
+                             help="Number of jobs that may wait for a worker; further jobs are rejected.")
+
+  client_parser = subparsers.add_parser("client", help="Send a request to a running parse daemon.")
+  client_parser.add_argument("op", choices=["parse", "render", "stats", "ping", "stop"], help="The request to send.")
+  client_parser.add_argument("path", nargs="?", help="The .docx file to parse or the JSON document to render.")
+  client_parser.add_argument("--output-dir", default="output", help="Root output directory of the daemon.")
+  client_parser.add_argument("--socket", default=None, help=SOCKET_HELP)
+  client_parser.add_argument("--format", choices=["pug", "html", "both"], default="pug", help="Page format to render.")
+  client_parser.add_argument("--no-render", action="store_true", help="Only write the JSON.")
+  client_parser.add_argument("--force", action="store_true", help="Parse even if the document is unchanged.")
+  client_parser.add_argument("--split-json", action="store_true", help=SPLIT_JSON_HELP)
+  client_parser.add_argument("--highlight", action="store_true", help=HIGHLIGHT_HELP)
+  client_parser.add_argument("--timeout", type=float, default=None, help="Seconds to wait for the reply.")
+  return parser
+
+COMMANDS = {
+  "list": list_documents,
+  "parse": parse,
+  "build-site": build_site,
+  "batch": batch,
+  "check-links": check_links,
+  "merge": merge,
+  "watch": watch,
+  "daemon": daemon,
+  "client": client,
+}
+
+if __name__ == "__main__":
+    args = create_arg_parser().parse_args()
+
+    if args.command in COMMANDS:
+      COMMANDS[args.command](args)
+    else:
+      run_interactive()
@@ -0,0 +1,83 @@
+import unittest
+import gzip
+import json
+import os
+import shutil
+import tempfile
+from docx import Document
+from lib.batch.runner import BatchRunner
+from utils import compression
+from utils.compression import Compressor, MANIFEST_NAME
+
+class TestCompressor(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.temp_dir, name)
+        with open(path, "wb") as f:
+            f.write(content)
+        return path
+
+    def test_sidecars_are_written_and_skipped_when_unchanged(self):
+        content = json.dumps({"text": "words " * 500}).encode("utf-8")
+        path = self.write("post.json", content)
+        with Compressor(self.temp_dir, formats=("gz",)) as compressor:
+            compressor.submit(path, content)
+        with gzip.open(f"{path}.gz", "rb") as f:
+            self.assertEqual(f.read(), content)
+        self.assertEqual(compressor.summary, {"compressed": 1, "skipped": 0})
+        with open(os.path.join(self.temp_dir, MANIFEST_NAME), encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["post.json"]["formats"], ["gz"])
+
+        with Compressor(self.temp_dir, formats=("gz",)) as compressor:
+            compressor.submit(path)
+        self.assertEqual(compressor.summary, {"compressed": 0, "skipped": 1})
+
+        content = content.replace(b"words", b"other")
+        self.write("post.json", content)
+        with Compressor(self.temp_dir, formats=("gz",)) as compressor:
+            compressor.submit(path)
+        self.assertEqual(compressor.summary, {"compressed": 1, "skipped": 0})
+        with gzip.open(f"{path}.gz", "rb") as f:
+            self.assertEqual(f.read(), content)
+
+    def test_incompressible_files_get_no_sidecar(self):
+        path = self.write("image.jpg", os.urandom(4096))
+        with Compressor(self.temp_dir, formats=("gz",)) as compressor:
+            compressor.submit(path)
+        self.assertFalse(os.path.exists(f"{path}.gz"))
+        self.assertEqual(compressor.manifest["image.jpg"]["formats"], [])
+
+    def test_brotli_is_optional(self):
+        if compression.brotli is not None:
+            self.skipTest("brotli is installed")
+        self.assertEqual(compression.sidecar_formats(), ("gz",))
+        with self.assertRaises(ValueError):
+            Compressor(self.temp_dir, formats=("gz", "br"))
+
+    def test_batch_compresses_outputs(self):
+        input_dir = os.path.join(self.temp_dir, "input_docs")
+        output_dir = os.path.join(self.temp_dir, "output")
+        os.makedirs(input_dir)
+        doc = Document()
+        doc.add_paragraph("article-id = compressed post")
+        doc.add_heading("Heading", level=1)
+        doc.add_paragraph("Body text. " * 200)
+        doc.save(os.path.join(input_dir, "post.docx"))
+
+        summary = BatchRunner(input_dir, output_dir, output_format="both", compress=True).run()
+        self.assertEqual(summary["compression"]["skipped"], 0)
+        for path in ("json/post.json", "pug/articles/compressed-post/index.pug",
+                     "pug/articles/compressed-post/index.html"):
+            with open(os.path.join(output_dir, path), "rb") as f, gzip.open(os.path.join(output_dir, path + ".gz")) as g:
+                self.assertEqual(f.read(), g.read())
+
+        summary = BatchRunner(input_dir, output_dir, output_format="both", compress=True).run()
+        self.assertEqual(summary["compression"], {"compressed": 0, "skipped": 3})
+
+if __name__ == '__main__':
+    unittest.main()
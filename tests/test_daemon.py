@@ -0,0 +1,121 @@
+import unittest
+import json
+import multiprocessing
+import os
+import shutil
+import signal
+import tempfile
+import threading
+import time
+from docx import Document
+from lib.batch.client import DaemonClient
+from lib.batch.daemon import ParseDaemon, percentile
+from tests.test_startup import run_with_importtime, HEAVY_MODULES
+
+def save_document(path, paragraphs=1):
+    doc = Document()
+    doc.add_paragraph("article-id = daemon post")
+    doc.add_heading("Heading", level=1)
+    for i in range(paragraphs):
+        doc.add_paragraph(f"Body text {i}.")
+    doc.save(path)
+    return path
+
+class TestParseDaemon(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_dir = os.path.join(self.temp_dir, "output")
+        self.daemon = ParseDaemon(self.output_dir, workers=1, max_queue=0)
+        self.daemon.start()
+        self.thread = threading.Thread(target=self.daemon.serve_forever)
+        self.thread.start()
+        self.client = DaemonClient(self.daemon.socket_path, timeout=60)
+
+    def tearDown(self):
+        if self.thread.is_alive():
+            self.client.request("shutdown")
+            self.thread.join()
+        shutil.rmtree(self.temp_dir)
+
+    def test_parse_render_and_stats(self):
+        docx_path = save_document(os.path.join(self.temp_dir, "post.docx"))
+        reply = self.client.request("parse", file=docx_path, format="html")
+        self.assertTrue(reply["ok"], reply)
+        self.assertFalse(reply["cached"])
+        with open(reply["json"], encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["metadata"]["id"], "daemon-post")
+        self.assertTrue(reply["pages"][0].endswith("index.html"))
+
+        reply = self.client.request("parse", file=docx_path, format="html")
+        self.assertTrue(reply["cached"])
+        self.assertFalse(self.client.request("parse", file=docx_path, format="pug")["cached"])
+
+        reply = self.client.request("render", json=reply["json"], format="pug")
+        self.assertTrue(reply["ok"], reply)
+        self.assertTrue(reply["pages"][0].endswith("index.pug"))
+
+        self.assertEqual(self.client.request("ping")["pid"], os.getpid())
+        self.assertFalse(self.client.request("parse")["ok"])
+        self.assertIn("Unknown op", self.client.request("compile")["error"])
+        missing = self.client.request("parse", file=os.path.join(self.temp_dir, "missing.docx"))
+        self.assertFalse(missing["ok"])
+
+        stats = self.client.request("stats")
+        self.assertEqual((stats["completed"], stats["cached"], stats["rejected"]), (3, 1, 0))
+        self.assertEqual((stats["running"], stats["queue_depth"]), (0, 0))
+        self.assertEqual(set(stats["latency_ms"]), {"p50", "p95", "p99"})
+        self.assertLessEqual(stats["latency_ms"]["p50"], stats["latency_ms"]["p99"])
+
+    def test_full_queue_rejects_jobs(self):
+        slow_path = save_document(os.path.join(self.temp_dir, "slow.docx"), paragraphs=3000)
+        docx_path = save_document(os.path.join(self.temp_dir, "post.docx"))
+        replies = []
+        worker = threading.Thread(target=lambda: replies.append(self.client.request("parse", file=slow_path)))
+        worker.start()
+        deadline = time.monotonic() + 30
+        while self.client.request("stats")["running"] == 0 and not replies and time.monotonic() < deadline:
+            time.sleep(0.01)
+        if replies:
+            self.skipTest("The slow job finished before it could be observed")
+
+        reply = self.client.request("parse", file=docx_path)
+        self.assertFalse(reply["ok"])
+        self.assertTrue(reply["rejected"])
+        worker.join()
+        self.assertTrue(replies[0]["ok"])
+        self.assertEqual(self.client.request("stats")["rejected"], 1)
+        self.assertTrue(self.client.request("parse", file=docx_path)["ok"])
+
+    def test_pool_is_restarted_after_a_worker_dies(self):
+        docx_path = save_document(os.path.join(self.temp_dir, "post.docx"))
+        for child in multiprocessing.active_children():
+            os.kill(child.pid, signal.SIGKILL)
+            child.join()
+        reply = self.client.request("parse", file=docx_path)
+        self.assertFalse(reply["ok"])
+        self.assertIn("worker process died", reply["error"])
+
+        reply = self.client.request("parse", file=docx_path)
+        self.assertTrue(reply["ok"], reply)
+        stats = self.client.request("stats")
+        self.assertEqual((stats["restarts"], stats["failed"], stats["completed"]), (1, 1, 1))
+
+    def test_client_command_starts_fast(self):
+        stdout, imports = run_with_importtime("client", "stats", "--socket", self.daemon.socket_path)
+        self.assertEqual(json.loads(stdout)["workers"], 1)
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, imports)
+
+        run_with_importtime("client", "stop", "--socket", self.daemon.socket_path)
+        self.thread.join(timeout=30)
+        self.assertFalse(os.path.exists(self.daemon.socket_path))
+
+    def test_percentile(self):
+        self.assertEqual(percentile([], 0.5), 0.0)
+        values = list(range(100, 0, -1))
+        self.assertEqual(percentile(values, 0.5), 50)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([7], 0.95), 7)
+
+if __name__ == '__main__':
+    unittest.main()
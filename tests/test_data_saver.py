@@ -2,6 +2,10 @@
 import unittest
 import os
 import json
+import hashlib
+import shutil
+import tempfile
+from utils.compression import MANIFEST_NAME, Compressor
 from utils.data_saver import DataSaver
 
 class TestDataSaver(unittest.TestCase):
@@ -32,5 +36,79 @@ class TestDataSaver(unittest.TestCase):
         
         self.assertEqual(saved_data, self.test_data)
 
+class TestSectionSplit(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.output_file = os.path.join(self.temp_dir, "json", "post.json")
+        self.data = {
+            "metadata": {"id": "post", "title": "Post"},
+            "headings": [
+                {"text": "First", "level": "Heading 1", "paragraphs": [{"text": "one"}]},
+                {"text": "Detail", "level": "Heading 2", "paragraphs": [{"text": "two"}]},
+                {"text": "Second", "level": "Heading 1", "paragraphs": [{"text": "three"}]},
+            ],
+            "paragraphs": [{"text": "Intro"}]
+        }
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_save_sections(self):
+        head_file = DataSaver(self.data, self.output_file).save_sections()
+        directory = os.path.join(self.temp_dir, "json", "post")
+        self.assertEqual(head_file, os.path.join(directory, "head.json"))
+        with open(head_file, encoding='utf-8') as f:
+            head = json.load(f)
+        self.assertEqual(head["metadata"], self.data["metadata"])
+        self.assertNotIn("headings", head)
+        self.assertEqual(head["toc"], [
+            {"text": "First", "level": 1, "anchor": "first", "section": "section-001.json"},
+            {"text": "Detail", "level": 2, "anchor": "detail", "section": "section-001.json"},
+            {"text": "Second", "level": 1, "anchor": "second", "section": "section-002.json"}])
+        self.assertEqual([(s["file"], s["title"]) for s in head["sections"]],
+                         [("intro.json", None), ("section-001.json", "First"), ("section-002.json", "Second")])
+        for section in head["sections"]:
+            with open(os.path.join(directory, section["file"]), 'rb') as f:
+                content = f.read()
+            self.assertEqual(section["bytes"], len(content))
+            self.assertEqual(section["sha256"], hashlib.sha256(content).hexdigest())
+        with open(os.path.join(directory, "section-001.json"), encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["headings"], self.data["headings"][:2])
+
+    def test_unchanged_sections_keep_their_hash(self):
+        saver = DataSaver(self.data, self.output_file)
+        saver.save_sections()
+        with open(os.path.join(saver.sections_dir(), "head.json"), encoding='utf-8') as f:
+            before = json.load(f)["sections"]
+        self.data["headings"][2]["paragraphs"][0]["text"] = "changed"
+        del self.data["headings"][1]
+        self.data["headings"].append({"text": "Third", "level": "Heading 1", "paragraphs": []})
+        saver.save_sections()
+        with open(os.path.join(saver.sections_dir(), "head.json"), encoding='utf-8') as f:
+            after = json.load(f)["sections"]
+        self.assertEqual(before[0], after[0])
+        self.assertNotEqual(before[2]["sha256"], after[2]["sha256"])
+
+        del self.data["headings"][1:]
+        saver.save_sections()
+        self.assertEqual(sorted(os.listdir(saver.sections_dir())), ["head.json", "intro.json", "section-001.json"])
+
+    def test_stale_sections_lose_their_sidecars(self):
+        self.data["headings"][2]["paragraphs"][0]["text"] = "three " * 100
+        with Compressor(self.temp_dir, formats=("gz",)) as compressor:
+            DataSaver(self.data, self.output_file, compressor).save_sections()
+        stale = os.path.join(self.temp_dir, "json", "post", "section-002.json")
+        self.assertTrue(os.path.exists(f"{stale}.gz"))
+
+        del self.data["headings"][2]
+        with Compressor(self.temp_dir, formats=("gz",)) as compressor:
+            DataSaver(self.data, self.output_file, compressor).save_sections()
+        self.assertFalse(os.path.exists(stale))
+        self.assertFalse(os.path.exists(f"{stale}.gz"))
+        with open(os.path.join(self.temp_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            manifest = json.load(f)
+        self.assertNotIn("json/post/section-002.json", manifest)
+        self.assertIn("json/post/section-001.json", manifest)
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+from docx import Document
+from lib.batch.runner import BatchRunner
+from utils import file_operations
+from utils.file_operations import OutputWriter
+
+class TestOutputWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, "nested", "post.json")
+        self.writer = OutputWriter()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def age(self, path):
+        """ Move the modification time back so a rewrite would be visible """
+        os.utime(path, (1_000_000_000, 1_000_000_000))
+        return os.path.getmtime(path)
+
+    def read(self):
+        with open(self.path, "rb") as f:
+            return f.read()
+
+    def test_unchanged_content_is_not_rewritten(self):
+        self.assertTrue(self.writer.write_bytes(self.path, b'{"a": 1}'))
+        mtime = self.age(self.path)
+        self.assertFalse(self.writer.write_text(self.path, '{"a": 1}'))
+        self.assertEqual(os.path.getmtime(self.path), mtime)
+
+        self.assertTrue(self.writer.write_bytes(self.path, b'{"a": 2}'))
+        self.assertEqual(self.read(), b'{"a": 2}')
+        self.assertEqual(self.writer.counts(), {"written": 2, "skipped": 1})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["post.json"])
+
+    def test_written_files_keep_the_usual_mode(self):
+        umask = os.umask(0o022)
+        try:
+            self.writer.write_bytes(self.path, b"new")
+            self.assertEqual(os.stat(self.path).st_mode & 0o777, file_operations.NEW_FILE_MODE)
+            os.chmod(self.path, 0o640)
+            self.writer.write_chunks(self.path, [b"changed"])
+            self.assertEqual(os.stat(self.path).st_mode & 0o777, 0o640)
+        finally:
+            os.umask(umask)
+
+    def test_chunks_and_streams(self):
+        self.assertTrue(self.writer.write_chunks(self.path, ["<p>", "text", b"</p>"]))
+        mtime = self.age(self.path)
+        self.assertFalse(self.writer.write_chunks(self.path, iter(["<p>text</p>"])))
+        self.assertFalse(self.writer.copy_stream(self.path, io.BytesIO(b"<p>text</p>"), chunk_size=4))
+        self.assertEqual(os.path.getmtime(self.path), mtime)
+
+        self.assertTrue(self.writer.copy_stream(self.path, io.BytesIO(b"<p>other</p>"), chunk_size=4))
+        self.assertEqual(self.read(), b"<p>other</p>")
+        self.assertEqual(self.writer.counts(), {"written": 2, "skipped": 2})
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["post.json"])
+
+    def test_failed_stream_keeps_existing_file(self):
+        self.writer.write_bytes(self.path, b"old")
+
+        def chunks():
+            yield b"new"
+            raise RuntimeError("render failed")
+
+        with self.assertRaises(RuntimeError):
+            self.writer.write_chunks(self.path, chunks())
+        self.assertEqual(self.read(), b"old")
+        self.assertEqual(os.listdir(os.path.dirname(self.path)), ["post.json"])
+
+    def test_forced_batch_leaves_unchanged_outputs(self):
+        input_dir = os.path.join(self.temp_dir, "input_docs")
+        output_dir = os.path.join(self.temp_dir, "output")
+        os.makedirs(input_dir)
+        doc = Document()
+        doc.add_paragraph("article-id = unchanged post")
+        doc.add_heading("Heading", level=1)
+        doc.add_paragraph("Body text.")
+        doc.save(os.path.join(input_dir, "post.docx"))
+
+        summary = BatchRunner(input_dir, output_dir, output_format="both").run()
+        self.assertEqual(summary["files"], {"written": 3, "skipped": 0})
+        page = os.path.join(output_dir, "pug", "articles", "unchanged-post", "index.html")
+        mtime = self.age(page)
+
+        summary = BatchRunner(input_dir, output_dir, output_format="both", force=True).run()
+        self.assertEqual(summary["processed"], 1)
+        self.assertEqual(summary["files"], {"written": 0, "skipped": 3})
+        self.assertEqual(os.path.getmtime(page), mtime)
+
+if __name__ == '__main__':
+    unittest.main()
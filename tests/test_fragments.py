@@ -0,0 +1,39 @@
+import unittest
+import shutil
+import tempfile
+from lib.pug_gen.fragments import fragment_cache
+from lib.pug_gen.pug_gen import Post_Generator, build_post_info
+from tests.test_site_builder import sample_document
+
+class TestFragmentCache(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        fragment_cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def render(self, post_id):
+        document = sample_document()
+        document["metadata"]["id"] = post_id
+        generator = Post_Generator(json_obj=build_post_info(document), output_root=self.temp_dir)
+        return generator.pm.getContent()
+
+    def test_fragments_rendered_once_per_run(self):
+        first = self.render("first")
+        self.assertEqual(fragment_cache.misses, 3)
+
+        second = self.render("second")
+        self.assertEqual(fragment_cache.misses, 3)
+        self.assertEqual(fragment_cache.hits, 3)
+        self.assertEqual(first, second)
+
+    def test_fragments_in_page(self):
+        content = self.render("post")
+        self.assertIn('\t\tdiv#nav-bar.navbar.header-content--mini\n', content)
+        self.assertIn('\t\t\t\t\t\t\timg(src="/images/websites/github.png")\n', content)
+        self.assertIn('\t\tlink(rel="stylesheet" href="/style.css")\n', content)
+        self.assertIn('\t\tmeta(name="twitter:site" property="og:twitter:site" content="@_yodev_")\n', content)
+
+if __name__ == '__main__':
+    unittest.main()
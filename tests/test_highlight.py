@@ -0,0 +1,64 @@
+import unittest
+import os
+import shutil
+import tempfile
+from lib.pug_gen.highlight import CACHE_DIR, STYLESHEET_NAME, Highlighter, get_highlighter
+from lib.pug_gen.pug_gen import Post_Generator, build_post_info
+from lib.pug_gen.pug_manager import PRISM_CDN
+from tests.test_site_builder import sample_document
+
+class TestHighlighter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.temp_dir, CACHE_DIR)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_snippets_are_cached_by_code_and_language(self):
+        highlighter = Highlighter(self.cache_dir)
+        result = highlighter.highlight("x = 1 < 2\nprint(x)", "py")
+        self.assertEqual(result.split("\n")[0],
+                         '<span class="n">x</span> <span class="o">=</span> <span class="mi">1</span> '
+                         '<span class="o">&lt;</span> <span class="mi">2</span>')
+        self.assertEqual(len(result.split("\n")), 2)
+        self.assertEqual((highlighter.hits, highlighter.misses), (0, 1))
+
+        # A new highlighter (e.g. the next run) reads the snippet from disk
+        highlighter = Highlighter(self.cache_dir)
+        self.assertEqual(highlighter.highlight("x = 1 < 2\nprint(x)", "PY "), result)
+        self.assertEqual((highlighter.hits, highlighter.misses), (1, 0))
+        self.assertNotEqual(highlighter.key("x = 1", "python"), highlighter.key("x = 1", "c"))
+        self.assertNotEqual(highlighter.key("x = 1", "python"), highlighter.key("x = 2", "python"))
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_cache_is_kept_outside_the_page_tree(self):
+        highlighter = get_highlighter(os.path.join(self.temp_dir, "pug"))
+        self.assertEqual(highlighter.cache_dir, os.path.join(os.path.abspath(self.temp_dir), CACHE_DIR))
+
+    def test_unknown_language_is_plain_text(self):
+        highlighter = Highlighter(self.cache_dir)
+        self.assertEqual(highlighter.highlight("a <b>", "no-such-language"), "a &lt;b&gt;")
+        self.assertIn("<span", highlighter.highlight("int x;", "c++"))
+
+    def test_highlighted_page_loads_no_prism(self):
+        document = sample_document()
+        document["headings"][0]["paragraphs"][0]["code-blocks"][0]["code"] = ["print(s)  # #{x} and #[y]"]
+        highlighter = Highlighter(self.cache_dir)
+        generator = Post_Generator(json_obj=build_post_info(document), output_root=self.temp_dir,
+                                   output_format='both', highlighter=highlighter)
+        with open(generator.pages[1], encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('<pre class="section-code highlight"><code class="language-python">'
+                      '<span class="nb">print</span><span class="p">(</span><span class="n">s</span>'
+                      '<span class="p">)</span>  <span class="c1"># #{x} and #[y]</span></code></pre>', content)
+        self.assertIn('# \\#{x} and \\#[y]', "\n".join(generator.pm.lines))
+        self.assertIn(f'href="/{STYLESHEET_NAME}"', content)
+        self.assertNotIn(PRISM_CDN, content)
+        self.assertNotIn(PRISM_CDN, "".join(generator.pm.assets))
+        self.assertNotIn("/scripts/code_script.js", generator.pm.assets)
+        with open(os.path.join(self.temp_dir, STYLESHEET_NAME), encoding='utf-8') as f:
+            self.assertIn(".highlight .k", f.read())
+
+if __name__ == '__main__':
+    unittest.main()
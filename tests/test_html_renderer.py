@@ -0,0 +1,104 @@
+import unittest
+import os
+import shutil
+import tempfile
+from docx import Document
+from lib.word_parser.word_doc_parser import WordDocParser
+from lib.pug_gen.html_renderer import HtmlRenderer
+from lib.pug_gen.pug_gen import Post_Generator, build_post_info
+from tests.test_site_builder import sample_document
+
+class TestHtmlRenderer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_tags_attributes_and_text(self):
+        lines = [
+            'doctype html',
+            'html(lang=\'en\')',
+            '\thead',
+            '\t\tmeta(charset="UTF-8")',
+            '\tbody',
+            '\t\tdiv#nav-bar.navbar.mini',
+            '\t\t\ta(href="/x?a=1&b=2" title="say \\"hi\\"") Home',
+            '\t\tp.text See #[a(href="/docs") the docs] and \\#{literal}.',
+        ]
+        self.assertEqual(
+            HtmlRenderer(lines).render(),
+            '<!DOCTYPE html><html lang="en"><head><meta charset="UTF-8"></head><body>'
+            '<div class="navbar mini" id="nav-bar">'
+            '<a href="/x?a=1&amp;b=2" title="say &quot;hi&quot;">Home</a></div>'
+            '<p class="text">See <a href="/docs">the docs</a> and #{literal}.</p>'
+            '</body></html>')
+
+    def test_text_blocks(self):
+        lines = [
+            'pre',
+            '\tcode(class="language-c").',
+            '\t\t#include &lt;stdio.h&gt;',
+            '\t\t\treturn 0;',
+            'span',
+            '\t.',
+            '\t\tShare',
+        ]
+        self.assertEqual(
+            HtmlRenderer(lines).render(),
+            '<pre><code class="language-c">#include &lt;stdio.h&gt;\n\treturn 0;</code></pre>'
+            '<span>Share</span>')
+
+    def test_both_backends_render_same_page(self):
+        document = sample_document()
+        document["headings"][0]["paragraphs"][0]["code-blocks"].append(
+            {"id": "002", "language": "python", "code": ["a = 1", "", "b = 2"]})
+        generator = Post_Generator(json_obj=build_post_info(document),
+                                   output_root=self.temp_dir, output_format='both')
+        pug_page, html_page = generator.pages
+        self.assertTrue(os.path.exists(pug_page))
+        with open(html_page, encoding='utf-8') as f:
+            content = f.read()
+        self.assertEqual(content, HtmlRenderer(generator.pm.lines).render())
+        self.assertTrue(content.startswith('<!DOCTYPE html><html lang="en"><head>'))
+        self.assertIn('<h1 id="post-header-title">Sample Post</h1>', content)
+        self.assertIn('<pre class="section-code"><code class="language-python">print(\'hi\')</code></pre>', content)
+        self.assertIn('<code class="language-python">a = 1\n\nb = 2</code>', content)
+        self.assertTrue(content.endswith('</body></html>'))
+
+    def test_soft_line_breaks_stay_inside_their_tags(self):
+        doc = Document()
+        doc.add_paragraph("article-id = soft breaks")
+        doc.add_heading("Breaks", level=1)
+        run = doc.add_paragraph().add_run("first line")
+        run.add_break()
+        run.add_text("div.evil text")
+        for line in ("code-start", None, "code-end"):
+            if line is None:
+                run = doc.add_paragraph().add_run("a = 1")
+                run.add_break()
+                run.add_text("b = 2")
+            else:
+                doc.add_paragraph(line)
+        docx_path = os.path.join(self.temp_dir, "breaks.docx")
+        doc.save(docx_path)
+        with WordDocParser(docx_path, self.temp_dir) as parser:
+            document = parser.parse_document(interactive=False)
+
+        generator = Post_Generator(json_obj=build_post_info(document),
+                                   output_root=self.temp_dir, output_format='both')
+        pug_page, html_page = generator.pages
+        with open(pug_page, encoding='utf-8') as f:
+            pug_lines = f.read().split('\n')
+        self.assertIn('\t\t\t\t\tp.section-text first line#[br]div.evil text', pug_lines)
+        self.assertIn('\t\t\t\t\t\t\ta = 1', pug_lines)
+        self.assertIn('\t\t\t\t\t\t\tb = 2', pug_lines)
+        # Only the doctype and the html tag start at column 0
+        self.assertEqual([line for line in pug_lines[2:] if line and not line.startswith('\t')], [])
+        with open(html_page, encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn('<p class="section-text">first line<br>div.evil text</p>', content)
+        self.assertIn('<code class="language-none">a = 1\nb = 2</code>', content)
+
+if __name__ == '__main__':
+    unittest.main()
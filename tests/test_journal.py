@@ -0,0 +1,148 @@
+import unittest
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+from docx import Document
+from lib.batch.journal import Journal, DONE, FAILED, PENDING, RUNNING
+from lib.batch.runner import BatchRunner
+
+class TestJournal(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.journal = Journal(self.temp_dir)
+        self.output = os.path.join(self.temp_dir, "a.json")
+        with open(self.output, "w") as f:
+            f.write("{}")
+
+    def tearDown(self):
+        self.journal.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_claim_and_finish(self):
+        self.journal.enqueue({"in/a.docx": "h1", "in/b.docx": "h2"})
+        first = self.journal.claim()
+        self.assertEqual((first["key"], first["state"], first["attempts"]), ("a.docx", RUNNING, 1))
+        self.assertEqual(self.journal.claim()["key"], "b.docx")
+        self.assertIsNone(self.journal.claim())
+        self.journal.finish("a.docx", [self.output], 0.5)
+        row = self.journal.get("in/a.docx")
+        self.assertEqual((row["state"], row["duration"]), (DONE, 0.5))
+
+    def test_resume_skips_finished_documents(self):
+        self.journal.enqueue({"in/a.docx": "h1"})
+        self.journal.claim()
+        self.journal.finish("a.docx", [self.output], 0.1)
+        self.journal.enqueue({"in/a.docx": "h1"})
+        self.assertIsNone(self.journal.claim())
+        self.journal.enqueue({"in/a.docx": "changed"})
+        self.assertEqual(self.journal.get("in/a.docx")["state"], PENDING)
+        self.journal.claim()
+        self.journal.finish("a.docx", [self.output], 0.1)
+        os.remove(self.output)
+        self.journal.enqueue({"in/a.docx": "changed"})
+        self.assertEqual(self.journal.claim()["key"], "a.docx")
+
+    def test_retries_are_bounded(self):
+        self.journal.retry_delay = 0
+        self.journal.enqueue({"in/a.docx": "h1"})
+        for attempt in (1, 2):
+            self.assertEqual(self.journal.claim(max_attempts=2)["attempts"], attempt)
+            self.journal.fail("a.docx", "broken", 0.1)
+        self.assertIsNone(self.journal.claim(max_attempts=2))
+        self.journal.enqueue({"in/a.docx": "h1"})
+        self.assertIsNone(self.journal.claim(max_attempts=2))
+        self.assertEqual(self.journal.counts(), {PENDING: 0, RUNNING: 0, DONE: 0, FAILED: 1})
+
+    def test_failed_documents_are_retried_with_backoff(self):
+        self.journal.retry_delay = 60
+        self.journal.enqueue({"in/a.docx": "h1"})
+        self.journal.claim()
+        self.journal.fail("a.docx", "broken", 0.1)
+        self.assertIsNone(self.journal.claim())
+        self.assertGreater(self.journal.next_retry(), 59)
+        self.assertIsNone(self.journal.next_retry(max_attempts=1))
+        self.journal.retry_delay = 0
+        self.assertEqual(self.journal.next_retry(), 0.0)
+        self.assertEqual(self.journal.claim()["attempts"], 2)
+
+    def test_fresh_runs_keep_claimed_documents(self):
+        self.journal.enqueue({"in/a.docx": "h1", "in/b.docx": "h2"})
+        other = Journal(self.temp_dir)
+        try:
+            other.worker = "elsewhere:1"
+            self.assertEqual(other.claim()["key"], "a.docx")
+        finally:
+            other.close()
+        self.journal.enqueue({"in/a.docx": "h1", "in/b.docx": "h2"}, reset=True)
+        row = self.journal.get("in/a.docx")
+        self.assertEqual((row["state"], row["worker"], row["attempts"]), (RUNNING, "elsewhere:1", 1))
+        self.assertEqual(self.journal.claim()["key"], "b.docx")
+
+    def test_abandoned_documents_are_reclaimed(self):
+        self.journal.enqueue({"in/a.docx": "h1", "in/b.docx": "h2"})
+        process = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+        other = Journal(self.temp_dir)
+        try:
+            # A worker of another host, which cannot be checked
+            other.worker = "elsewhere:1"
+            self.assertEqual(other.claim()["key"], "a.docx")
+            # A worker of this host that has exited
+            other.worker = f"{self.journal.worker.rpartition(':')[0]}:{process.stdout.strip()}"
+            self.assertEqual(other.claim()["key"], "b.docx")
+        finally:
+            other.close()
+        self.assertEqual(self.journal.claim()["key"], "b.docx")
+        self.assertIsNone(self.journal.claim())
+        # The other host's claim is kept until its lease runs out
+        self.journal.lease = 0
+        self.assertEqual(self.journal.claim()["key"], "a.docx")
+
+    def test_workers_claim_different_documents(self):
+        self.journal.enqueue({f"in/{n}.docx": n for n in "abcdef"})
+        script = ("import sys; from lib.batch.journal import Journal\n"
+                  "with Journal(sys.argv[1]) as journal:\n"
+                  "    while (entry := journal.claim()) is not None:\n"
+                  "        print(entry['key'])\n")
+        workers = [subprocess.Popen([sys.executable, "-c", script, self.temp_dir], stdout=subprocess.PIPE, text=True)
+                   for _ in range(3)]
+        claimed = [key for worker in workers for key in worker.communicate()[0].split()]
+        self.assertEqual(sorted(claimed), [f"{n}.docx" for n in "abcdef"])
+
+class TestResumableBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "input_docs")
+        self.output_dir = os.path.join(self.temp_dir, "output")
+        os.makedirs(self.input_dir)
+        for name in ("one", "two"):
+            doc = Document()
+            doc.add_paragraph(f"article-id = {name}")
+            doc.add_heading("Heading", level=1)
+            doc.save(os.path.join(self.input_dir, f"{name}.docx"))
+        with open(os.path.join(self.input_dir, "broken.docx"), "wb") as f:
+            f.write(b"not a document")
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_resume(self):
+        summary = BatchRunner(self.input_dir, self.output_dir, max_attempts=2).run()
+        self.assertEqual((summary["processed"], summary["failed"]), (2, 1))
+        with Journal(self.output_dir) as journal:
+            self.assertEqual(journal.get("broken.docx")["attempts"], 2)
+            self.assertEqual(journal.counts(), {PENDING: 0, RUNNING: 0, DONE: 2, FAILED: 1})
+
+        summary = BatchRunner(self.input_dir, self.output_dir, resume=True, max_attempts=2).run()
+        self.assertEqual((summary["processed"], summary["cached"], summary["skipped"], summary["failed"]), (0, 0, 2, 1))
+
+        doc = Document()
+        doc.add_paragraph("article-id = two")
+        doc.add_heading("Changed", level=1)
+        doc.save(os.path.join(self.input_dir, "two.docx"))
+        summary = BatchRunner(self.input_dir, self.output_dir, resume=True, max_attempts=2).run()
+        self.assertEqual((summary["processed"], summary["skipped"]), (1, 1))
+
+if __name__ == '__main__':
+    unittest.main()
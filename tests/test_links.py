@@ -0,0 +1,73 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from lib.batch.links import LinkChecker, REPORT_NAME, internal_target
+from lib.batch.parse_cache import ParseCache
+from utils.common_utils import slugify
+
+def document(article_id, headings, links=()):
+    return {
+        "metadata": {"id": article_id, "type": "article", "title": article_id},
+        "paragraphs": [{"text": "Intro.", "links": [{"text": target, "target": target} for target in links]}],
+        "headings": [{"text": text, "level": "Heading 1", "paragraphs": []} for text in headings],
+    }
+
+class TestLinkChecker(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def save(self, name, data, digest):
+        json_path = os.path.join(self.temp_dir, "json", f"{name}.json")
+        os.makedirs(os.path.dirname(json_path), exist_ok=True)
+        with open(json_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        cache = ParseCache(self.temp_dir)
+        cache.store(f"{name}.docx", digest, json_path)
+        cache.save()
+
+    def test_slugify(self):
+        self.assertEqual(slugify("Getting Started!"), "getting-started")
+        self.assertEqual(slugify("C++ & Rust: 2024"), "c--rust-2024")
+
+    def test_internal_target(self):
+        page = "/articles/post-a"
+        self.assertEqual(internal_target("https://www.devontaereid.com/articles/post-b/#set-up", page),
+                         ("/articles/post-b", "set-up"))
+        self.assertEqual(internal_target("/notes/post-c/index.html", page), ("/notes/post-c", ""))
+        self.assertEqual(internal_target("#intro", page), ("/articles/post-a", "intro"))
+        self.assertEqual(internal_target("../post-b", page), ("/articles/post-b", ""))
+        self.assertIsNone(internal_target("https://example.com/articles/post-b", page))
+        self.assertIsNone(internal_target("mailto:me@example.com", page))
+        self.assertIsNone(internal_target("/projects", page))
+
+    def test_broken_links_and_incremental_index(self):
+        self.save("post-a", document("post-a", ["Intro"], links=[
+            "/articles/post-b#set-up", "/articles/post-b#missing", "https://www.devontaereid.com/articles/post-c",
+            "#intro", "https://example.com/"]), "a1")
+        self.save("post-b", document("post-b", ["Set Up"]), "b1")
+
+        summary = LinkChecker(self.temp_dir).check()
+        self.assertEqual((summary["documents"], summary["indexed"], summary["links"]), (2, 2, 5))
+        self.assertEqual([(link["target"], link["reason"]) for link in summary["broken"]],
+                         [("/articles/post-b#missing", "missing anchor"),
+                          ("https://www.devontaereid.com/articles/post-c", "missing page")])
+        with open(os.path.join(self.temp_dir, REPORT_NAME), encoding="utf-8") as f:
+            self.assertEqual(json.load(f), summary["broken"])
+
+        self.assertEqual(LinkChecker(self.temp_dir).check()["indexed"], 0)
+
+        # Renaming a heading of one document breaks a link in another
+        self.save("post-b", document("post-b", ["Setup"]), "b2")
+        summary = LinkChecker(self.temp_dir).check()
+        self.assertEqual(summary["indexed"], 1)
+        self.assertEqual([link["target"] for link in summary["broken"]],
+                         ["/articles/post-b#set-up", "/articles/post-b#missing",
+                          "https://www.devontaereid.com/articles/post-c"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import tracemalloc
+from docx import Document
+from docx.shared import Inches
+from lib.word_parser.word_doc_parser import WordDocParser
+from lib.pug_gen.pug_gen import Post_Generator, build_post_info
+from tests.test_word_doc_parser import make_png
+
+# Python heap bytes allowed per unit of content on top of the cost of an
+# empty document. Measured values are roughly 3-5x below these. lxml trees live
+# outside the Python heap, so the budgets catch extra Python-level copies
+# (bytes, strings, dicts) of the document rather than the XML tree itself.
+PARSE_BUDGET = {"paragraphs": 512, "runs": 384, "tables": 2048, "images": 4096}
+RENDER_BUDGET = {"paragraphs": 2048, "runs": 256, "tables": 1024, "images": 1024}
+# Slack for allocator noise when comparing small and large documents
+NOISE = 64 * 1024
+
+def add_header(doc):
+    doc.add_paragraph("article-id = memory post")
+    doc.add_paragraph("article-title = memory post")
+    doc.add_heading("Section", level=1)
+
+def paragraph_document(n):
+    """ n plain paragraphs, with a heading every 20 """
+    doc = Document()
+    add_header(doc)
+    for i in range(n):
+        if i and i % 20 == 0:
+            doc.add_heading(f"Section {i}", level=1)
+        doc.add_paragraph(f"Paragraph {i} with some ordinary words to count and render in the page body.")
+    return doc
+
+def run_document(n):
+    """ n formatted runs, ten per paragraph """
+    doc = Document()
+    add_header(doc)
+    for i in range(n // 10):
+        p = doc.add_paragraph()
+        for j in range(10):
+            run = p.add_run(f"run {i}-{j} ")
+            run.bold = j % 2 == 0
+            run.italic = j % 3 == 0
+    return doc
+
+def table_document(n):
+    """ n table rows, ten rows of four cells per table """
+    doc = Document()
+    add_header(doc)
+    for _ in range(n // 10):
+        table = doc.add_table(rows=10, cols=4)
+        for row in table.rows:
+            for cell in row.cells:
+                cell.text = "cell text here"
+    return doc
+
+def image_document(n, size=32):
+    """ n distinct captioned images of size x size pixels """
+    doc = Document()
+    add_header(doc)
+    for i in range(n):
+        doc.add_picture(io.BytesIO(make_png(size, size)), width=Inches(1))
+        doc.add_paragraph(f"Figure {i}: caption")
+    return doc
+
+BUILDERS = {"paragraphs": paragraph_document, "runs": run_document, "tables": table_document, "images": image_document}
+SIZES = {"paragraphs": (40, 160), "runs": (100, 400), "tables": (50, 200), "images": (8, 32)}
+
+class TestMemoryBudget(unittest.TestCase):
+    """ Peak Python heap usage of parsing and rendering synthetic documents of growing size """
+
+    @classmethod
+    def setUpClass(cls):
+        cls.temp_dir = tempfile.mkdtemp()
+        cls.documents = 0
+        # Warm up imports and module level caches so they are not billed to the first document
+        cls.measure(paragraph_document(1))
+        cls.empty = cls.measure(paragraph_document(0))
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.temp_dir)
+
+    @classmethod
+    def measure(cls, doc):
+        """ Returns the (parse, render) peak heap bytes and the .docx size of a document """
+        cls.documents += 1
+        path = os.path.join(cls.temp_dir, f"doc{cls.documents}.docx")
+        doc.save(path)
+        output_dir = os.path.join(cls.temp_dir, "output")
+
+        tracemalloc.start()
+        try:
+            with WordDocParser(path, output_dir) as parser:
+                data = parser.parse_document(interactive=False)
+            _, parse_peak = tracemalloc.get_traced_memory()
+
+            tracemalloc.reset_peak()
+            before, _ = tracemalloc.get_traced_memory()
+            post_info = build_post_info(data, default_id="memory-post")
+            Post_Generator(post_type=post_info["type"], json_obj=post_info,
+                           output_root=os.path.join(output_dir, "pug"), output_format="both")
+            _, render_peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        return {"parse": parse_peak, "render": render_peak - before, "size": os.path.getsize(path)}
+
+    def check_kind(self, kind):
+        small, large = SIZES[kind]
+        peaks = {n: self.measure(BUILDERS[kind](n)) for n in (small, large)}
+        for stage, budget in (("parse", PARSE_BUDGET[kind]), ("render", RENDER_BUDGET[kind])):
+            growth = {n: max(peaks[n][stage] - self.empty[stage], 0) for n in peaks}
+            with self.subTest(stage=stage):
+                # Ceiling: fixed cost of an empty document plus the per-unit budget
+                self.assertLessEqual(growth[large], budget * large,
+                                     f"{kind} {stage} peak grew by {growth[large]} bytes for {large} units")
+                # At most linear: 4x the content may not cost more than 4x the growth
+                self.assertLessEqual(growth[large], growth[small] * large / small * 1.5 + NOISE,
+                                     f"{kind} {stage} peak grows faster than the document: {growth}")
+
+    def test_paragraph_heavy(self):
+        self.check_kind("paragraphs")
+
+    def test_run_heavy(self):
+        self.check_kind("runs")
+
+    def test_table_heavy(self):
+        self.check_kind("tables")
+
+    def test_image_heavy(self):
+        self.check_kind("images")
+
+    def test_images_are_not_held_in_memory(self):
+        small = self.measure(image_document(4, size=64))
+        large = self.measure(image_document(4, size=384))
+        image_bytes = large["size"] - small["size"]
+        # Images are streamed in chunks, so the peak only has to grow by about
+        # one image, well below the images' total size
+        self.assertLess(large["parse"] - small["parse"], image_bytes / 2)
+        self.assertLess(large["render"] - small["render"], NOISE)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import io
+import os
+import shutil
+import tempfile
+import zipfile
+from docx import Document
+from docx.shared import Inches
+from lib.word_parser.metadata import read_metadata
+from lib.word_parser.word_doc_parser import WordDocParser
+from tests.test_word_doc_parser import make_png
+
+class TestReadMetadata(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        doc = Document()
+        doc.add_paragraph("article-id = Fast Listing")
+        doc.add_paragraph("article-type = Article")
+        doc.add_paragraph("article-title = fast listing")
+        doc.add_paragraph("")
+        doc.add_paragraph("article-category = Embedded")
+        doc.add_paragraph("Description")
+        doc.add_paragraph("Reading metadata without the body.")
+        doc.add_heading("Body", level=1)
+        doc.add_picture(io.BytesIO(make_png(32, 32)))
+        doc.add_paragraph("Body text.")
+        self.path = os.path.join(self.temp_dir, "post.docx")
+        doc.save(self.path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_matches_full_parse(self):
+        with WordDocParser(self.path, self.temp_dir) as parser:
+            metadata = parser.parse_document(interactive=False)["metadata"]
+        for key in ("word_count", "time_to_read", "date"):
+            del metadata[key]
+        self.assertEqual(read_metadata(self.path), metadata)
+        self.assertEqual(metadata["id"], "fast-listing")
+        self.assertEqual(metadata["title"], "Fast Listing")
+        self.assertEqual(metadata["description"], "reading metadata without the body.")
+        self.assertEqual(metadata["category"], "embedded")
+
+    def test_tab_stops_are_not_text(self):
+        doc = Document()
+        doc.add_paragraph("article-id = tab stops").paragraph_format.tab_stops.add_tab_stop(Inches(1))
+        doc.add_paragraph("article-type = Article")
+        doc.add_paragraph("Description")
+        doc.add_paragraph().paragraph_format.tab_stops.add_tab_stop(Inches(2))
+        doc.add_paragraph("The real description.")
+        doc.add_heading("Body", level=1)
+        doc.save(self.path)
+        with WordDocParser(self.path, self.temp_dir) as parser:
+            metadata = parser.parse_document(interactive=False)["metadata"]
+        for key in ("word_count", "time_to_read", "date"):
+            del metadata[key]
+        self.assertEqual(read_metadata(self.path), metadata)
+        self.assertEqual(metadata["id"], "tab-stops")
+        self.assertEqual(metadata["description"], "the real description.")
+
+    def test_stops_after_the_metadata_block(self):
+        # A package whose media is missing and whose body breaks off after the metadata
+        truncated = io.BytesIO()
+        with zipfile.ZipFile(self.path) as source, zipfile.ZipFile(truncated, "w") as target:
+            for name in source.namelist():
+                if name.startswith("word/media/"):
+                    continue
+                content = source.read(name)
+                if name == "word/document.xml":
+                    content = content[:content.index(b"Body text.")] + b"<<<"
+                target.writestr(name, content)
+        self.assertEqual(read_metadata(truncated.getvalue())["category"], "embedded")
+
+    def test_incomplete_metadata(self):
+        doc = Document()
+        doc.add_paragraph("article-id = only id")
+        doc.add_table(rows=1, cols=1).cell(0, 0).text = "article-type = table"
+        doc.add_paragraph("Body.")
+        source = io.BytesIO()
+        doc.save(source)
+        self.assertEqual(read_metadata(source), {"id": "only-id", "type": "", "title": "", "description": ""})
+
+if __name__ == '__main__':
+    unittest.main()
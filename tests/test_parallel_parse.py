@@ -0,0 +1,84 @@
+import unittest
+import os
+import shutil
+import tempfile
+from unittest import mock
+from docx import Document
+from lib.batch.runner import BatchRunner
+from lib.word_parser import word_doc_parser
+from lib.word_parser.word_doc_parser import WordDocParser
+
+def save_large_document(path, sections=12):
+    doc = Document()
+    doc.add_paragraph("article-id = parallel post")
+    doc.add_paragraph("article-type = article")
+    doc.add_paragraph("Intro text before the first heading.")
+    for i in range(sections):
+        doc.add_heading(f"Section {i}", level=1)
+        doc.add_paragraph(f"Body of section {i}.")
+        doc.add_paragraph(f"Item {i}", style="List Paragraph")
+        doc.add_heading("Details", level=2)
+        doc.add_paragraph(f"Code of section {i}:")
+        for line in ("code-start", "language = python", f"print({i})", "code-end"):
+            doc.add_paragraph(line)
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = f"cell {i}"
+        if i == 3:
+            # An empty heading is skipped, so the next chunk continues section 3
+            doc.add_heading("", level=1)
+            doc.add_paragraph("Still in section 3.")
+        if i == 5:
+            # A code block left open across the next top-level heading
+            doc.add_paragraph("Open code:")
+            doc.add_paragraph("code-start")
+            doc.add_paragraph("x = 1")
+        if i == 8:
+            # The next heading is read as the description
+            doc.add_paragraph("description")
+        if i == 10:
+            doc.add_paragraph("article-title = late title")
+    doc.save(path)
+
+class TestParallelParse(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.docx_path = os.path.join(self.temp_dir, "large.docx")
+        save_large_document(self.docx_path)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def parse(self, workers):
+        with WordDocParser(self.docx_path, self.temp_dir) as parser:
+            data = parser.parse_document(interactive=False, workers=workers)
+        return data, parser.chunks
+
+    def test_parallel_parse_matches_serial_parse(self):
+        serial, _ = self.parse(None)
+        with mock.patch.object(word_doc_parser, "MIN_CHUNK_BLOCKS", 1), \
+                mock.patch.object(word_doc_parser, "CHUNKS_PER_WORKER", 1000):
+            parallel, chunks = self.parse(2)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(serial["metadata"]["title"], "Late Title")
+        # Chunks after the empty heading, the open code block and the description are parsed again
+        self.assertEqual(chunks, {"parallel": 10, "serial": 3})
+
+    def test_small_documents_are_parsed_serially(self):
+        serial, _ = self.parse(None)
+        parallel, chunks = self.parse(2)
+        self.assertEqual(parallel, serial)
+        self.assertEqual(chunks, {"parallel": 0, "serial": 0})
+
+    def test_batch_passes_parse_workers(self):
+        input_dir = os.path.join(self.temp_dir, "input")
+        os.makedirs(input_dir)
+        shutil.move(self.docx_path, input_dir)
+        parse_document = WordDocParser.parse_document
+        with mock.patch.object(WordDocParser, "parse_document", autospec=True,
+                               side_effect=parse_document) as parse:
+            summary = BatchRunner(input_dir, os.path.join(self.temp_dir, "output"), parse_workers=2).run()
+        self.assertEqual(summary["processed"], 1)
+        self.assertEqual(parse.call_args.kwargs["workers"], 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+import os
+import pstats
+import shutil
+import tempfile
+from docx import Document
+from lib.batch.runner import BatchRunner
+from utils.profiler import StageProfiler, collapsed_stacks
+
+def busy(n):
+    return sum(i * i for i in range(n))
+
+class TestStageProfiler(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test_stage_profiles_are_saved(self):
+        profiler = StageProfiler("post", self.temp_dir)
+        with profiler.stage("parse"):
+            busy(20000)
+        paths = profiler.save()
+        self.assertEqual(paths, [os.path.join(self.temp_dir, "post.parse.prof"),
+                                 os.path.join(self.temp_dir, "post.parse.collapsed")])
+        pstats.Stats(paths[0])
+        with open(paths[1], encoding="utf-8") as f:
+            lines = f.read().splitlines()
+        self.assertTrue(lines)
+        for line in lines:
+            stack, value = line.rsplit(" ", 1)
+            self.assertTrue(stack)
+            self.assertTrue(value.isdigit())
+        self.assertTrue(any("busy (test_profiler.py" in line for line in lines))
+
+    def test_hot_functions(self):
+        profiler = StageProfiler("post", self.temp_dir)
+        with profiler.stage("render"):
+            busy(20000)
+        hot = profiler.hot_functions(limit=3)
+        self.assertLessEqual(len(hot), 3)
+        self.assertEqual({entry["stage"] for entry in hot}, {"render"})
+        self.assertEqual(hot, sorted(hot, key=lambda entry: entry["own_seconds"], reverse=True))
+
+    def test_collapsed_stacks_follow_callers(self):
+        profiler = StageProfiler("post", self.temp_dir)
+        with profiler.stage("parse"):
+            busy(20000)
+        lines = collapsed_stacks(pstats.Stats(profiler.profiles["parse"]))
+        genexpr = [line for line in lines if "<genexpr>" in line]
+        self.assertTrue(genexpr)
+        frames = genexpr[0].rsplit(" ", 1)[0].split(";")
+        self.assertIn("busy (test_profiler.py", frames[-3])
+        self.assertEqual(frames[-2], "<built-in method builtins.sum>")
+
+    def test_batch_profile(self):
+        input_dir = os.path.join(self.temp_dir, "input_docs")
+        output_dir = os.path.join(self.temp_dir, "output")
+        os.makedirs(input_dir)
+        doc = Document()
+        doc.add_paragraph("article-id = profiled post")
+        doc.add_heading("Heading", level=1)
+        doc.add_paragraph("Body text.")
+        doc.save(os.path.join(input_dir, "post.docx"))
+
+        summary = BatchRunner(input_dir, output_dir, profile=True, top=5).run()
+        self.assertEqual(summary["processed"], 1)
+        self.assertFalse(os.path.exists(os.path.join(output_dir, "profiles")))
+        names = sorted(os.listdir(f"{output_dir}-profiles"))
+        self.assertEqual(names, [f"post.{stage}.{ext}" for stage in ("parse", "render", "save")
+                                 for ext in ("collapsed", "prof")])
+        self.assertEqual(len(summary["hot_functions"]), 5)
+
+        summary = BatchRunner(input_dir, output_dir, profile=True).run()
+        self.assertEqual((summary["processed"], summary["cached"]), (0, 1))
+        self.assertEqual(summary["profiles"], [])
+
+if __name__ == '__main__':
+    unittest.main()
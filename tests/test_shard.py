@@ -0,0 +1,80 @@
+import unittest
+import json
+import os
+import shutil
+import tempfile
+from docx import Document
+from lib.batch.merge import merge_outputs
+from lib.batch.parse_cache import CACHE_NAME
+from lib.batch.runner import BatchRunner
+from lib.batch.shard import parse_shard, partition
+
+SIZES = {"a.docx": 50, "b.docx": 40, "c.docx": 30, "d.docx": 30, "e.docx": 20, "f.docx": 10}
+
+class TestSharding(unittest.TestCase):
+    def test_parse_shard(self):
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for value in ("0/4", "5/4", "2", "a/b", "-1/2"):
+            with self.assertRaises(ValueError):
+                parse_shard(value)
+
+    def test_partition_is_balanced_by_size(self):
+        shards = partition(list(SIZES), 3, size=SIZES.get)
+        self.assertEqual(shards, [["a.docx", "f.docx"], ["b.docx", "e.docx"], ["c.docx", "d.docx"]])
+        self.assertEqual([sum(SIZES[name] for name in shard) for shard in shards], [60, 60, 60])
+
+    def test_partition_is_deterministic(self):
+        paths = [f"/machine-a/{name}" for name in SIZES]
+        moved = [f"/mnt/b/{name}" for name in reversed(list(SIZES))]
+        size = lambda path: SIZES[os.path.basename(path)]
+        names = lambda shards: [[os.path.basename(path) for path in shard] for shard in shards]
+        self.assertEqual(names(partition(paths, 4, size)), names(partition(moved, 4, size)))
+        self.assertEqual(sorted(sum(names(partition(paths, 4, size)), [])), sorted(SIZES))
+
+class TestMerge(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "input_docs")
+        os.makedirs(self.input_dir)
+        for name in ("one", "two", "three"):
+            doc = Document()
+            doc.add_paragraph(f"article-id = {name}")
+            doc.add_heading("Heading", level=1)
+            doc.add_paragraph(f"Body of {name}. " * (10 if name == "one" else 1))
+            doc.save(os.path.join(self.input_dir, f"{name}.docx"))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def path(self, *parts):
+        return os.path.join(self.temp_dir, *parts)
+
+    def test_shards_merge_into_one_tree(self):
+        for index in (1, 2):
+            BatchRunner(self.input_dir, self.path(f"shard{index}"), shard=(index, 2)).run()
+        shard_names = [sorted(os.listdir(self.path(f"shard{index}", "json"))) for index in (1, 2)]
+        self.assertEqual(sorted(sum(shard_names, [])), ["one.json", "three.json", "two.json"])
+
+        summary = merge_outputs([self.path("shard1"), self.path("shard2")], self.path("output"))
+        self.assertEqual(summary["entries"], 3)
+        self.assertEqual(sorted(os.listdir(self.path("output", "json"))), ["one.json", "three.json", "two.json"])
+        with open(self.path("output", CACHE_NAME), encoding="utf-8") as f:
+            cache = json.load(f)
+        self.assertEqual(cache["two.docx"]["json"], self.path("output", "json", "two.json"))
+        self.assertTrue(all(os.path.exists(page) for entry in cache.values() for page in entry["pages"]))
+        self.assertFalse(os.path.exists(self.path("output", ".batch_journal.sqlite3")))
+
+        summary = BatchRunner(self.input_dir, self.path("output")).run()
+        self.assertEqual((summary["processed"], summary["cached"]), (0, 3))
+
+    def test_conflicting_shards_are_rejected(self):
+        for index in (1, 2):
+            os.makedirs(self.path(f"shard{index}", "json"))
+            with open(self.path(f"shard{index}", "json", "one.json"), "w") as f:
+                f.write(f'{{"shard": {index}}}')
+        with self.assertRaises(ValueError):
+            merge_outputs([self.path("shard1"), self.path("shard2")], self.path("output"))
+        self.assertFalse(os.path.exists(self.path("output")))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from lib.pug_gen.site_builder import SiteBuilder, MANIFEST_NAME
+from lib.pug_gen.assets import prism_components
+
+def sample_document(title="Sample Post"):
+    return {
+        "metadata": {
+            "id": "sample-post", "type": "article", "title": title,
+            "description": "testing the site build", "category": "tech",
+            "tags": ["Technology", "Engineer"],
+            "image": {"name": "images/web-dev.png", "alt": "web-dev-img"},
+            "time_to_read": {"hours": "0", "minutes": "2", "seconds": "10"},
+            "date": "1700000000000"
+        },
+        "headings": [{
+            "text": "Getting Started", "level": "Heading 1",
+            "paragraphs": [{
+                "text": "Read the docs first.",
+                "links": [{"text": "docs", "target": "https://example.com/docs"}],
+                "code-blocks": [{"id": "001", "language": "python", "code": ["print('hi')"]}]
+            }]
+        }],
+        "paragraphs": []
+    }
+
+class TestSiteBuilder(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.json_dir = os.path.join(self.temp_dir, "json")
+        self.output_dir = os.path.join(self.temp_dir, "pug")
+        os.makedirs(self.json_dir)
+        self.write_document(sample_document())
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def write_document(self, document):
+        with open(os.path.join(self.json_dir, "sample post.json"), 'w', encoding='utf-8') as f:
+            json.dump(document, f)
+
+    def build(self):
+        return SiteBuilder(json_dir=self.json_dir, output_dir=self.output_dir, workers=1).build()
+
+    def test_build_renders_page(self):
+        summary = self.build()
+        self.assertEqual(summary["rendered"], 1)
+
+        page = os.path.join(self.output_dir, "articles", "sample-post", "index.pug")
+        with open(page, encoding='utf-8') as f:
+            content = f.read()
+        self.assertIn("h1#post-header-title Sample Post", content)
+        self.assertIn("div.post-section-container#getting-started", content)
+        self.assertIn('#[a(href="https://example.com/docs") docs]', content)
+        self.assertIn('code(class="language-python").', content)
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        summary = self.build()
+        self.assertEqual(summary["rendered"], 0)
+        self.assertEqual(summary["skipped"], 1)
+
+        self.write_document(sample_document(title="Renamed Post"))
+        summary = self.build()
+        self.assertEqual(summary["rendered"], 1)
+
+    def test_compressed_build(self):
+        page = os.path.join(self.output_dir, "articles", "sample-post", "index.pug")
+        summary = SiteBuilder(json_dir=self.json_dir, output_dir=self.output_dir, workers=1, compress=True).build()
+        self.assertEqual(summary["compression"]["compressed"], 1)
+        self.assertTrue(os.path.exists(f"{page}.gz"))
+
+        # Sidecars of skipped pages are written again if they went missing
+        os.remove(f"{page}.gz")
+        summary = SiteBuilder(json_dir=self.json_dir, output_dir=self.output_dir, workers=1, compress=True).build()
+        self.assertEqual(summary["skipped"], 1)
+        self.assertTrue(os.path.exists(f"{page}.gz"))
+
+    def test_worker_pool_build(self):
+        for i in range(3):
+            document = sample_document()
+            document["metadata"]["id"] = f"post-{i}"
+            with open(os.path.join(self.json_dir, f"post-{i}.json"), 'w', encoding='utf-8') as f:
+                json.dump(document, f)
+        summary = SiteBuilder(json_dir=self.json_dir, output_dir=self.output_dir, workers=2).build()
+        self.assertEqual(summary["rendered"], 4)
+        self.assertEqual(summary["failed"], 0)
+
+    def test_page_assets_follow_code_languages(self):
+        document = sample_document()
+        document["headings"][0]["paragraphs"][0]["code-blocks"] = [
+            {"id": "001", "language": "c++", "code": ["int main() {}"]},
+            {"id": "002", "language": "py", "code": ["pass"]},
+        ]
+        self.write_document(document)
+        asset_root = os.path.join(self.temp_dir, "static")
+        os.makedirs(asset_root)
+        with open(os.path.join(asset_root, "style.css"), 'w') as f:
+            f.write("body {}")
+        SiteBuilder(json_dir=self.json_dir, output_dir=self.output_dir, workers=1, asset_root=asset_root).build()
+
+        with open(os.path.join(self.output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            entry = json.load(f)["sample post.json"]
+        components = [asset.rsplit('/', 1)[-1] for asset in entry["assets"] if "/components/" in asset]
+        self.assertEqual(components, ["prism-c.min.js", "prism-cpp.min.js", "prism-python.min.js"])
+        self.assertEqual(entry["payload"]["asset_bytes"], 7)
+        self.assertEqual(entry["payload"]["page_bytes"], os.path.getsize(entry["pages"][0]))
+
+    def test_pages_without_code_load_no_highlighting(self):
+        document = sample_document()
+        del document["headings"][0]["paragraphs"][0]["code-blocks"]
+        self.write_document(document)
+        self.build()
+
+        with open(os.path.join(self.output_dir, MANIFEST_NAME), encoding='utf-8') as f:
+            assets = json.load(f)["sample post.json"]["assets"]
+        self.assertEqual(assets, ["/style.css", "/scripts/main.js", "/scripts/bible_verses.js"])
+
+    def test_prism_components_resolve_dependencies(self):
+        self.assertEqual(prism_components(["tsx", "javascript", "cpp"]),
+                         ["jsx", "typescript", "tsx", "c", "cpp"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,94 @@
+import unittest
+import os
+import sys
+import shutil
+import subprocess
+import tempfile
+from docx import Document
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Total import time allowed for the fast paths, in microseconds
+IMPORT_BUDGET_US = 75_000
+
+# Modules that must only be imported when a document is actually parsed or rendered
+HEAVY_MODULES = ("docx", "lxml", "lib.word_parser.word_doc_parser", "lib.pug_gen.pug_gen")
+
+def run_with_importtime(*args):
+    """ Runs main.py under `-X importtime` and returns (stdout, {module: self time in us}) """
+    result = subprocess.run([sys.executable, "-X", "importtime", "main.py", *args],
+                            cwd=ROOT_DIR, capture_output=True, text=True, check=True)
+    imports = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, _, module = line[len("import time:"):].split("|")
+        imports[module.strip()] = int(self_us)
+    return result.stdout, imports
+
+class TestStartup(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def assert_fast_path(self, imports):
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, imports)
+        self.assertLess(sum(imports.values()), IMPORT_BUDGET_US)
+
+    def test_help(self):
+        stdout, imports = run_with_importtime("--help")
+        self.assertIn("build-site", stdout)
+        self.assert_fast_path(imports)
+
+    def test_list(self):
+        open(os.path.join(self.temp_dir, "post.docx"), "wb").close()
+        open(os.path.join(self.temp_dir, "~$post.docx"), "wb").close()
+        stdout, imports = run_with_importtime("list", "--input-dir", self.temp_dir)
+        self.assertEqual(stdout.splitlines(), ["post.docx"])
+        self.assert_fast_path(imports)
+
+    def test_parse_cache_hit(self):
+        docx_path = os.path.join(self.temp_dir, "post.docx")
+        doc = Document()
+        doc.add_paragraph("article-id = cached post")
+        doc.add_paragraph("Body text.")
+        doc.save(docx_path)
+        output_dir = os.path.join(self.temp_dir, "output")
+
+        stdout, imports = run_with_importtime("parse", docx_path, "--output-dir", output_dir)
+        self.assertIn("docx", imports)
+
+        stdout, imports = run_with_importtime("parse", docx_path, "--output-dir", output_dir)
+        self.assertIn("is unchanged", stdout)
+        self.assert_fast_path(imports)
+
+        # Other render options are a cache miss
+        stdout, imports = run_with_importtime("parse", docx_path, "--output-dir", output_dir, "--format", "html")
+        self.assertIn("Parsed", stdout)
+        self.assertTrue(os.path.exists(os.path.join(output_dir, "pug", "articles", "cached-post", "index.html")))
+        stdout, imports = run_with_importtime("parse", docx_path, "--output-dir", output_dir, "--format", "html")
+        self.assertIn("is unchanged", stdout)
+
+        # A cache hit with current sidecars only checks them
+        page = os.path.join(output_dir, "pug", "articles", "cached-post", "index.html")
+        run_with_importtime("parse", docx_path, "--output-dir", output_dir, "--format", "html", "--compress")
+        stdout, imports = run_with_importtime("parse", docx_path, "--output-dir", output_dir, "--format", "html",
+                                              "--compress")
+        self.assertIn("is unchanged", stdout)
+        self.assertNotIn("concurrent.futures", imports)
+        self.assert_fast_path(imports)
+
+        # A cache hit with --compress writes the sidecars that are missing
+        os.remove(f"{page}.gz")
+        stdout, imports = run_with_importtime("parse", docx_path, "--output-dir", output_dir, "--format", "html",
+                                              "--compress")
+        self.assertIn("is unchanged", stdout)
+        self.assertTrue(os.path.exists(f"{page}.gz"))
+        for module in HEAVY_MODULES:
+            self.assertNotIn(module, imports)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import contextlib
+import io
+from lib.word_parser.metadata import MetadataCollector, empty_metadata
+from lib.word_parser.taxonomy import Taxonomy, load_taxonomy
+
+CONFIG = {
+    "default": {"tags": ["Template"], "image": "default"},
+    "images": {
+        "default": {"name": "images/image.png", "alt": "image-title"},
+        "web-dev": {"name": "images/web-dev.png", "alt": "web-dev-img"}
+    },
+    "categories": {
+        "technology": {"aliases": ["tech"], "tags": ["Technology"], "image": "web-dev"},
+        "system design": {"image": "web-dev"}
+    }
+}
+
+class TestTaxonomy(unittest.TestCase):
+    def test_bundled_taxonomy(self):
+        taxonomy = load_taxonomy()
+        self.assertEqual(taxonomy.get_tags("Tech"), ["Technology", "Engineer"])
+        self.assertEqual(taxonomy.get_tags("algo"), ["Data Structures", "Algorithms", "Tech Interview"])
+        self.assertEqual(taxonomy.get_tags("docker"), ["Template", "Info", "Beginner"])
+        self.assertEqual(taxonomy.get_image("covenant"), {"name": "images/bible-icon.png", "alt": "bible-icon"})
+        self.assertEqual(taxonomy.get_image("system design"), {"name": "images/web-dev.png", "alt": "web-dev-img"})
+        self.assertEqual(taxonomy.get_image("unknown"), {"name": "images/image.png", "alt": "image-title"})
+        self.assertIs(load_taxonomy(), load_taxonomy())
+
+    def test_aliases_and_normalized_keys(self):
+        taxonomy = Taxonomy(CONFIG)
+        self.assertEqual(taxonomy.lookup(" TECH ")["category"], "technology")
+        self.assertEqual(taxonomy.get_tags("System-Design"), ["Template"])
+        self.assertEqual(taxonomy.get_image("system_design")["name"], "images/web-dev.png")
+        self.assertFalse(taxonomy.is_known("gardening"))
+        self.assertEqual(taxonomy.get_tags("gardening"), ["Template"])
+
+    def test_results_are_copies(self):
+        taxonomy = Taxonomy(CONFIG)
+        taxonomy.get_tags("tech").append("Changed")
+        self.assertEqual(taxonomy.get_tags("tech"), ["Technology"])
+
+    def test_unknown_categories_are_reported(self):
+        collector = MetadataCollector(empty_metadata())
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            collector.feed("article-category = Tech")
+        self.assertEqual(output.getvalue(), "")
+        with contextlib.redirect_stdout(output):
+            collector.feed("article-category = Tecnology")
+        self.assertIn("Unknown article-category 'tecnology'", output.getvalue())
+        self.assertEqual(collector.metadata["tags"], ["Template", "Info", "Beginner"])
+
+    def test_validation(self):
+        invalid_configs = [
+            {**CONFIG, "default": {"tags": ["Template"]}},
+            {**CONFIG, "categories": {"code": {"image": "missing"}}},
+            {**CONFIG, "categories": {"tech": {}, "technology": {"aliases": ["Tech"]}}},
+            {**CONFIG, "categories": {"code": {"tags": "Code"}}},
+        ]
+        for config in invalid_configs:
+            with self.assertRaises(ValueError):
+                Taxonomy(config)
+
+if __name__ == '__main__':
+    unittest.main()
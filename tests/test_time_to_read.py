@@ -0,0 +1,19 @@
+import unittest
+from utils.time_to_read import TimeToRead, count_words
+
+class TestTimeToRead(unittest.TestCase):
+    def test_count_words(self):
+        self.assertEqual(count_words(""), 0)
+        self.assertEqual(count_words("Don't stop: a well-known café, 42 times!"), 7)
+        self.assertEqual(count_words("int main() { return 0; }"), 4)
+        self.assertEqual(count_words("日本語 text"), 4)
+
+    def test_reading_rates(self):
+        time_to_read = TimeToRead(500, code_word_count=100, words_per_minute=250, code_words_per_minute=50)
+        self.assertEqual(time_to_read.get_time_as_obj(), {"hours": "0", "minutes": "4", "seconds": "0"})
+
+    def test_default_rate(self):
+        self.assertEqual(TimeToRead(1000).get_time_as_obj(), {"hours": "0", "minutes": "4", "seconds": "0"})
+
+if __name__ == '__main__':
+    unittest.main()
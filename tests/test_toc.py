@@ -0,0 +1,35 @@
+import unittest
+from lib.pug_gen.pug_gen import build_post_info
+from utils.toc import build_toc, document_toc, heading_anchors, heading_level, iter_toc
+
+def headings(*specs):
+    return [{"text": text, "level": f"Heading {level}", "paragraphs": []} for text, level in specs]
+
+class TestTableOfContents(unittest.TestCase):
+    def test_heading_level(self):
+        self.assertEqual(heading_level("Heading 3"), 3)
+        self.assertEqual(heading_level("Heading"), 1)
+        self.assertEqual(heading_level(""), 1)
+
+    def test_anchors_are_unique_and_stable(self):
+        self.assertEqual(heading_anchors(headings(("Intro", 1), ("Intro", 1), ("Intro 2", 1), ("?!", 2), ("", 2))),
+                         ["intro", "intro-2", "intro-2-2", "section", "section-2"])
+        # Adding a duplicate further down keeps the earlier anchors
+        self.assertEqual(heading_anchors(headings(("Intro", 1), ("Intro", 1), ("Intro 2", 1), ("Intro", 1)))[:3],
+                         ["intro", "intro-2", "intro-2-2"])
+
+    def test_hierarchy(self):
+        toc = build_toc(headings(("A", 2), ("B", 3), ("C", 1), ("D", 3), ("E", 2), ("F", 1)))
+        self.assertEqual([entry["text"] for entry in toc], ["A", "C", "F"])
+        self.assertEqual([entry["text"] for entry in toc[1]["children"]], ["D", "E"])
+        self.assertEqual([(entry["text"], entry["index"]) for entry in iter_toc(toc)],
+                         [("A", 0), ("B", 1), ("C", 2), ("D", 3), ("E", 4), ("F", 5)])
+
+    def test_documents_without_toc(self):
+        document = {"headings": headings(("Same", 1), ("Same", 2))}
+        self.assertEqual([entry["anchor"] for entry in iter_toc(document_toc(document))], ["same", "same-2"])
+        content = build_post_info(document)["content"]
+        self.assertEqual([section["title"]["anchor"] for section in content], ["same", "same-2"])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import os
+import json
+import shutil
+import tempfile
+from docx import Document
+from lib.batch.watcher import DocumentWatcher
+from lib.batch.pipeline import process_document
+
+class TestDocumentWatcher(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.input_dir = os.path.join(self.temp_dir, "input_docs")
+        os.makedirs(self.input_dir)
+        self.changed = []
+        self.watcher = DocumentWatcher(self.input_dir, self.changed.append, debounce=0.5)
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def save_document(self, name):
+        path = os.path.join(self.input_dir, name)
+        doc = Document()
+        doc.add_paragraph("article-id = watched post")
+        doc.add_paragraph("article-title = watched post")
+        doc.add_heading("Heading", level=1)
+        doc.add_paragraph("Body text.")
+        doc.save(path)
+        return path
+
+    def test_changes_are_debounced(self):
+        path = self.save_document("post.docx")
+        self.assertEqual(self.watcher.poll(now=100.0), [])
+        self.assertEqual(self.watcher.poll(now=100.2), [])
+        self.assertEqual(self.watcher.poll(now=100.6), [path])
+        self.assertEqual(self.watcher.poll(now=105.0), [])
+        self.assertEqual(self.changed, [path])
+
+    def test_lock_and_partial_files_are_ignored(self):
+        with open(os.path.join(self.input_dir, "~$post.docx"), "wb") as f:
+            f.write(b"lock")
+        partial = os.path.join(self.input_dir, "partial.docx")
+        with open(partial, "wb") as f:
+            f.write(b"not a zip yet")
+        self.watcher.poll(now=100.0)
+        self.assertEqual(self.watcher.poll(now=101.0), [])
+
+    def test_process_document_renders_page(self):
+        path = self.save_document("post.docx")
+        output_dir = os.path.join(self.temp_dir, "output")
+        result = process_document(path, output_dir)
+        with open(result["json"], encoding="utf-8") as f:
+            self.assertEqual(json.load(f)["metadata"]["id"], "watched-post")
+        self.assertEqual(result["pages"], [os.path.join(output_dir, "pug", "articles", "watched-post", "index.pug")])
+        self.assertTrue(os.path.exists(result["pages"][0]))
+        self.assertEqual(set(result["timings"]), {"parse", "save", "render"})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,7 +1,54 @@
 import unittest
 from lib.word_parser.word_doc_parser import WordDocParser
 from docx import Document
+import io
 import os
+import mmap
+import shutil
+import struct
+import tempfile
+import zipfile
+import zlib
+
+def make_png(width, height):
+    """ Builds an uncompressed-noise PNG of roughly width * height * 3 bytes """
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    rows = b"".join(b"\x00" + os.urandom(width * 3) for _ in range(height))
+    return (b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0))
+            + chunk(b"IDAT", zlib.compress(rows, 0)) + chunk(b"IEND", b""))
+
+FOOTNOTES_XML = (
+    '<w:footnotes xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main">'
+    '<w:footnote w:type="separator" w:id="-1"><w:p><w:r><w:separator/></w:r></w:p></w:footnote>'
+    '<w:footnote w:id="1"><w:p><w:r><w:t>First note.</w:t></w:r></w:p></w:footnote>'
+    '<w:footnote w:id="2"><w:p><w:r><w:t>Second note,</w:t></w:r></w:p><w:p><w:r><w:t>two lines.</w:t></w:r></w:p></w:footnote>'
+    '</w:footnotes>')
+
+def add_footnotes(docx_bytes, references):
+    """ Adds a footnotes part to a saved document and footnote references to the end of the given paragraphs """
+    source = zipfile.ZipFile(io.BytesIO(docx_bytes))
+    target_bytes = io.BytesIO()
+    with zipfile.ZipFile(target_bytes, "w") as target:
+        for name in source.namelist():
+            content = source.read(name)
+            if name not in ("[Content_Types].xml", "word/_rels/document.xml.rels", "word/document.xml"):
+                target.writestr(name, content)
+                continue
+            content = content.decode("utf-8")
+            if name == "[Content_Types].xml":
+                content = content.replace("</Types>", '<Override PartName="/word/footnotes.xml" ContentType='
+                    '"application/vnd.openxmlformats-officedocument.wordprocessingml.footnotes+xml"/></Types>')
+            elif name == "word/_rels/document.xml.rels":
+                content = content.replace("</Relationships>", '<Relationship Id="rIdNotes" Type="http://schemas.'
+                    'openxmlformats.org/officeDocument/2006/relationships/footnotes" Target="footnotes.xml"/></Relationships>')
+            elif name == "word/document.xml":
+                for text, note_id in references:
+                    content = content.replace(f"<w:t>{text}</w:t></w:r>",
+                        f'<w:t>{text}</w:t></w:r><w:r><w:footnoteReference w:id="{note_id}"/></w:r>')
+            target.writestr(name, content.encode("utf-8"))
+        target.writestr("word/footnotes.xml", FOOTNOTES_XML)
+    return target_bytes.getvalue()
 
 class TestWordDocParser(unittest.TestCase):
     def setUp(self):
@@ -29,6 +76,113 @@ class TestWordDocParser(unittest.TestCase):
         self.assertEqual(len(parser.data["headings"]), 1)
         self.assertEqual(parser.data["headings"][0]["text"], "Test Heading 1")
 
+    def test_table_of_contents(self):
+        doc = Document(self.test_file)
+        doc.add_heading("Setup", level=2)
+        doc.add_heading("Details", level=3)
+        doc.add_heading("Test Heading 1", level=1)
+        doc.add_heading("Setup", level=2)
+        doc.save(self.test_file)
+
+        parser = WordDocParser(self.test_file,self.output_dir)
+        parser.extract_headings()
+        self.assertEqual([heading["anchor"] for heading in parser.data["headings"]],
+                         ["test-heading-1", "setup", "details", "test-heading-1-2", "setup-2"])
+        toc = parser.data["toc"]
+        self.assertEqual([(entry["anchor"], entry["level"], entry["index"]) for entry in toc],
+                         [("test-heading-1", 1, 0), ("test-heading-1-2", 1, 3)])
+        self.assertEqual(toc[0]["children"][0]["children"][0]["text"], "Details")
+        self.assertEqual(toc[1]["children"][0]["anchor"], "setup-2")
+
+    def test_word_count_per_section(self):
+        doc = Document(self.test_file)
+        table = doc.add_table(rows=1, cols=2)
+        table.cell(0, 0).text = "two words"
+        table.cell(0, 1).text = "three more words"
+        doc.save(self.test_file)
+
+        parser = WordDocParser(self.test_file,self.output_dir)
+        parser.extract_headings()
+        # "Test Heading 1" + "This is a normal paragraph." + "Bold Text Normal Text Italic Text" + table
+        self.assertEqual(parser.data["headings"][0]["word_count"], {"text": 3 + 5 + 6 + 5, "code": 0})
+        self.assertEqual(parser.data["metadata"]["word_count"], {"text": 19, "code": 0})
+        self.assertEqual(parser.data["metadata"]["time_to_read"], {"hours": "0", "minutes": "0", "seconds": "4"})
+
+    def test_parse_from_bytes_file_like_and_mmap(self):
+        with open(self.test_file, "rb") as f:
+            content = f.read()
+        with open(self.test_file, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        for source in (content, io.BytesIO(content), mapped):
+            with WordDocParser(source, self.output_dir) as parser:
+                parser.extract_headings()
+            self.assertEqual(parser.data["headings"][0]["text"], "Test Heading 1")
+        mapped.close()
+
+    def test_images_are_streamed_from_the_package(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            image = make_png(64, 64)
+            doc = Document()
+            doc.add_picture(io.BytesIO(image))
+            doc.add_paragraph("An image", style="Caption")
+            docx_bytes = io.BytesIO()
+            doc.save(docx_bytes)
+
+            with WordDocParser(docx_bytes.getvalue(), temp_dir, name="pictures") as parser:
+                self.assertFalse(os.path.exists(os.path.join(temp_dir, "pictures")))
+                parser.parse_document(interactive=False)
+                # The parsed package never holds the media bytes
+                image_part = parser.document.part.related_parts[parser.data["images"][0]["data"]]
+                self.assertEqual(image_part.blob, b"")
+
+            with open(os.path.join(temp_dir, "pictures", "images", "extracted_image_1.jpg"), "rb") as f:
+                self.assertEqual(f.read(), image)
+            self.assertEqual(parser.data["images"][0]["caption"], "An image")
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_notes_are_attached_to_paragraphs(self):
+        doc = Document()
+        doc.add_heading("Notes", level=1)
+        doc.add_paragraph("Cited claim.")
+        commented = doc.add_paragraph("Commented text.")
+        doc.add_comment(commented.runs, text="Check this.", author="Editor")
+        doc.add_paragraph("Plain text.")
+        docx_bytes = io.BytesIO()
+        doc.save(docx_bytes)
+        source = add_footnotes(docx_bytes.getvalue(), [("Cited claim.", 1), ("Notes", 2), ("Commented text.", 1)])
+
+        temp_dir = tempfile.mkdtemp()
+        try:
+            with WordDocParser(source, temp_dir) as parser:
+                data = parser.parse_document(interactive=False)
+        finally:
+            shutil.rmtree(temp_dir)
+        heading = data["headings"][0]
+        self.assertEqual(heading["footnotes"], [{"id": "2", "text": "Second note,\ntwo lines."}])
+        cited, commented, plain = heading["paragraphs"]
+        self.assertEqual(cited["footnotes"], [{"id": "1", "text": "First note."}])
+        self.assertEqual(commented["footnotes"], [{"id": "1", "text": "First note."}])
+        self.assertEqual(commented["comments"], [{"id": "0", "text": "Check this.", "author": "Editor"}])
+        self.assertEqual(set(plain), {"text"})
+
+    def test_notes_on_list_items(self):
+        doc = Document()
+        doc.add_heading("Steps", level=1)
+        doc.add_paragraph("Do this:")
+        doc.add_paragraph("First step.", style="List Paragraph")
+        doc.add_paragraph("Second step.", style="List Paragraph")
+        docx_bytes = io.BytesIO()
+        doc.save(docx_bytes)
+        source = add_footnotes(docx_bytes.getvalue(), [("Second step.", 2)])
+
+        with WordDocParser(source, self.output_dir) as parser:
+            parser.extract_headings()
+        first, second = parser.data["headings"][0]["paragraphs"][0]["lists"]
+        self.assertNotIn("footnotes", first)
+        self.assertEqual(second["footnotes"], [{"id": "2", "text": "Second note,\ntwo lines."}])
+
     def test_extract_formatted_phrases(self):
         parser = WordDocParser(self.test_file,self.output_dir)
 
@@ -93,6 +93,20 @@ def confirm_update(message):
     else:
       print("Invalid input. Please enter 'y' or 'n'.")
 
+def slugify(text):
+  """
+  Converts heading text to the anchor id of its section on the rendered page.
+
+  Only letters, digits and spaces are kept; spaces become dashes.
+
+  Args:
+    text: The heading text.
+
+  Returns:
+    The lower-cased anchor id, e.g. "Getting Started!" -> "getting-started".
+  """
+  return ''.join(c for c in text if c.isalnum() or c == ' ').replace(' ', '-').lower()
+
 def ensure_key_exists_list(data, key):
   """
   Ensures that the given key exists in the dictionary. 
@@ -0,0 +1,236 @@
+import hashlib
+import json
+import os
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MANIFEST_NAME = ".compression_manifest.json"
+
+# Files are hashed and compressed in chunks of this size
+CHUNK_SIZE = 1024 * 1024
+
+# A sidecar is only kept if it is at most this fraction of the original, so
+# already compressed files (JPEG, PNG) do not get useless copies
+MAX_RATIO = 0.95
+
+
+def sidecar_formats() -> tuple:
+    """Returns the sidecar extensions that can be written: "gz", and "br" if brotli is installed."""
+    return ("gz", "br") if brotli is not None else ("gz",)
+
+
+def hash_path(path: str) -> str:
+    """Returns the hex SHA-256 of a file, read in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def manifest_key(root: str, path: str) -> str:
+    """Returns the manifest key of a file: its path relative to `root`, or its absolute path outside it."""
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(root))
+    return os.path.abspath(path) if relative.startswith(os.pardir) else relative.replace(os.sep, "/")
+
+
+def is_current(entry: dict, path: str, digest: str, formats: tuple) -> bool:
+    """Tells whether a manifest entry matches the file's content and its sidecars exist."""
+    return bool(entry and entry["sha256"] == digest and entry["checked"] == list(formats)
+                and all(os.path.exists(f"{path}.{ext}") for ext in entry["formats"]))
+
+
+def stale_files(root: str, paths: list) -> list:
+    """
+    Finds the files whose sidecars are missing or out of date from the
+    manifest alone, so a run with nothing to compress never starts a `Compressor`.
+
+    Args:
+        root: The output root holding the manifest.
+        paths: The output files to check.
+
+    Returns:
+        The paths that need compressing.
+    """
+    manifest_path = os.path.join(root, MANIFEST_NAME)
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return list(paths)
+    formats = sidecar_formats()
+    return [path for path in paths
+            if not is_current(manifest.get(manifest_key(root, path)), path, hash_path(path), formats)]
+
+
+class Compressor:
+    """
+    Writes precompressed `.gz` (and `.br`) sidecars next to output files.
+
+    Files are compressed in a thread pool while the caller carries on (zlib,
+    brotli and hashlib release the GIL). The SHA-256 of every compressed file
+    is kept in a manifest in the root directory; a file whose content hash is
+    unchanged and whose sidecars exist is not compressed again.
+    """
+
+    def __init__(self, root: str, workers: int = None, formats: tuple = None):
+        """
+        Args:
+            root: The output root; the manifest is stored here and keyed by
+                paths relative to it.
+            workers: The number of compression threads. Defaults to the CPU count.
+            formats: The sidecar formats to write. Defaults to `sidecar_formats()`.
+
+        Raises:
+            ValueError: If "br" is requested but brotli is not installed.
+        """
+        self.root = root
+        self.formats = tuple(formats or sidecar_formats())
+        if "br" in self.formats and brotli is None:
+            raise ValueError("Brotli sidecars need the 'brotli' package: pip install brotli")
+        self.manifest_path = os.path.join(root, MANIFEST_NAME)
+        self.manifest = self.__load_manifest()
+        self.__updated = set()
+        self.__removed = set()
+        self.summary = {"compressed": 0, "skipped": 0}
+        self.__lock = threading.Lock()
+        from concurrent.futures import ThreadPoolExecutor
+        self.__pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count() or 1)
+        self.__futures = []
+
+    def __load_manifest(self) -> dict:
+        if os.path.exists(self.manifest_path):
+            try:
+                with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                    return json.load(f)
+            except (OSError, json.JSONDecodeError) as e:
+                print(f"Ignoring unreadable compression manifest {self.manifest_path}: {e}")
+        return {}
+
+    def submit(self, path: str, content: bytes = None):
+        """
+        Queues a written file for compression.
+
+        Args:
+            path: The file that was written.
+            content: The bytes that were written, if at hand; otherwise the
+                file is read back in chunks.
+        """
+        self.__futures.append(self.__pool.submit(self.__compress, path, content))
+
+    def discard(self, path: str):
+        """
+        Removes the sidecars and manifest entry of an output file that was deleted.
+
+        Args:
+            path: The deleted file.
+        """
+        for ext in ("gz", "br"):
+            if os.path.exists(f"{path}.{ext}"):
+                os.remove(f"{path}.{ext}")
+        key = manifest_key(self.root, path)
+        with self.__lock:
+            self.manifest.pop(key, None)
+            self.__updated.discard(key)
+            self.__removed.add(key)
+
+    def flush(self) -> dict:
+        """
+        Waits for the queued files and saves the manifest.
+
+        Entries written by other processes since the manifest was loaded are
+        kept, so concurrent batch workers can share an output directory.
+
+        Returns:
+            The running totals of "compressed" and "skipped" files.
+
+        Raises:
+            Exception: The first error raised while compressing a file.
+        """
+        futures, self.__futures = self.__futures, []
+        errors = [future.exception() for future in futures]
+        os.makedirs(self.root, exist_ok=True)
+        temp_path = f"{self.manifest_path}.{os.getpid()}.tmp"
+        with self.__lock:
+            manifest = self.__load_manifest()
+            manifest.update({key: self.manifest[key] for key in self.__updated})
+            for key in self.__removed:
+                manifest.pop(key, None)
+            self.manifest = manifest
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.manifest, f, indent=4, sort_keys=True)
+        os.replace(temp_path, self.manifest_path)
+        for error in errors:
+            if error is not None:
+                raise error
+        return dict(self.summary)
+
+    def close(self) -> dict:
+        """Flushes and stops the compression threads."""
+        try:
+            return self.flush()
+        finally:
+            self.__pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def __compress(self, path: str, content: bytes = None):
+        digest = hashlib.sha256(content).hexdigest() if content is not None else hash_path(path)
+        key = manifest_key(self.root, path)
+        with self.__lock:
+            entry = self.manifest.get(key)
+        if is_current(entry, path, digest, self.formats):
+            with self.__lock:
+                self.summary["skipped"] += 1
+            return
+
+        size = len(content) if content is not None else os.path.getsize(path)
+        written = []
+        for ext in self.formats:
+            sidecar = f"{path}.{ext}"
+            temp_path = f"{sidecar}.tmp"
+            with open(temp_path, 'wb') as target:
+                self.__write_compressed(ext, path, content, target)
+            if os.path.getsize(temp_path) <= size * MAX_RATIO:
+                os.replace(temp_path, sidecar)
+                written.append(ext)
+            else:
+                os.remove(temp_path)
+                if os.path.exists(sidecar):
+                    os.remove(sidecar)
+        with self.__lock:
+            self.manifest[key] = {"sha256": digest, "formats": written, "checked": list(self.formats)}
+            self.__updated.add(key)
+            self.summary["compressed"] += 1
+
+    @staticmethod
+    def __write_compressed(ext: str, path: str, content: bytes, target):
+        """Compresses `content`, or the file in chunks, into the open target file."""
+        if ext == "gz":
+            import gzip
+            import shutil
+
+            # mtime=0 keeps the sidecar byte-identical for identical content
+            with gzip.GzipFile(filename="", mode='wb', fileobj=target, compresslevel=9, mtime=0) as stream:
+                if content is not None:
+                    stream.write(content)
+                else:
+                    with open(path, 'rb') as source:
+                        shutil.copyfileobj(source, stream, CHUNK_SIZE)
+            return
+        if content is not None:
+            target.write(brotli.compress(content))
+            return
+        stream = brotli.Compressor()
+        with open(path, 'rb') as source:
+            for chunk in iter(lambda: source.read(CHUNK_SIZE), b''):
+                target.write(stream.process(chunk))
+        target.write(stream.finish())
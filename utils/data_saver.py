@@ -1,16 +1,101 @@
+import glob
+import hashlib
 import json
+import os
+
+from .file_operations import output_writer
+from .toc import document_toc, iter_toc
+
+# File names of the section-split layout, inside a directory named after the document
+HEAD_NAME = "head.json"
+INTRO_NAME = "intro.json"
+SECTION_NAME = "section-{:03d}.json"
 
 class DataSaver:
-    def __init__(self, data, output_file):
-        """ Initialize with data and output file path """
+    def __init__(self, data, output_file, compressor=None):
+        """ Initialize with data and output file path, and optionally a `Compressor` for .gz/.br sidecars """
         self.data = data
         self.output_file = output_file
+        self.compressor = compressor
 
     def save_to_json(self):
-        """ Save data to a JSON file """
+        """ Save data to a JSON file, leaving the file untouched if its content is unchanged """
         try:
-            with open(self.output_file, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, indent=4, ensure_ascii=False)
-            print(f"Data successfully saved to {self.output_file}.")
+            content = json.dumps(self.data, indent=4, ensure_ascii=False).encode('utf-8')
+            if output_writer.write_bytes(self.output_file, content):
+                print(f"Data successfully saved to {self.output_file}.")
+            else:
+                print(f"{self.output_file} is unchanged.")
+            if self.compressor is not None:
+                self.compressor.submit(self.output_file, content)
         except Exception as e:
-            raise IOError(f"Failed to save data to {self.output_file}: {e}")
\ No newline at end of file
+            raise IOError(f"Failed to save data to {self.output_file}: {e}")
+
+    def sections_dir(self):
+        """ The directory of the section-split layout: the output file path without its extension """
+        return os.path.splitext(self.output_file)[0]
+
+    def save_sections(self):
+        """
+        Save the data split for lazy loading: a small head file with the
+        metadata and table of contents, and one file per top-level entry of
+        the table of contents (plus one for the paragraphs before the first
+        heading).
+
+        The head lists every section file with its byte size and SHA-256, so a
+        front end can fetch sections on demand and cache them by hash.
+
+        Returns:
+            The path of the head file.
+        """
+        directory = self.sections_dir()
+        try:
+            os.makedirs(directory, exist_ok=True)
+            head = {key: value for key, value in self.data.items() if key not in ("headings", "paragraphs", "toc")}
+            head["toc"] = []
+            head["sections"] = []
+            written = set()
+
+            if self.data.get("paragraphs"):
+                self.__write_section(directory, INTRO_NAME, {"paragraphs": self.data["paragraphs"]}, None, head)
+                written.add(INTRO_NAME)
+
+            headings = self.data.get("headings", [])
+            toc = document_toc(self.data)
+            for index, entry in enumerate(toc, start=1):
+                name = SECTION_NAME.format(index)
+                end = toc[index]["index"] if index < len(toc) else len(headings)
+                for item in iter_toc([entry]):
+                    head["toc"].append({"text": item["text"], "level": item["level"], "anchor": item["anchor"],
+                                        "section": name})
+                self.__write_section(directory, name, {"headings": headings[entry["index"]:end]}, entry["text"], head)
+                written.add(name)
+
+            # Sections (and their sidecars) left over from a longer earlier version of the document
+            for path in glob.glob(os.path.join(directory, "*.json*")):
+                if os.path.basename(path).split(".json")[0] + ".json" not in written | {HEAD_NAME}:
+                    # The sidecars of a stale section may already be gone with it
+                    if os.path.exists(path):
+                        os.remove(path)
+                    if self.compressor is not None and path.endswith(".json"):
+                        self.compressor.discard(path)
+
+            head_file = os.path.join(directory, HEAD_NAME)
+            content = json.dumps(head, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+            output_writer.write_bytes(head_file, content)
+            if self.compressor is not None:
+                self.compressor.submit(head_file, content)
+            print(f"Sections successfully saved to {directory}.")
+            return head_file
+        except Exception as e:
+            raise IOError(f"Failed to save sections to {directory}: {e}")
+
+    def __write_section(self, directory, name, section, title, head):
+        """ Write one section file and record its size and hash in the head """
+        content = json.dumps(section, ensure_ascii=False, separators=(",", ":")).encode('utf-8')
+        path = os.path.join(directory, name)
+        output_writer.write_bytes(path, content)
+        if self.compressor is not None:
+            self.compressor.submit(path, content)
+        head["sections"].append({"file": name, "title": title, "bytes": len(content),
+                                 "sha256": hashlib.sha256(content).hexdigest()})
@@ -1 +1,144 @@
-# This is a Python file.
+import hashlib
+import os
+import tempfile
+import threading
+
+# Existing files are hashed, and streams copied, in chunks of this size
+CHUNK_SIZE = 64 * 1024
+
+
+def _read_umask() -> int:
+    umask = os.umask(0)
+    os.umask(umask)
+    return umask
+
+
+# The mode `open` gives new files; temporary files are created 0600 and get
+# this mode (or that of the file they replace) before they are moved into place
+NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+
+def _same_content(path: str, content: bytes) -> bool:
+    """Returns True if the file at `path` holds exactly `content`."""
+    try:
+        if os.path.getsize(path) != len(content):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == content
+    except OSError:
+        return False
+
+
+def _file_digest(path: str):
+    """Returns the SHA-256 digest of a file, or None if it cannot be read."""
+    digest = hashlib.sha256()
+    try:
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+                digest.update(chunk)
+    except OSError:
+        return None
+    return digest.digest()
+
+
+class OutputWriter:
+    """
+    Writes output files only when their content changes.
+
+    A file whose existing bytes are identical to the new content is left
+    untouched, so its modification time stays the same for rsync, CDN
+    uploads and downstream builds. Changed files are written to a temporary
+    file and moved into place, so readers never see a partial file.
+    """
+
+    def __init__(self):
+        self.summary = {"written": 0, "skipped": 0}
+        self.__lock = threading.Lock()
+
+    def __count(self, written: bool) -> bool:
+        with self.__lock:
+            self.summary["written" if written else "skipped"] += 1
+        return written
+
+    def counts(self) -> dict:
+        """Returns a copy of the running "written" and "skipped" totals."""
+        with self.__lock:
+            return dict(self.summary)
+
+    @staticmethod
+    def __temp_file(path: str):
+        directory = os.path.dirname(path) or "."
+        os.makedirs(directory, exist_ok=True)
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=f".{os.path.basename(path)}.", suffix=".tmp")
+        return os.fdopen(fd, 'wb'), temp_path
+
+    @staticmethod
+    def __replace(temp_path: str, path: str):
+        """Moves a temporary file into place with the mode of the file it replaces."""
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except OSError:
+            mode = NEW_FILE_MODE
+        os.chmod(temp_path, mode)
+        os.replace(temp_path, path)
+
+    def write_bytes(self, path: str, content: bytes) -> bool:
+        """
+        Writes `content` to `path` unless the file already holds it.
+
+        Returns:
+            True if the file was written, False if it was unchanged.
+        """
+        if _same_content(path, content):
+            return self.__count(False)
+        f, temp_path = self.__temp_file(path)
+        with f:
+            f.write(content)
+        self.__replace(temp_path, path)
+        return self.__count(True)
+
+    def write_text(self, path: str, text: str) -> bool:
+        """Writes `text` as UTF-8 unless the file already holds it."""
+        return self.write_bytes(path, text.encode('utf-8'))
+
+    def write_chunks(self, path: str, chunks) -> bool:
+        """
+        Streams chunks of bytes or text to `path` without holding the whole
+        content, keeping the existing file if the result is identical.
+
+        Returns:
+            True if the file was written, False if it was unchanged.
+        """
+        digest = hashlib.sha256()
+        f, temp_path = self.__temp_file(path)
+        try:
+            with f:
+                for chunk in chunks:
+                    if isinstance(chunk, str):
+                        chunk = chunk.encode('utf-8')
+                    digest.update(chunk)
+                    f.write(chunk)
+            if (os.path.exists(path) and os.path.getsize(path) == os.path.getsize(temp_path)
+                    and _file_digest(path) == digest.digest()):
+                os.remove(temp_path)
+                return self.__count(False)
+            self.__replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+        return self.__count(True)
+
+    def copy_stream(self, path: str, source, chunk_size: int = CHUNK_SIZE) -> bool:
+        """
+        Copies a binary file object to `path` in chunks, keeping the existing
+        file if its content is identical.
+
+        Returns:
+            True if the file was written, False if it was unchanged.
+        """
+        return self.write_chunks(path, iter(lambda: source.read(chunk_size), b''))
+
+
+# Shared by every writer of the output tree so a run can report its totals
+output_writer = OutputWriter()
@@ -0,0 +1,119 @@
+import os
+import cProfile
+import pstats
+from contextlib import contextmanager
+
+def function_label(func):
+    """
+    Formats a pstats function key as "name (file:line)".
+
+    Args:
+        func: A (file, line, name) tuple as used by pstats.
+
+    Returns:
+        The readable label.
+    """
+    file_name, line, name = func
+    if file_name == "~":
+        return name
+    return f"{name} ({os.path.basename(file_name)}:{line})"
+
+def collapsed_stacks(stats):
+    """
+    Converts cProfile statistics to collapsed stacks ("a;b;c 42" lines) for
+    flamegraph tools.
+
+    cProfile only records caller/callee pairs, so each function's stack is
+    rebuilt by following its most expensive caller up to a root. The value of
+    each line is the function's own time in microseconds.
+
+    Args:
+        stats: A `pstats.Stats` object.
+
+    Returns:
+        The collapsed stack lines.
+    """
+    lines = []
+    for func, (_, _, own_time, _, callers) in stats.stats.items():
+        if own_time <= 0:
+            continue
+        stack = [func]
+        seen = {func}
+        while callers:
+            caller = max(callers, key=lambda c: callers[c][3])
+            if caller in seen:
+                break
+            stack.append(caller)
+            seen.add(caller)
+            callers = stats.stats.get(caller, (0, 0, 0, 0, {}))[4]
+        labels = [function_label(f).replace(";", ",") for f in reversed(stack)]
+        lines.append(f"{';'.join(labels)} {int(own_time * 1_000_000)}")
+    return sorted(lines)
+
+class StageProfiler:
+    """
+    Captures one cProfile profile per processing stage (parse, save, render)
+    of a document and writes them as `.prof` and collapsed-stack files.
+    """
+
+    def __init__(self, name, output_dir):
+        """
+        Args:
+            name: The document name, used as the file name prefix.
+            output_dir: The directory the profiles are written to.
+        """
+        self.name = name
+        self.output_dir = output_dir
+        self.profiles = {}
+
+    @contextmanager
+    def stage(self, stage):
+        """
+        Profiles the code run inside the `with` block as `stage`.
+
+        Args:
+            stage: The stage name, e.g. "parse".
+        """
+        profile = cProfile.Profile()
+        profile.enable()
+        try:
+            yield profile
+        finally:
+            profile.disable()
+            self.profiles[stage] = profile
+
+    def save(self):
+        """
+        Writes `<name>.<stage>.prof` and `<name>.<stage>.collapsed` per stage.
+
+        Returns:
+            The paths of the written files.
+        """
+        os.makedirs(self.output_dir, exist_ok=True)
+        paths = []
+        for stage, profile in self.profiles.items():
+            base = os.path.join(self.output_dir, f"{self.name}.{stage}")
+            profile.dump_stats(f"{base}.prof")
+            with open(f"{base}.collapsed", "w", encoding="utf-8") as f:
+                f.write("\n".join(collapsed_stacks(pstats.Stats(profile))) + "\n")
+            paths.extend([f"{base}.prof", f"{base}.collapsed"])
+        return paths
+
+    def hot_functions(self, limit=10):
+        """
+        Returns the functions with the most own time across all stages.
+
+        Args:
+            limit: The number of functions to return.
+
+        Returns:
+            A list of dictionaries with the "function" label, "stage",
+            "own_seconds" and "calls".
+        """
+        hot = []
+        for stage, profile in self.profiles.items():
+            for func, (_, calls, own_time, _, _) in pstats.Stats(profile).stats.items():
+                hot.append({"function": function_label(func), "stage": stage,
+                            "own_seconds": own_time, "calls": calls})
+        hot.sort(key=lambda entry: entry["own_seconds"], reverse=True)
+        return hot[:limit]
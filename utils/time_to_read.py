@@ -1,11 +1,46 @@
 import math
+import re
+
+# Scripts written without spaces between words; every character is read as a word
+_CJK_CHARS = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+WORD_PATTERN = re.compile(
+    rf"[{_CJK_CHARS}]|[^\W{_CJK_CHARS}]+(?:['’\-][^\W{_CJK_CHARS}]+)*"
+)
+
+def count_words(text: str) -> int:
+    """
+    Counts the words in a piece of text.
+
+    Words are runs of Unicode letters and digits; apostrophes and hyphens
+    inside a word ("don't", "well-known") do not split it. Chinese and
+    Japanese characters count as one word each.
+
+    Args:
+        text: The text to count.
+
+    Returns:
+        The number of words.
+    """
+    return sum(1 for _ in WORD_PATTERN.finditer(text))
 
 class TimeToRead:
-    def __init__(self, word_count: int):
+    def __init__(self, word_count: int, code_word_count: int = 0,
+                 words_per_minute: int = 250, code_words_per_minute: int = 100):
+        """
+        Calculates the reading time of a document.
+
+        Args:
+            word_count: The number of prose words.
+            code_word_count: The number of words inside code blocks.
+            words_per_minute: The prose reading rate.
+            code_words_per_minute: The (slower) code reading rate.
+        """
         self._secs = ""
         self._mins = ""
         self._hours = ""
-        self.__calculate_time_to_read(word_count)
+        self.words_per_minute = words_per_minute
+        self.code_words_per_minute = code_words_per_minute
+        self.__calculate_time_to_read(word_count, code_word_count)
 
     def __convert_to_preferred_format(self, seconds):
         sec = seconds % (24 * 3600)
@@ -13,21 +48,20 @@ class TimeToRead:
         sec %= 3600
         dec_min = math.floor(sec / 60)
         sec %= 60
-        
+
         # Assigning the formatted time values
         self._secs = str(int(sec))
         self._mins = str(int(dec_min))
         self._hours = str(int(dec_hour))
 
-    def __calculate_time_to_read(self, word_count):
-        WORDS_PER_MINUTE = 250
+    def __calculate_time_to_read(self, word_count, code_word_count):
         MINUTE = 60
-        HOUR = 60 * MINUTE  # 3600 seconds
-        
-        time_to_read_mins = (word_count / WORDS_PER_MINUTE) * MINUTE
 
-        self.__convert_to_preferred_format(time_to_read_mins)
-    
+        time_to_read_secs = (word_count / self.words_per_minute) * MINUTE
+        time_to_read_secs += (code_word_count / self.code_words_per_minute) * MINUTE
+
+        self.__convert_to_preferred_format(time_to_read_secs)
+
     def get_time_as_obj(self):
         # Return the time as a dictionary
         return {
@@ -0,0 +1,89 @@
+from .common_utils import slugify
+
+# The anchor of a heading whose text has no letters or digits
+FALLBACK_ANCHOR = "section"
+
+def heading_level(level) -> int:
+    """
+    Returns the number of a Word heading style ("Heading 2" -> 2).
+
+    Args:
+        level: The paragraph style name stored as a heading's "level".
+
+    Returns:
+        The heading level, 1 for styles without a number.
+    """
+    number = level.split()[-1] if level else ''
+    return int(number) if number.isdigit() else 1
+
+def heading_anchors(headings: list) -> list:
+    """
+    Derives a unique anchor for every heading of a document.
+
+    The anchor is the slug of the heading text. Repeated slugs get a "-2",
+    "-3", ... suffix in document order, so earlier anchors never change when
+    a duplicate heading is added further down.
+
+    Args:
+        headings: The parsed headings, in document order.
+
+    Returns:
+        The anchors, one per heading.
+    """
+    anchors = []
+    seen = set()
+    for heading in headings:
+        base = slugify(heading["text"]) or FALLBACK_ANCHOR
+        anchor = base
+        suffix = 2
+        while anchor in seen:
+            anchor = f"{base}-{suffix}"
+            suffix += 1
+        seen.add(anchor)
+        anchors.append(anchor)
+    return anchors
+
+def build_toc(headings: list) -> list:
+    """
+    Builds the hierarchical table of contents of a document.
+
+    A heading nests under the closest preceding heading of a lower level, so
+    skipped levels (a "Heading 3" right after a "Heading 1") still nest.
+
+    Args:
+        headings: The parsed headings, in document order. Their "anchor" is
+            used if set, otherwise the anchors are derived.
+
+    Returns:
+        The top-level entries, each a dictionary with the heading "text", its
+        numeric "level", its "anchor", its "index" in `headings` and its
+        nested "children".
+    """
+    derived = heading_anchors(headings)
+    toc = []
+    stack = []
+    for index, heading in enumerate(headings):
+        entry = {"text": heading["text"], "level": heading_level(heading["level"]),
+                 "anchor": heading.get("anchor", derived[index]), "index": index, "children": []}
+        while stack and stack[-1]["level"] >= entry["level"]:
+            stack.pop()
+        (stack[-1]["children"] if stack else toc).append(entry)
+        stack.append(entry)
+    return toc
+
+def iter_toc(toc: list):
+    """Yields every entry of a table of contents in document order."""
+    for entry in toc:
+        yield entry
+        yield from iter_toc(entry["children"])
+
+def document_toc(document: dict) -> list:
+    """
+    Returns the table of contents of a parsed document.
+
+    Documents parsed before the table of contents was added to the output
+    get one built from their headings.
+    """
+    if "toc" in document:
+        return document["toc"]
+    return build_toc(document.get("headings", []))